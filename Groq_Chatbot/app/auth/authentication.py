@@ -1,17 +1,33 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from fastapi import HTTPException, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.core.cache import TTLCache
+from app.core.config import (
+    AUTH_USER_CACHE_SIZE,
+    AUTH_USER_CACHE_TTL,
+    PASSWORD_HASH_WORKERS,
+)
 from app.db.dependencies import get_db
 from app.auth.models import User
 from fastapi.security import OAuth2PasswordBearer
+import asyncio
 import os
+import uuid
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool keeps ~100-300 ms hashes off
+# the event loop; the pool size also caps how many hashes run at once
+password_pool = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+
 # JWT config
 SECRET_KEY = os.getenv("JWT_SECRET", "super-secret-jwt-key")
 ALGORITHM = "HS256"
@@ -26,12 +42,40 @@ credentials_exception = HTTPException(
 )
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Detached snapshot of the fields request handlers read from a User."""
+
+    id: uuid.UUID
+    email: str
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        return cls(id=user.id, email=user.email, is_verified=bool(user.is_verified))
+
+
+# Resolved users keyed by token subject (user id); short TTL bounds staleness
+user_cache: TTLCache[uuid.UUID, AuthenticatedUser] = TTLCache(
+    AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL
+)
+
+
+def invalidate_cached_user(user_id: uuid.UUID) -> None:
+    """Call whenever a user row changes so the next request reloads it."""
+    user_cache.invalidate(user_id)
+
 
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_pool, pwd_context.hash, password)
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_pool, pwd_context.verify, plain, hashed
+    )
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):  # type: ignore
@@ -43,21 +87,37 @@ def create_access_token(data: dict, expires_delta: timedelta = None):  # type: i
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> uuid.UUID:
+    """
+    Validate the JWT and return its subject without touching the database.
+    For endpoints that only scope queries by user id; a deleted user keeps
+    access until the token expires.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")  # type: ignore
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+        return uuid.UUID(user_id)
+    except (JWTError, ValueError):
         raise credentials_exception
 
+
+async def get_current_user(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> AuthenticatedUser:
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
     stmt = select(User).where(User.id == user_id)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
 
     if not user:
         raise credentials_exception
-    return user
+
+    current = AuthenticatedUser.from_user(user)
+    user_cache.set(user_id, current)
+    return current
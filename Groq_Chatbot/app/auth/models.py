@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlalchemy import Boolean, String, DateTime, ForeignKey, Text
+from sqlalchemy import JSON, Boolean, String, DateTime, ForeignKey, Index, Text, true
 from sqlalchemy.orm import Mapped, mapped_column, relationship, DeclarativeBase
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from datetime import datetime
@@ -43,9 +43,78 @@ class AIModel(Base):
         String(255), nullable=False
     )  # API model identifier
     rating: Mapped[int] = mapped_column(nullable=False)
+    context_window: Mapped[Optional[int]] = mapped_column(
+        nullable=True
+    )  # max prompt+completion tokens, as reported by the provider
     total_requests: Mapped[int] = mapped_column(nullable=True)
     total_response_time: Mapped[float] = mapped_column(nullable=True)
     average_response_time: Mapped[float] = mapped_column(nullable=True, default=0.0)
+    streamed_requests: Mapped[int] = mapped_column(nullable=True, default=0)
+    average_first_token_time: Mapped[float] = mapped_column(
+        nullable=True, default=0.0
+    )  # seconds until the first streamed token
+    hedged_requests: Mapped[int] = mapped_column(
+        nullable=True, default=0
+    )  # hedged races this model took part in
+    hedge_wins: Mapped[int] = mapped_column(nullable=True, default=0)
+    is_active: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=True, server_default=true()
+    )  # False once the provider stops listing the model (soft delete)
+    deactivated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True
+    )
+
+
+class ModelDescription(Base):
+    """
+    Serper description per model, cached by model discovery so unchanged
+    models are not searched and re-categorized on every run.
+    """
+
+    __tablename__ = "model_descriptions"
+
+    model_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    provider: Mapped[str] = mapped_column(String(50), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class ModelLatencyBucket(Base):
+    """
+    Latency telemetry for one model in one time bucket, appended by each
+    worker's flush (see app/services/latency_telemetry.py); sum rows per
+    (model_id, bucket_start) to get the full picture.
+    """
+
+    __tablename__ = "model_latency_buckets"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    model_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    requests: Mapped[int] = mapped_column(nullable=False, default=0)
+    errors: Mapped[int] = mapped_column(nullable=False, default=0)
+    latency_sum: Mapped[float] = mapped_column(
+        nullable=False, default=0.0
+    )  # seconds, successful calls only
+    prompt_tokens: Mapped[int] = mapped_column(nullable=False, default=0)
+    completion_tokens: Mapped[int] = mapped_column(nullable=False, default=0)
+    histogram: Mapped[List[int]] = mapped_column(
+        JSON, nullable=False
+    )  # counts per latency_telemetry.HISTOGRAM_BOUNDS bucket
+
+
+class LLMResponseCacheEntry(Base):
+    """Persisted tier of app/services/response_cache.py (optional)."""
+
+    __tablename__ = "llm_response_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 hex
+    model: Mapped[str] = mapped_column(String(255), nullable=False)  # requested
+    used_model: Mapped[str] = mapped_column(String(255), nullable=False)
+    response: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
 
 
 class UserApiKey(Base):
@@ -80,6 +149,12 @@ class ChatSession(Base):
         String, nullable=True, default="Untitled Session"
     )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Rolling summary of older turns; messages up to and including
+    # summary_last_message_id are covered by it and not re-sent to the LLM
+    summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    summary_last_message_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        PG_UUID(as_uuid=True), nullable=True
+    )
 
     user: Mapped["User"] = relationship("User", back_populates="chat_sessions")
     messages: Mapped[List["ChatMessage"]] = relationship(
@@ -108,3 +183,30 @@ class ChatMessage(Base):
     session: Mapped["ChatSession"] = relationship(
         "ChatSession", back_populates="messages"
     )
+
+
+# Access paths of the hot chat queries (see migrations/versions/0003_*):
+#  - a session's messages ordered by time (history tail, message pages)
+#  - a user's messages ordered by time (get_recent_messages)
+#  - a user's sessions, newest first (session list)
+Index(
+    "ix_chat_messages_session_id_created_at",
+    ChatMessage.session_id,
+    ChatMessage.created_at,
+)
+Index(
+    "ix_chat_messages_user_id_created_at",
+    ChatMessage.user_id,
+    ChatMessage.created_at,
+)
+Index(
+    "ix_chat_sessions_user_id_created_at",
+    ChatSession.user_id,
+    ChatSession.created_at.desc(),
+)
+# Telemetry reads: recent buckets, overall or for one model
+Index(
+    "ix_model_latency_buckets_bucket_start_model_id",
+    ModelLatencyBucket.bucket_start,
+    ModelLatencyBucket.model_id,
+)
@@ -38,12 +38,25 @@ class UserApiKeyOut(BaseModel):
     api_keys: List[UserApiKeyIn]
 
 
+class UserApiKeyUsage(BaseModel):
+    """Per-key counters of this server process (keys are shown as a hint only)."""
+
+    api_provider: str
+    key_hint: str
+    requests: int
+    rate_limited: int
+    unauthorized: int
+    benched_for: float
+
+
 class ChatPayload(BaseModel):
     session_id: UUID | None = None
     messages: List[Message]
     model: str
     category: str
     web_search: bool = False
+    stream: bool = False  # reply as Server-Sent Events instead of one JSON body
+    cache: bool = False  # allow an identical earlier prompt's reply to be reused
 
 
 class ChatRequest(BaseModel):
@@ -87,6 +100,23 @@ class ChatSessionWithMessages(BaseModel):
     id: UUID
     title: Optional[str]
     messages: List[ChatMessageOut]
+    next_cursor: Optional[str] = None  # older messages, when paginated
+
+
+class ChatSessionSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    title: Optional[str]
+    created_at: datetime
+    message_count: int
+    last_message_preview: Optional[str] = None
+
+
+class ChatSessionPage(BaseModel):
+    user_id: UUID
+    sessions: List[ChatSessionSummary]
+    next_cursor: Optional[str] = None
 
 
 # ---- SESSION + MESSAGES ----
@@ -0,0 +1,222 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_float(name: str, default: float | None) -> float | None:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    if value.strip().lower() == "none":
+        return None
+    return float(value)
+
+
+# =========================
+# Shared outbound HTTP client (Groq, Mistral, Serper)
+# =========================
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+# Cap on concurrent requests to a single host (0 disables the cap)
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "40"))
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+HTTP2_ENABLED = _env_bool("HTTP2_ENABLED", False)
+HTTP_CONNECT_TIMEOUT = _env_float("HTTP_CONNECT_TIMEOUT", 10.0)
+# LLM completions can take a long time; no read timeout unless configured
+HTTP_READ_TIMEOUT = _env_float("HTTP_READ_TIMEOUT", None)
+HTTP_POOL_TIMEOUT = _env_float("HTTP_POOL_TIMEOUT", None)
+
+# =========================
+# Model catalog cache
+# =========================
+# Seconds before the in-memory ai_models snapshot is reloaded
+MODEL_CATALOG_TTL = float(os.getenv("MODEL_CATALOG_TTL", "300"))
+
+# =========================
+# Model latency stats (write-behind)
+# =========================
+# Seconds between batched flushes of per-model request/latency counters
+MODEL_STATS_FLUSH_INTERVAL = float(os.getenv("MODEL_STATS_FLUSH_INTERVAL", "10"))
+
+# =========================
+# Chat history windowing
+# =========================
+# Most recent messages loaded from the DB per turn (before token fitting)
+CHAT_HISTORY_FETCH_LIMIT = int(os.getenv("CHAT_HISTORY_FETCH_LIMIT", "50"))
+# Context window assumed when a model has none recorded
+CHAT_CONTEXT_DEFAULT_WINDOW = int(os.getenv("CHAT_CONTEXT_DEFAULT_WINDOW", "8192"))
+# Upper bound on prompt tokens sent per turn, whatever the model allows (0 = none)
+CHAT_CONTEXT_MAX_TOKENS = int(os.getenv("CHAT_CONTEXT_MAX_TOKENS", "16000"))
+# Tokens kept free for the reply and injected search results
+CHAT_CONTEXT_RESERVE_TOKENS = int(os.getenv("CHAT_CONTEXT_RESERVE_TOKENS", "2048"))
+
+# =========================
+# Rolling conversation summaries
+# =========================
+# Unsummarized messages in a session before older ones get compacted
+SUMMARY_TRIGGER_MESSAGES = int(os.getenv("SUMMARY_TRIGGER_MESSAGES", "24"))
+# Newest messages always kept verbatim (never folded into the summary)
+SUMMARY_KEEP_RECENT_MESSAGES = int(os.getenv("SUMMARY_KEEP_RECENT_MESSAGES", "10"))
+# Upper bound on messages folded into the summary per refresh
+SUMMARY_MAX_BATCH_MESSAGES = int(os.getenv("SUMMARY_MAX_BATCH_MESSAGES", "60"))
+
+# =========================
+# Session history endpoints
+# =========================
+SESSIONS_PAGE_DEFAULT_LIMIT = int(os.getenv("SESSIONS_PAGE_DEFAULT_LIMIT", "30"))
+MESSAGES_PAGE_DEFAULT_LIMIT = int(os.getenv("MESSAGES_PAGE_DEFAULT_LIMIT", "50"))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "200"))
+# Keep the old "every session with every message" payload at /get_sessions/full
+SESSION_HISTORY_FULL_ENABLED = _env_bool("SESSION_HISTORY_FULL_ENABLED", False)
+
+# =========================
+# Authenticated user cache
+# =========================
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+
+# =========================
+# Per-user provider key cache
+# =========================
+# Entries are invalidated on save/delete; the TTL only bounds staleness
+# across workers
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", "300"))
+API_KEY_CACHE_SIZE = int(os.getenv("API_KEY_CACHE_SIZE", "10000"))
+
+# =========================
+# Password hashing
+# =========================
+# bcrypt runs in this many worker threads so logins never block the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+
+# =========================
+# Hedged requests
+# =========================
+# When enabled, a non-streamed chat call that has not answered within
+# HEDGE_LATENCY_MULTIPLIER x the model's recent p95 latency (its lifetime
+# average until enough recent calls are known; clamped to
+# [HEDGE_MIN_DELAY, HEDGE_MAX_DELAY] seconds) is also sent to the next-ranked
+# candidate; the first success wins and the other call is cancelled
+HEDGING_ENABLED = _env_bool("HEDGING_ENABLED", False)
+HEDGE_LATENCY_MULTIPLIER = float(os.getenv("HEDGE_LATENCY_MULTIPLIER", "2.0"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "1.0"))
+HEDGE_MAX_DELAY = float(os.getenv("HEDGE_MAX_DELAY", "8.0"))
+HEDGE_MAX_INFLIGHT = int(os.getenv("HEDGE_MAX_INFLIGHT", "2"))
+
+# =========================
+# Circuit breakers
+# =========================
+# A model's circuit opens after CIRCUIT_MODEL_FAILURES upstream failures
+# (5xx / 429 / transport errors) within CIRCUIT_FAILURE_WINDOW seconds; a
+# provider's after CIRCUIT_PROVIDER_FAILURES across all of its models. Open
+# circuits are skipped for CIRCUIT_COOLDOWN seconds, then let one probe through
+CIRCUIT_MODEL_FAILURES = int(os.getenv("CIRCUIT_MODEL_FAILURES", "5"))
+CIRCUIT_PROVIDER_FAILURES = int(os.getenv("CIRCUIT_PROVIDER_FAILURES", "15"))
+CIRCUIT_FAILURE_WINDOW = float(os.getenv("CIRCUIT_FAILURE_WINDOW", "60"))
+CIRCUIT_COOLDOWN = float(os.getenv("CIRCUIT_COOLDOWN", "30"))
+
+# =========================
+# Admin
+# =========================
+# Comma-separated emails allowed to read the /admin endpoints
+ADMIN_EMAILS = {
+    e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()
+}
+
+# =========================
+# Latency telemetry
+# =========================
+# Routing scores use the EWMA/p95 of the last LATENCY_WINDOW_SIZE calls once
+# LATENCY_MIN_SAMPLES are known; per-minute histograms are flushed to
+# model_latency_buckets every LATENCY_FLUSH_INTERVAL seconds
+LATENCY_BUCKET_SECONDS = int(os.getenv("LATENCY_BUCKET_SECONDS", "60"))
+LATENCY_FLUSH_INTERVAL = float(os.getenv("LATENCY_FLUSH_INTERVAL", "30"))
+LATENCY_WINDOW_SIZE = int(os.getenv("LATENCY_WINDOW_SIZE", "200"))
+LATENCY_EWMA_ALPHA = float(os.getenv("LATENCY_EWMA_ALPHA", "0.2"))
+LATENCY_MIN_SAMPLES = int(os.getenv("LATENCY_MIN_SAMPLES", "5"))
+
+# =========================
+# Provider rate limiting
+# =========================
+# Requests queue up to RATE_LIMIT_MAX_WAIT seconds for their provider key's
+# budget (learned from x-ratelimit-* / retry-after headers); 429s are retried
+# up to RATE_LIMIT_RETRIES times with jittered backoff inside that budget
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "5"))
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "2"))
+RATE_LIMIT_BACKOFF_BASE = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "0.5"))
+# Buckets and usage counters of keys unused for this many seconds are dropped
+RATE_LIMIT_IDLE_TTL = float(os.getenv("RATE_LIMIT_IDLE_TTL", "3600"))
+
+# =========================
+# Provider key pools
+# =========================
+# A user's key is taken out of rotation for this many seconds after a 429
+# (at least retry-after) or a 401
+KEY_BENCH_RATE_LIMITED = float(os.getenv("KEY_BENCH_RATE_LIMITED", "30"))
+KEY_BENCH_UNAUTHORIZED = float(os.getenv("KEY_BENCH_UNAUTHORIZED", "300"))
+
+# =========================
+# LLM response cache
+# =========================
+# Exact-match replies for auxiliary prompts (titles, search rewrites) and for
+# main replies that opt in; RESPONSE_CACHE_PERSIST adds a database tier
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "5000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+RESPONSE_CACHE_PERSIST = _env_bool("RESPONSE_CACHE_PERSIST", False)
+
+# =========================
+# Web search (Serper)
+# =========================
+# SERPER_SEARCH_URL can point at a local stand-in (see serper_stub.py)
+SERPER_SEARCH_URL = os.getenv("SERPER_SEARCH_URL", "https://google.serper.dev/search")
+WEB_SEARCH_CACHE_TTL = float(os.getenv("WEB_SEARCH_CACHE_TTL", "600"))
+WEB_SEARCH_CACHE_SIZE = int(os.getenv("WEB_SEARCH_CACHE_SIZE", "2000"))
+# Search the raw user message while the query rewrite is still running. Only
+# pays off when rewrites often come back unchanged; otherwise each such turn
+# costs a second Serper call, hence off by default
+WEB_SEARCH_SPECULATIVE = _env_bool("WEB_SEARCH_SPECULATIVE", False)
+
+# =========================
+# Model discovery (app/services/fetch_models.py)
+# =========================
+# Models searched + categorized at the same time; provider request budgets
+# are still enforced per key by the rate-limited transport
+DISCOVERY_CONCURRENCY = int(os.getenv("DISCOVERY_CONCURRENCY", "4"))
+# Models per categorization prompt (1 = one prompt per model); models missing
+# from a batch reply are retried on their own
+DISCOVERY_BATCH_SIZE = int(os.getenv("DISCOVERY_BATCH_SIZE", "8"))
+# Cached model descriptions (including "nothing found") are trusted this long;
+# until then a model that is already categorized in ai_models is not searched
+# or categorized again
+MODEL_DESCRIPTION_TTL = float(os.getenv("MODEL_DESCRIPTION_TTL", str(7 * 86400)))
+
+# =========================
+# Background model prober (app/services/model_prober.py)
+# =========================
+# Re-runs discovery + pings every PROBER_INTERVAL seconds (± PROBER_JITTER as
+# a fraction), first after PROBER_INITIAL_DELAY. Only the worker holding the
+# Postgres advisory lock PROBER_LOCK_KEY probes; PROBER_MAX_PINGS caps the
+# pings per run (0 = all eligible models, most urgent first)
+PROBER_ENABLED = _env_bool("PROBER_ENABLED", True)
+PROBER_INTERVAL = float(os.getenv("PROBER_INTERVAL", "1800"))
+PROBER_JITTER = float(os.getenv("PROBER_JITTER", "0.2"))
+PROBER_INITIAL_DELAY = float(os.getenv("PROBER_INITIAL_DELAY", "60"))
+PROBER_MAX_PINGS = int(os.getenv("PROBER_MAX_PINGS", "0"))
+PROBER_LOCK_KEY = int(os.getenv("PROBER_LOCK_KEY", "7240913"))
+
+# =========================
+# Chat turn persistence (app/services/turn_persistence.py)
+# =========================
+# A turn's session/title/messages are committed together at the end of the
+# turn. With MESSAGE_WRITE_BEHIND the messages are queued instead and
+# inserted in batches every MESSAGE_FLUSH_INTERVAL seconds (sooner once
+# MESSAGE_FLUSH_BATCH are waiting); the queue is drained on shutdown
+MESSAGE_WRITE_BEHIND = _env_bool("MESSAGE_WRITE_BEHIND", False)
+MESSAGE_FLUSH_INTERVAL = float(os.getenv("MESSAGE_FLUSH_INTERVAL", "0.25"))
+MESSAGE_FLUSH_BATCH = int(os.getenv("MESSAGE_FLUSH_BATCH", "200"))
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Callable, Dict, Optional
+
+import httpx
+from fastapi import Request
+
+from app.core.config import (
+    HTTP2_ENABLED,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_POOL_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+)
+from app.core.rate_limit import RateLimitedTransport, rate_scheduler
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body wrapper that frees the host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Wrap a transport so that at most `max_per_host` requests are in flight
+    per host. httpx only limits the pool as a whole, so without this one busy
+    provider could take every pooled connection. A slot is held until the
+    response body is closed, which keeps streamed completions accounted for.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = self._semaphores[host] = asyncio.Semaphore(self._max_per_host)
+
+        await sem.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            sem.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, sem.release)  # type: ignore
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(**overrides) -> httpx.AsyncClient:
+    """Build the process-wide, connection-pooled client used for provider calls."""
+    http2 = HTTP2_ENABLED
+    if http2 and not _http2_available():
+        print("⚠️ HTTP2_ENABLED is set but `h2` is not installed; using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    transport: httpx.AsyncBaseTransport = overrides.pop(
+        "transport", None
+    ) or httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    if HTTP_MAX_CONNECTIONS_PER_HOST > 0:
+        transport = HostLimitedTransport(transport, HTTP_MAX_CONNECTIONS_PER_HOST)
+    # Outermost: waiting for a provider's rate budget must not hold a host slot
+    transport = RateLimitedTransport(transport, rate_scheduler)
+
+    timeout = httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=HTTP_READ_TIMEOUT,
+        write=HTTP_CONNECT_TIMEOUT,
+        pool=HTTP_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(transport=transport, timeout=timeout, **overrides)
+
+
+async def get_http_client(request: Request) -> httpx.AsyncClient:
+    """FastAPI dependency returning the client created in the app lifespan."""
+    return request.app.state.http_client
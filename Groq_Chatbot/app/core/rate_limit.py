@@ -0,0 +1,327 @@
+import asyncio
+import hashlib
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
+
+import httpx
+
+from app.core.config import (
+    KEY_BENCH_RATE_LIMITED,
+    KEY_BENCH_UNAUTHORIZED,
+    RATE_LIMIT_BACKOFF_BASE,
+    RATE_LIMIT_IDLE_TTL,
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_RETRIES,
+)
+
+# Hosts whose quota headers we learn from; other hosts pass straight through
+PROVIDER_HOSTS = {
+    "api.groq.com": "groq",
+    "api.mistral.ai": "mistral",
+}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+class RateLimitExceeded(Exception):
+    """A request would have to queue longer than the scheduler allows."""
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds from "12", "7.66s", "2m59.56s", "1h2m" or "120ms" (None if unparsable)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Stable short id for an API key; raw keys never end up in dicts or metrics."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Request budget of one provider key.
+
+    Unlimited until the provider tells us otherwise: `observe()` sets the
+    capacity from x-ratelimit-limit-requests and refills at the pace that gets
+    the bucket from x-ratelimit-remaining-requests back to full by
+    x-ratelimit-reset-requests. `reserve()` takes a token immediately and lets
+    the balance go negative, so concurrent callers queue in arrival order and
+    each learns exactly how long to wait. A known-empty bucket simply waits for
+    its refill; `block()` pauses the key outright (retry-after, token quota).
+    """
+
+    def __init__(self):
+        self.capacity = float("inf")
+        self.tokens = float("inf")
+        self.rate = 0.0  # tokens per second
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0 and self.tokens < self.capacity:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a newly reserved request could go out."""
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1 and self.rate > 0:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def reserve(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def settled(self, now: float) -> bool:
+        """Back to full and not blocked: nothing left here worth remembering."""
+        self._refill(now)
+        return self.blocked_until <= now and self.tokens >= self.capacity
+
+    def observe(self, limit: Optional[float], remaining: Optional[float], reset: Optional[float]) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        if limit is not None and limit > 0:
+            self.capacity = limit
+        if remaining is not None and reset and self.capacity != float("inf"):
+            # Our reservations may already be ahead of the provider's count
+            self.tokens = min(self.tokens, remaining)
+            self.rate = max(self.capacity - remaining, 1.0) / reset
+
+
+@dataclass
+class KeyUsage:
+    """Per-key counters, also used by the key pools to pick the next key."""
+
+    requests: int = 0
+    rate_limited: int = 0
+    unauthorized: int = 0
+    last_limited_at: float = 0.0  # monotonic; 0 = never
+    benched_until: float = 0.0  # out of rotation until then (monotonic)
+    last_used: float = 0.0  # monotonic; for evicting idle keys
+
+
+class RateLimitScheduler:
+    """
+    Token buckets per (provider, API key), shared by every client in the
+    process (chat, streaming, background tasks and the model prober).
+
+    Budgets are learned from response headers: Groq's x-ratelimit-*-requests
+    drive the request bucket, an exhausted x-ratelimit-remaining-tokens blocks
+    the key until x-ratelimit-reset-tokens, and retry-after (both providers
+    send it on 429) blocks it for that long plus jitter. Requests wait up to
+    `max_wait` seconds for a slot instead of failing. A 429 or 401 also
+    benches the key for `bench_rate_limited` / `bench_unauthorized` seconds,
+    which key pools (app/services/key_pool.py) honour when picking keys.
+
+    Users bring their own keys, so a key nobody has used for `idle_ttl`
+    seconds is forgotten (bucket and counters) once it is neither blocked,
+    benched nor short of tokens; it starts over from unlimited if it comes
+    back. The sweep runs at most once per `idle_ttl` from usage()/acquire().
+    """
+
+    def __init__(
+        self,
+        max_wait: float,
+        retries: int,
+        backoff_base: float,
+        bench_rate_limited: float,
+        bench_unauthorized: float,
+        idle_ttl: float,
+    ):
+        self.max_wait = max_wait
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.bench_rate_limited = bench_rate_limited
+        self.bench_unauthorized = bench_unauthorized
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._usage: Dict[Tuple[str, str], KeyUsage] = {}
+        self.idle_ttl = idle_ttl
+        self.evicted = 0
+        self._last_sweep = time.monotonic()
+
+    def key_for(self, request: httpx.Request) -> Optional[Tuple[str, str]]:
+        provider = PROVIDER_HOSTS.get(request.url.host)
+        if provider is None:
+            return None
+        auth = request.headers.get("authorization", "")
+        return provider, key_fingerprint(auth.removeprefix("Bearer ").strip())
+
+    def _key_usage(self, key: Tuple[str, str], now: float) -> KeyUsage:
+        self._evict_idle(now)
+        usage = self._usage.get(key)
+        if usage is None:
+            usage = self._usage[key] = KeyUsage()
+        usage.last_used = now
+        return usage
+
+    def _evict_idle(self, now: float) -> None:
+        if now - self._last_sweep < self.idle_ttl:
+            return
+        self._last_sweep = now
+        cutoff = now - self.idle_ttl
+        for key in set(self._usage) | set(self._buckets):
+            usage = self._usage.get(key)
+            bucket = self._buckets.get(key)
+            if usage is not None and (
+                usage.last_used > cutoff or usage.benched_until > now
+            ):
+                continue
+            if bucket is not None and (
+                bucket._updated > cutoff or not bucket.settled(now)
+            ):
+                continue
+            self._usage.pop(key, None)
+            self._buckets.pop(key, None)
+            self.evicted += 1
+
+    def usage(self, provider: str, api_key: str) -> KeyUsage:
+        return self._key_usage((provider.lower(), key_fingerprint(api_key)), time.monotonic())
+
+    def _bucket(self, key: Tuple[str, str]) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket()
+        return bucket
+
+    def wait_time(self, key: Tuple[str, str]) -> float:
+        return self._bucket(key).wait_time(time.monotonic())
+
+    async def acquire(self, key: Tuple[str, str], deadline: float) -> None:
+        """Queue for a slot; raises RateLimitExceeded if it would pass `deadline`."""
+        bucket = self._bucket(key)
+        now = time.monotonic()
+        wait = bucket.wait_time(now)
+        if now + wait > deadline:
+            raise RateLimitExceeded(
+                f"{key[0]} rate limit: next slot in {wait:.1f}s"
+            )
+        bucket.reserve(now)
+        self._key_usage(key, now).requests += 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def block(self, key: Tuple[str, str], seconds: float) -> None:
+        self._bucket(key).block(seconds)
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, self.backoff_base * 2**attempt)
+
+    def observe(self, key: Tuple[str, str], response: httpx.Response) -> None:
+        headers = response.headers
+        bucket = self._bucket(key)
+        bucket.observe(
+            _header_float(headers, "x-ratelimit-limit-requests"),
+            _header_float(headers, "x-ratelimit-remaining-requests"),
+            parse_duration(headers.get("x-ratelimit-reset-requests")),
+        )
+        remaining_tokens = _header_float(headers, "x-ratelimit-remaining-tokens")
+        if remaining_tokens is not None and remaining_tokens <= 0:
+            reset_tokens = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+            if reset_tokens:
+                bucket.block(reset_tokens)
+        if response.status_code == 429:
+            retry_after = parse_duration(headers.get("retry-after"))
+            bucket.block((retry_after or 0.0) + self.backoff(0))
+            usage = self._key_usage(key, time.monotonic())
+            usage.rate_limited += 1
+            usage.last_limited_at = time.monotonic()
+            usage.benched_until = max(
+                usage.benched_until,
+                usage.last_limited_at + max(self.bench_rate_limited, retry_after or 0.0),
+            )
+        elif response.status_code == 401:
+            usage = self._key_usage(key, time.monotonic())
+            usage.unauthorized += 1
+            usage.benched_until = time.monotonic() + self.bench_unauthorized
+
+    def snapshot(self) -> Dict[str, Dict]:
+        now = time.monotonic()
+        out = {}
+        for (provider, key_hash), bucket in self._buckets.items():
+            bucket._refill(now)
+            usage = self._usage.get((provider, key_hash), KeyUsage())
+            out[f"{provider}:{key_hash}"] = {
+                "capacity": None if bucket.capacity == float("inf") else bucket.capacity,
+                "tokens": None if bucket.tokens == float("inf") else round(bucket.tokens, 2),
+                "refill_per_sec": round(bucket.rate, 4),
+                "blocked_for": round(max(0.0, bucket.blocked_until - now), 2),
+                "requests": usage.requests,
+                "rate_limited": usage.rate_limited,
+                "unauthorized": usage.unauthorized,
+                "benched_for": round(max(0.0, usage.benched_until - now), 2),
+            }
+        return out
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that queues provider requests on the scheduler's token
+    buckets and retries 429 responses with jittered backoff while the wait
+    still fits into the scheduler's `max_wait`. Once it does not, the 429 is
+    returned (or RateLimitExceeded raised) so the router can fall back.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, scheduler: RateLimitScheduler):
+        self._transport = transport
+        self._scheduler = scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = self._scheduler.key_for(request)
+        if key is None:
+            return await self._transport.handle_async_request(request)
+
+        deadline = time.monotonic() + self._scheduler.max_wait
+        attempt = 0
+        while True:
+            await self._scheduler.acquire(key, deadline)
+            response = await self._transport.handle_async_request(request)
+            self._scheduler.observe(key, response)
+            if response.status_code != 429 or attempt >= self._scheduler.retries:
+                return response
+            attempt += 1
+            # retry-after already blocks the key; back off further on repeats
+            self._scheduler.block(key, self._scheduler.backoff(attempt))
+            if time.monotonic() + self._scheduler.wait_time(key) > deadline:
+                return response
+            await response.aclose()
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# One scheduler per process so every client shares the same per-key budgets
+rate_scheduler = RateLimitScheduler(
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_RETRIES,
+    RATE_LIMIT_BACKOFF_BASE,
+    KEY_BENCH_RATE_LIMITED,
+    KEY_BENCH_UNAUTHORIZED,
+    RATE_LIMIT_IDLE_TTL,
+)
@@ -1,7 +1,11 @@
 # app/db/crud.py
+import base64
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, true, tuple_
 from sqlalchemy.future import select
-from app.auth.models import ChatMessage
+from app.auth.models import ChatMessage, ChatSession
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 
@@ -32,3 +36,159 @@ async def get_recent_messages(db: AsyncSession, user_id: UUID, limit: int = 10):
         .limit(limit)
     )
     return list(reversed(result.scalars().all()))
+
+
+def _after_message(after_message_id: Optional[UUID]):
+    """Filter for messages newer than `after_message_id` (no-op when None)."""
+    if after_message_id is None:
+        return true()
+    cutoff = (
+        select(ChatMessage.created_at)
+        .where(ChatMessage.id == after_message_id)
+        .scalar_subquery()
+    )
+    return ChatMessage.created_at > cutoff
+
+
+async def get_session_tail(
+    db: AsyncSession,
+    session_id: UUID,
+    limit: int,
+    after_message_id: Optional[UUID] = None,
+):
+    """
+    Latest `limit` messages of a session, newest first. With
+    `after_message_id`, only messages created after that one are returned.
+    """
+    result = await db.execute(
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)
+        .where(_after_message(after_message_id))
+        .order_by(ChatMessage.created_at.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def get_session_messages_after(
+    db: AsyncSession,
+    session_id: UUID,
+    after_message_id: Optional[UUID] = None,
+    limit: Optional[int] = None,
+):
+    """Messages of a session after `after_message_id`, oldest first."""
+    stmt = (
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)
+        .where(_after_message(after_message_id))
+        .order_by(ChatMessage.created_at.asc())
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+# -------------------------------------------------------------------------
+# KEYSET PAGINATION
+# -------------------------------------------------------------------------
+# A cursor is the (created_at, id) of the last row of the previous page, so
+# the next page is an index range scan instead of an OFFSET.
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Raises ValueError for malformed cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def list_user_sessions(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: int,
+    cursor: Optional[str] = None,
+    preview_chars: int = 120,
+) -> Tuple[List, Optional[str]]:
+    """
+    One page of a user's sessions, newest first, with message count and a
+    preview of the last message. Returns (rows, next_cursor).
+    """
+    message_count = (
+        select(func.count(ChatMessage.id))
+        .where(ChatMessage.session_id == ChatSession.id)
+        .correlate(ChatSession)
+        .scalar_subquery()
+    )
+    last_message = (
+        select(func.substr(ChatMessage.content, 1, preview_chars))
+        .where(ChatMessage.session_id == ChatSession.id)
+        .order_by(ChatMessage.created_at.desc())
+        .limit(1)
+        .correlate(ChatSession)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            ChatSession.id,
+            ChatSession.title,
+            ChatSession.created_at,
+            message_count.label("message_count"),
+            last_message.label("last_message_preview"),
+        )
+        .where(ChatSession.user_id == user_id)
+        .order_by(ChatSession.created_at.desc(), ChatSession.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, session_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(ChatSession.created_at, ChatSession.id)
+            < tuple_(created_at, session_id)
+        )
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+async def list_session_messages(
+    db: AsyncSession,
+    session_id: UUID,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[ChatMessage], Optional[str]]:
+    """
+    One page of a session's messages walking backwards in time: the newest
+    `limit` messages before `cursor`, returned oldest first for display.
+    `next_cursor` points at older messages.
+    """
+    stmt = (
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, message_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(ChatMessage.created_at, ChatMessage.id)
+            < tuple_(created_at, message_id)
+        )
+
+    messages = list((await db.execute(stmt)).scalars().all())
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        next_cursor = encode_cursor(messages[-1].created_at, messages[-1].id)
+    messages.reverse()
+    return messages, next_cursor
@@ -2,6 +2,7 @@
 let currentUserId = null; // 🔐 Global user ID
 let currentSessionId = localStorage.getItem("chat_session_id") || null;
 let chatSessions = [];
+let sessionsCursor = null; // 📄 next page of the session list
 let isLogin = true;
 //const API_BASE = "http://192.168.100.4:2022"; // Adjust to your backend
 const API_BASE = "http://localhost:2000"; // Adjust to your backend
@@ -65,6 +66,7 @@ form.addEventListener("submit", async (e) => {
         model: model,
         category: category,
         web_search: webSearch,
+        stream: true,
       }),
     });
 
@@ -87,8 +89,8 @@ form.addEventListener("submit", async (e) => {
       throw new Error(errorMessage);
     }
 
-    // ✅ Parse backend response
-    const data = await response.json();
+    // ✅ Relay streamed tokens into the bot bubble
+    const data = await readChatStream(response, streamBubble);
 
     // 💾 Store new session_id if provided
     if (data.session_id && data.session_id !== currentSessionId) {
@@ -99,9 +101,6 @@ form.addEventListener("submit", async (e) => {
 
     await fetchAndRenderSessions();
 
-    // 🧠 Merge model + response for display
-    const mergedResponse = `**|\`${data.model}\`|**\n\n\n${data.response}`;
-
     // 🔄 Update dropdown to reflect actual model used
     const modelSelect = document.getElementById("model-select");
     if (modelSelect && data.model) {
@@ -115,8 +114,6 @@ form.addEventListener("submit", async (e) => {
       modelSelect.value = data.model;
     }
 
-    // 🧠 Update streamed bot response
-    fakeStreamText(mergedResponse, streamBubble, 1);
     scrollToBottom();
   } catch (err) {
     // 💥 Remove broken bot bubble if render failed
@@ -286,6 +283,7 @@ async function fetchAndRenderSessions(loadFirstSession = false) {
 
   const data = await res.json();
   chatSessions = data.sessions;
+  sessionsCursor = data.next_cursor;
   renderSidebarSessions(chatSessions);
 
   if (loadFirstSession) {
@@ -354,6 +352,35 @@ function renderSidebarSessions(sessions) {
     container.appendChild(dropdown);
     sidebar.appendChild(container);
   });
+
+  // 📄 More sessions on the server
+  if (sessionsCursor) {
+    const moreBtn = document.createElement("button");
+    moreBtn.className =
+      "w-full text-center px-3 py-2 text-sm text-gray-400 hover:text-white";
+    moreBtn.textContent = "Load more chats";
+    moreBtn.onclick = loadMoreSessions;
+    sidebar.appendChild(moreBtn);
+  }
+}
+//************************************************************************ */
+async function loadMoreSessions() {
+  const token = localStorage.getItem("token");
+  if (!token || !sessionsCursor) return;
+
+  const res = await fetch(
+    `${API_BASE}/get_sessions?cursor=${encodeURIComponent(sessionsCursor)}`,
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
+  if (!res.ok) {
+    console.error("Failed to fetch more sessions");
+    return;
+  }
+
+  const data = await res.json();
+  chatSessions = chatSessions.concat(data.sessions);
+  sessionsCursor = data.next_cursor;
+  renderSidebarSessions(chatSessions);
 }
 //************************************************************************ */
 async function deleteChatSession(sessionId) {
@@ -406,16 +433,8 @@ async function loadChatFromSession(sessionMeta) {
 
     const sessionData = await response.json();
 
-    // Render all messages from selected session
-    sessionData.messages.forEach((msg) => {
-      let displayContent = msg.content;
-      console.log(msg.model);
-      if (msg.role === "assistant") {
-        displayContent = `**|\`${msg.model}\`|**\n\n\n${msg.content}`;
-      }
-      console.log(displayContent);
-      createBubble(msg.role, displayContent);
-    });
+    // Render the latest page of messages from selected session
+    renderMessagePage(sessionData);
     scrollToBottom();
   } catch (err) {
     createBubble("bot", `❌ Failed to load chat: ${err.message}`);
@@ -423,6 +442,57 @@ async function loadChatFromSession(sessionMeta) {
   }
 }
 //************************************************************************ */
+// Render one page of /chat/session/{id}/messages above the messages already
+// shown, with a "load earlier" button while older pages remain.
+function renderMessagePage(sessionData) {
+  const oldButton = document.getElementById("load-earlier-messages");
+  if (oldButton) oldButton.remove();
+  const anchor = chatBox.firstChild;
+
+  sessionData.messages.forEach((msg) => {
+    let displayContent = msg.content;
+    if (msg.role === "assistant") {
+      displayContent = `**|\`${msg.model}\`|**\n\n\n${msg.content}`;
+    }
+    const bubble = createBubble(msg.role, displayContent);
+    if (anchor) chatBox.insertBefore(bubble, anchor);
+  });
+
+  if (sessionData.next_cursor) {
+    const earlierBtn = document.createElement("button");
+    earlierBtn.id = "load-earlier-messages";
+    earlierBtn.className =
+      "w-full text-center py-2 text-sm text-gray-500 hover:text-black";
+    earlierBtn.textContent = "Load earlier messages";
+    earlierBtn.onclick = () =>
+      loadEarlierMessages(sessionData.id, sessionData.next_cursor);
+    chatBox.insertBefore(earlierBtn, chatBox.firstChild);
+  }
+}
+//************************************************************************ */
+async function loadEarlierMessages(sessionId, cursor) {
+  const token = localStorage.getItem("token");
+  const headers = token ? { Authorization: `Bearer ${token}` } : {};
+
+  const response = await fetch(
+    `${API_BASE}/chat/session/${sessionId}/messages?cursor=${encodeURIComponent(
+      cursor
+    )}`,
+    { headers }
+  );
+  if (!response.ok) {
+    console.error("Failed to load earlier messages");
+    return;
+  }
+
+  // Ignore the page if the user switched chats meanwhile
+  if (sessionId !== currentSessionId) return;
+  renderMessagePage(await response.json());
+  requestAnimationFrame(() => {
+    chatBox.scrollTop = 0;
+  });
+}
+//************************************************************************ */
 async function createNewChat() {
   const token = localStorage.getItem("token");
   const userRes = await fetch(`${API_BASE}/profile`, {
@@ -480,6 +550,7 @@ async function resendMessage(text) {
         model: model,
         category: category,
         web_search: webSearch, // 👈 Added flag here
+        stream: true,
       }),
     });
 
@@ -501,16 +572,13 @@ async function resendMessage(text) {
       }
       throw new Error(errorMessage);
     }
-    const data = await response.json();
+    const data = await readChatStream(response, streamBubble);
     if (data.session_id && data.session_id !== currentSessionId) {
       currentSessionId = data.session_id;
       localStorage.setItem("chat_session_id", currentSessionId);
     }
 
     await fetchAndRenderSessions();
-
-    // 🧠 Merge model + response for display
-    const mergedResponse = `**|\`${data.model}\`|**\n\n\n${data.response}`;
     // 🔄 Update dropdown to reflect actual model used
     const modelSelect = document.getElementById("model-select");
     if (modelSelect && data.model) {
@@ -527,8 +595,6 @@ async function resendMessage(text) {
 
       modelSelect.value = data.model;
     }
-    // 🧠 Update streamed bot response
-    fakeStreamText(mergedResponse, streamBubble, 1);
     scrollToBottom();
   } catch (err) {
     if (streamBubble?.wrapper?.parentNode) {
@@ -673,6 +739,52 @@ function fakeStreamText(text, streamBubble, baseDelay = 20) {
   step();
 }
 //************************************************************************ */
+// Read the SSE reply of /chat (stream: true) into a streamed bubble.
+// Resolves with { model, session_id } once the stream is complete.
+async function readChatStream(response, streamBubble) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let pending = "";
+  let meta = {};
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    pending += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = pending.indexOf("\n\n")) !== -1) {
+      const frame = pending.slice(0, boundary);
+      pending = pending.slice(boundary + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+
+      if (event === "meta") {
+        meta = payload;
+        // 🧠 Model header first, then tokens as they arrive
+        streamBubble.appendParsed(`**|\`${payload.model}\`|**\n\n\n`);
+      } else if (event === "token") {
+        streamBubble.appendParsed(payload.content);
+        scrollToBottom();
+      } else if (event === "done") {
+        meta = { ...meta, ...payload };
+      } else if (event === "error") {
+        throw new Error(payload.error);
+      }
+    }
+  }
+
+  streamBubble.finish();
+  return meta;
+}
+//************************************************************************ */
 // Create bubble functions
 function createBubble(role, content) {
   const wrapper = document.createElement("div");
@@ -1,14 +1,40 @@
 # app/llm_client.py
+import asyncio
+import json
 import time
 
 # from dotenv import load_dotenv
-from typing import List, Dict, Optional, Tuple
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Tuple
 from httpx import AsyncClient
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.auth.models import (
-    AIModel,
-)  # Assuming AIModel has fields: model_id, provider, category, total_requests, total_response_time, average_response_time
+from app.core.config import (
+    CIRCUIT_COOLDOWN,
+    CIRCUIT_FAILURE_WINDOW,
+    CIRCUIT_MODEL_FAILURES,
+    CIRCUIT_PROVIDER_FAILURES,
+    HEDGE_LATENCY_MULTIPLIER,
+    HEDGE_MAX_DELAY,
+    HEDGE_MAX_INFLIGHT,
+    HEDGE_MIN_DELAY,
+    HEDGING_ENABLED,
+    LATENCY_BUCKET_SECONDS,
+    LATENCY_EWMA_ALPHA,
+    LATENCY_FLUSH_INTERVAL,
+    LATENCY_MIN_SAMPLES,
+    LATENCY_WINDOW_SIZE,
+    MODEL_CATALOG_TTL,
+    MODEL_STATS_FLUSH_INTERVAL,
+    RESPONSE_CACHE_PERSIST,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+)
+from app.services.circuit_breaker import CircuitBreakers, CircuitOpenError
+from app.services.conversation_window import count_tokens, fit_messages, message_tokens
+from app.services.key_pool import ApiKey, resolve_key
+from app.services.latency_telemetry import LatencyTelemetry
+from app.services.model_catalog import CatalogModel, ModelCatalog
+from app.services.model_stats import ModelStatsAggregator
+from app.services.response_cache import ResponseCache, cache_key
 
 """ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -18,12 +44,20 @@ MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY") """
 # -------------------------------------------------------------------------
 # API CALL HELPERS
 # -------------------------------------------------------------------------
-async def call_groq_api(
-    messages: List[Dict[str, str]], model: str, client: AsyncClient, groq_api_key: str
+async def _post_chat_completion(
+    url: str,
+    api_key: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    client: AsyncClient,
 ) -> str:
-    url = "https://api.groq.com/openai/v1/chat/completions"
+    """
+    Non-streamed OpenAI-compatible chat completion (Groq and Mistral share the
+    format). Latency, success and the reported token usage of every call go
+    to the latency telemetry.
+    """
     headers = {
-        "Authorization": f"Bearer {groq_api_key}",
+        "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
     payload = {
@@ -32,12 +66,31 @@ async def call_groq_api(
         "temperature": 0.7,
         "stream": False,
     }
-    response = await client.post(url, headers=headers, json=payload)
-    response.raise_for_status()
+    start = time.perf_counter()
+    try:
+        response = await client.post(url, headers=headers, json=payload)
+        response.raise_for_status()
+    except Exception:
+        latency_telemetry.record(model, time.perf_counter() - start, ok=False)
+        raise
     parsed = response.json()
+    usage = parsed.get("usage") or {}
+    latency_telemetry.record(
+        model,
+        time.perf_counter() - start,
+        prompt_tokens=usage.get("prompt_tokens") or 0,
+        completion_tokens=usage.get("completion_tokens") or 0,
+    )
     return parsed.get("choices", [])[0].get("message", {}).get("content", "")
 
 
+async def call_groq_api(
+    messages: List[Dict[str, str]], model: str, client: AsyncClient, groq_api_key: str
+) -> str:
+    url = "https://api.groq.com/openai/v1/chat/completions"
+    return await _post_chat_completion(url, groq_api_key, messages, model, client)
+
+
 async def call_mistral_api(
     messages: List[Dict[str, str]],
     model: str,
@@ -45,43 +98,105 @@ async def call_mistral_api(
     mistral_api_key: str,
 ) -> str:
     url = "https://api.mistral.ai/v1/chat/completions"
+    print("provider: MistralAI:", model)
+    return await _post_chat_completion(url, mistral_api_key, messages, model, client)
+
+
+async def _stream_chat_completion(
+    url: str,
+    api_key: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    client: AsyncClient,
+) -> AsyncIterator[str]:
+    """
+    POST an OpenAI-compatible chat completion with "stream": True and yield
+    the content deltas as they arrive (both Groq and Mistral speak this SSE
+    dialect: `data: {...}` lines terminated by `data: [DONE]`).
+    """
     headers = {
-        "Authorization": f"Bearer {mistral_api_key}",
+        "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
+        "Accept": "text/event-stream",
     }
     payload = {
         "model": model,
         "messages": messages,
         "temperature": 0.7,
-        "stream": False,
+        "stream": True,
     }
-    print("provider: MistralAI:", model)
-    response = await client.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-    parsed = response.json()
-    return parsed.get("choices", [])[0].get("message", {}).get("content", "")
+    async with client.stream("POST", url, headers=headers, json=payload) as response:
+        if response.is_error:
+            await response.aread()
+            response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            choices = chunk.get("choices") or []
+            if not choices:
+                continue
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+def stream_groq_api(
+    messages: List[Dict[str, str]], model: str, client: AsyncClient, groq_api_key: str
+) -> AsyncIterator[str]:
+    url = "https://api.groq.com/openai/v1/chat/completions"
+    return _stream_chat_completion(url, groq_api_key, messages, model, client)
+
+
+def stream_mistral_api(
+    messages: List[Dict[str, str]],
+    model: str,
+    client: AsyncClient,
+    mistral_api_key: str,
+) -> AsyncIterator[str]:
+    url = "https://api.mistral.ai/v1/chat/completions"
+    print("provider: MistralAI (stream):", model)
+    return _stream_chat_completion(url, mistral_api_key, messages, model, client)
 
 
 # -------------------------------------------------------------------------
 # DB UPDATE HELPERS
 # -------------------------------------------------------------------------
-async def update_model_stats(
-    db: AsyncSession, model_id: str, response_time: float
+# Write-behind stats: flushed periodically and on shutdown from the lifespan
+model_stats = ModelStatsAggregator(MODEL_STATS_FLUSH_INTERVAL)
+
+# Recent latency per model for routing; every flush re-ranks the catalog so
+# scores follow the live numbers
+latency_telemetry = LatencyTelemetry(
+    LATENCY_BUCKET_SECONDS,
+    LATENCY_FLUSH_INTERVAL,
+    LATENCY_WINDOW_SIZE,
+    LATENCY_EWMA_ALPHA,
+    LATENCY_MIN_SAMPLES,
+    on_flush=lambda: model_catalog.rerank(),
+)
+
+
+def update_model_stats(
+    model_id: str,
+    response_time: float,
+    first_token_time: Optional[float] = None,
 ) -> None:
-    """Update request count and response time metrics for a model."""
-    result = await db.execute(select(AIModel).where(AIModel.model_id == model_id))
-    model_obj = result.scalar_one_or_none()
-    if model_obj:
-        model_obj.total_requests = (model_obj.total_requests or 0) + 1
-        model_obj.total_response_time = (
-            model_obj.total_response_time or 0.0
-        ) + response_time
-        model_obj.average_response_time = (
-            model_obj.total_response_time / model_obj.total_requests
-        )
-        db.add(model_obj)
-        await db.commit()
-        await db.refresh(model_obj)
+    """
+    Record request count and response time metrics for a model.
+    `first_token_time` is only known for streamed calls; when given it also
+    feeds the running time-to-first-token average. The numbers are
+    accumulated in memory and written by the background flusher, so this
+    never waits on the database.
+    """
+    model_stats.record(model_id, response_time, first_token_time)
+
+
+# Every value estimate_complexity can return; rankings are precomputed per bucket
+COMPLEXITY_BUCKETS = (0.1, 0.5, 0.9)
 
 
 def estimate_complexity(messages: List[Dict[str, str]]) -> float:
@@ -104,8 +219,13 @@ def compute_model_score(model, complexity: float) -> float:
     # Normalize rating (assume 1–5 scale)
     rating = (model.rating or 3) / 5.0
 
-    # Normalize latency (invert: lower is better)
-    latency = model.average_response_time or float("inf")
+    # Normalize latency (invert: lower is better). Prefer the recent EWMA/p95
+    # blend; the lifetime mean in the DB only covers models with no recent calls
+    latency = (
+        latency_telemetry.routing_latency(model.model_id)
+        or model.average_response_time
+        or float("inf")
+    )
     norm_latency = 1 / (1 + latency)  # maps latency -> (0,1]
 
     # Weight factors (α for rating, β for latency)
@@ -115,6 +235,140 @@ def compute_model_score(model, complexity: float) -> float:
     return (alpha * rating) + (beta * norm_latency)
 
 
+# Process-wide snapshot of ai_models used for routing (no SQL on the hot path)
+model_catalog = ModelCatalog(compute_model_score, COMPLEXITY_BUCKETS, MODEL_CATALOG_TTL)
+
+# Exact-match replies for callers that pass cache=True
+response_cache = ResponseCache(
+    RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, RESPONSE_CACHE_PERSIST
+)
+
+# Per-model / per-provider health; open circuits are skipped by the router
+circuit_breakers = CircuitBreakers(
+    CIRCUIT_MODEL_FAILURES,
+    CIRCUIT_PROVIDER_FAILURES,
+    CIRCUIT_FAILURE_WINDOW,
+    CIRCUIT_COOLDOWN,
+)
+
+
+# -------------------------------------------------------------------------
+# CANDIDATE SELECTION
+# -------------------------------------------------------------------------
+def normalize_response(m: str, resp: str) -> str:
+    """Remove provider prefixes or brackets, normalize whitespace."""
+    if isinstance(resp, list):
+        resp = " ".join(
+            part.get("text", "") for part in resp if part.get("type") == "text"  # type: ignore
+        )
+    if resp.lower().startswith(m.lower() + ":"):
+        resp = resp[len(m) + 1 :].lstrip()
+    if resp.startswith(f"[{m}]"):
+        resp = resp[len(f"[{m}]") :].lstrip()
+    return resp.strip()
+
+
+def _provider_has_key(
+    provider: str, groq_api_key: ApiKey, mistral_api_key: ApiKey
+) -> bool:
+    if provider == "groq":
+        return bool(groq_api_key)
+    if provider == "mistral":
+        return bool(mistral_api_key)
+    return True
+
+
+async def _requested_candidate(
+    model: str,
+    category: str,
+    db: AsyncSession,
+    groq_api_key: ApiKey,
+    mistral_api_key: ApiKey,
+    catalog_entry: Optional[CatalogModel] = None,
+) -> Optional[Tuple[str, str]]:
+    """
+    Return (model_id, provider) for the requested model when it can serve the
+    requested category with the keys the user has, otherwise None.
+    `catalog_entry` is the model's catalog row when the caller already has it.
+    """
+    requested_model = catalog_entry
+    if requested_model is None:
+        await model_catalog.ensure_fresh(db)
+        requested_model = await model_catalog.lookup(db, model)
+
+    if not requested_model:
+        raise ValueError(f"Requested model {model} not found in DB")
+
+    requested_provider = requested_model.provider.lower()
+    requested_category = (
+        requested_model.category.lower() if requested_model.category else None
+    )
+
+    # Skip if provider's key is missing
+    if not _provider_has_key(requested_provider, groq_api_key, mistral_api_key):
+        print(f"⚠️ Skipping {model} because {requested_model.provider} API key not provided")
+        return None
+
+    if not circuit_breakers.available(model, requested_provider):
+        print(f"🔌 Skipping {model}: circuit open")
+        return None
+
+    if requested_category == category.lower() or (
+        category.lower() == "text" and requested_category == "multimodal"
+    ):
+        return model, requested_provider
+    return None
+
+
+def _candidate_messages(
+    messages: List[Dict[str, str]],
+    model_id: str,
+    catalog_entry: Optional[CatalogModel],
+) -> List[Dict[str, str]]:
+    """`messages` trimmed to `model_id`'s context window (see fit_messages)."""
+    entry = (
+        catalog_entry
+        if catalog_entry is not None and catalog_entry.model_id == model_id
+        else model_catalog.get(model_id)
+    )
+    return fit_messages(messages, entry.context_window if entry else None)
+
+
+async def _fallback_candidates(
+    messages: List[Dict[str, str]],
+    category: str,
+    db: AsyncSession,
+    groq_api_key: ApiKey,
+    mistral_api_key: ApiKey,
+) -> List[Tuple[str, str]]:
+    """Category models usable with the given keys, best score first."""
+    await model_catalog.ensure_fresh(db)
+    complexity = estimate_complexity(messages)
+
+    # Rankings are precomputed per complexity bucket; only filter by keys here
+    candidates_scored = [
+        c
+        for c in model_catalog.ranked(category, complexity)
+        if _provider_has_key(c.provider.lower(), groq_api_key, mistral_api_key)
+    ]
+
+    if not candidates_scored:
+        raise RuntimeError(
+            f"No '{category}' model for your API keys. Add another API key or Switch Mode"
+        )
+
+    healthy = [
+        (c.model_id, c.provider.lower())
+        for c in candidates_scored
+        if circuit_breakers.available(c.model_id, c.provider)
+    ]
+    if not healthy:
+        raise RuntimeError(
+            f"All '{category}' models are temporarily unavailable. Please retry shortly."
+        )
+    return healthy
+
+
 # -------------------------------------------------------------------------
 # MAIN ROUTER
 # -------------------------------------------------------------------------
@@ -124,31 +378,66 @@ async def get_model_response(
     category: str,
     db: AsyncSession,
     client: AsyncClient,
-    groq_api_key: Optional[str] = None,
-    mistral_api_key: Optional[str] = None,
+    groq_api_key: ApiKey = None,
+    mistral_api_key: ApiKey = None,
+    cache: bool = False,
+    catalog_entry: Optional[CatalogModel] = None,
 ) -> Tuple[str, str]:
     """
     Route request to a model. If requested model fails, or if it belongs to a
     different category, fallback to best available model in requested category.
-    Skips providers if their API keys are not provided.
+    Skips providers if their API keys are not provided. With HEDGING_ENABLED
+    the candidates race instead of strictly waiting on each other (see
+    _hedged_race). With `cache`, an identical earlier prompt for the same
+    model/category is answered from the response cache. Callers that already
+    resolved `model` in the catalog pass it as `catalog_entry`.
     Returns: (response_text, used_model_id)
     """
+    if not cache:
+        return await _route_model_response(
+            messages,
+            model,
+            category,
+            db,
+            client,
+            groq_api_key,
+            mistral_api_key,
+            catalog_entry,
+        )
+
+    key = cache_key(messages, model, category)
+    cached = await response_cache.get(db, key)
+    if cached is not None:
+        messages.append({"role": "assistant", "content": cached[0]})
+        return cached
+    raw, used_model = await _route_model_response(
+        messages,
+        model,
+        category,
+        db,
+        client,
+        groq_api_key,
+        mistral_api_key,
+        catalog_entry,
+    )
+    response_cache.set(key, model, raw, used_model)
+    return raw, used_model
+
+
+async def _route_model_response(
+    messages: List[Dict[str, str]],
+    model: str,
+    category: str,
+    db: AsyncSession,
+    client: AsyncClient,
+    groq_api_key: ApiKey,
+    mistral_api_key: ApiKey,
+    catalog_entry: Optional[CatalogModel] = None,
+) -> Tuple[str, str]:
     if category in ("vision", "audio"):
         print("MODELS NOT AVAILABLE")
         raise RuntimeError("vision and audio models are not available right now")
 
-    async def normalize_response(m: str, resp: str) -> str:
-        """Remove provider prefixes or brackets, normalize whitespace."""
-        if isinstance(resp, list):
-            resp = " ".join(
-                part.get("text", "") for part in resp if part.get("type") == "text"  # type: ignore
-            )
-        if resp.lower().startswith(m.lower() + ":"):
-            resp = resp[len(m) + 1 :].lstrip()
-        if resp.startswith(f"[{m}]"):
-            resp = resp[len(f"[{m}]") :].lstrip()
-        return resp.strip()
-
     async def try_model(m: str, provider: str) -> Tuple[str, str]:
         """Execute a model call and update stats."""
         print("Routing to:", m, "| Provider:", provider)
@@ -158,52 +447,66 @@ async def get_model_response(
         if provider == "mistral" and not mistral_api_key:
             raise RuntimeError("Skipped Mistral: no API key provided")
 
+        if not circuit_breakers.claim(m, provider):
+            raise CircuitOpenError(f"Circuit open for {m}")
+
+        # A fallback may have a smaller window than the prompt was fit to
+        call_messages = _candidate_messages(messages, m, catalog_entry)
         start = time.perf_counter()
-        if provider == "groq":
-            raw_resp = await call_groq_api(messages, m, client, groq_api_key)  # type: ignore
-        elif provider == "mistral":
-            raw_resp = await call_mistral_api(messages, m, client, mistral_api_key)  # type: ignore
-        else:
-            raise ValueError(f"Unsupported provider: {provider}")
+        try:
+            if provider == "groq":
+                raw_resp = await call_groq_api(call_messages, m, client, resolve_key(groq_api_key))  # type: ignore
+            elif provider == "mistral":
+                raw_resp = await call_mistral_api(call_messages, m, client, resolve_key(mistral_api_key))  # type: ignore
+            else:
+                raise ValueError(f"Unsupported provider: {provider}")
+        except asyncio.CancelledError:
+            # A hedge loser (or an abandoned request): free a probe slot it
+            # may hold, and count how long it had taken so far as a slow
+            # sample, so a model that keeps losing races is ranked down
+            elapsed = time.perf_counter() - start
+            circuit_breakers.release(m, provider)
+            latency_telemetry.record(m, elapsed)
+            update_model_stats(m, elapsed)
+            raise
+        except Exception as e:
+            circuit_breakers.record(m, provider, e)
+            raise
+        circuit_breakers.record(m, provider)
         end = time.perf_counter()
 
         response_time = end - start
-        await update_model_stats(db, m, response_time)
+        update_model_stats(m, response_time)
 
-        clean_text = await normalize_response(m, raw_resp)
+        clean_text = normalize_response(m, raw_resp)
         return clean_text, m
 
-    # ---------------------------------------------------------------------
-    # Fetch requested model
-    # ---------------------------------------------------------------------
-    result = await db.execute(select(AIModel).where(AIModel.model_id == model))
-    requested_model = result.scalar_one_or_none()
-
-    if not requested_model:
-        raise ValueError(f"Requested model {model} not found in DB")
-
-    requested_provider = requested_model.provider.lower()
-    requested_category = (
-        requested_model.category.lower() if requested_model.category else None
+    requested = await _requested_candidate(
+        model, category, db, groq_api_key, mistral_api_key, catalog_entry
     )
 
-    # Skip if provider's key is missing
-    if requested_provider == "groq" and not groq_api_key:
-        print(f"⚠️ Skipping {model} because Groq API key not provided")
-        requested_model = None
-    elif requested_provider == "mistral" and not mistral_api_key:
-        print(f"⚠️ Skipping {model} because Mistral API key not provided")
-        requested_model = None
+    if HEDGING_ENABLED:
+        try:
+            fallbacks = await _fallback_candidates(
+                messages, category, db, groq_api_key, mistral_api_key
+            )
+        except RuntimeError:
+            if not requested:
+                raise
+            fallbacks = []
+        candidates = ([requested] if requested else []) + [
+            c for c in fallbacks if c != requested
+        ]
+        raw, used_model = await _hedged_race(candidates, try_model, category)
+        messages.append({"role": "assistant", "content": raw})
+        return raw, used_model
 
     # ---------------------------------------------------------------------
     # CASE 1: Try requested model if valid
     # ---------------------------------------------------------------------
-    if requested_model and (
-        requested_category == category.lower()
-        or (category.lower() == "text" and requested_category == "multimodal")
-    ):
+    if requested:
         try:
-            raw, used_model = await try_model(model, requested_provider)
+            raw, used_model = await try_model(*requested)
             messages.append({"role": "assistant", "content": raw})
             return raw, used_model
         except Exception as first_err:
@@ -212,35 +515,13 @@ async def get_model_response(
     # ---------------------------------------------------------------------
     # CASE 2: Fallback to category models with valid provider keys
     # ---------------------------------------------------------------------
-    result = await db.execute(select(AIModel).where(AIModel.category == category))
-    candidates = result.scalars().all()
-
-    # Filter out providers without API keys
-    candidates = [
-        c
-        for c in candidates
-        if not (
-            (c.provider.lower() == "groq" and not groq_api_key)
-            or (c.provider.lower() == "mistral" and not mistral_api_key)
-        )
-    ]
-
-    if not candidates:
-        raise RuntimeError(
-            f"No '{category}' model for your API keys. Add another API key or Switch Mode"
-        )
-
-    complexity = estimate_complexity(messages)
-
-    candidates_scored = sorted(
-        candidates, key=lambda m: compute_model_score(m, complexity), reverse=True
+    candidates = await _fallback_candidates(
+        messages, category, db, groq_api_key, mistral_api_key
     )
 
-    for candidate in candidates_scored:
+    for candidate_id, candidate_provider in candidates:
         try:
-            raw, used_model = await try_model(
-                candidate.model_id, candidate.provider.lower()
-            )
+            raw, used_model = await try_model(candidate_id, candidate_provider)
             messages.append({"role": "assistant", "content": raw})
             return raw, used_model
         except RuntimeError:
@@ -248,8 +529,226 @@ async def get_model_response(
             raise
         except Exception as err:
             # Only swallow "soft" errors
-            print(f"⚠️ Candidate model {candidate.model_id} failed: {err}")
+            print(f"⚠️ Candidate model {candidate_id} failed: {err}")
 
     raise RuntimeError(
         f"All models in category '{category}' failed (after filtering by provider keys)."
     )
+
+
+def hedge_delay(model_id: str) -> float:
+    """Seconds to wait on `model_id` before hedging, from its observed latency."""
+    observed = latency_telemetry.recent_p95(model_id)
+    if observed is None:
+        catalog_model = model_catalog.get(model_id)
+        observed = catalog_model.average_response_time if catalog_model else None
+    if not observed:
+        # No latency history yet: be patient rather than doubling traffic
+        return HEDGE_MAX_DELAY
+    return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, observed * HEDGE_LATENCY_MULTIPLIER))
+
+
+async def _hedged_race(
+    candidates: List[Tuple[str, str]],
+    try_model: Callable[[str, str], Awaitable[Tuple[str, str]]],
+    category: str,
+) -> Tuple[str, str]:
+    """
+    Walk `candidates` (best first) like the sequential fallback, but when the
+    newest in-flight call is slower than its hedge_delay, start the next
+    candidate alongside it (at most HEDGE_MAX_INFLIGHT at once). A failed call
+    starts the next candidate immediately. The first success wins, the other
+    calls are cancelled (try_model records each at its elapsed time), and
+    every racer is counted in the hedge stats.
+    """
+    queue = list(candidates)
+    running: Dict[asyncio.Task, str] = {}
+    raced: set = set()
+
+    def launch() -> asyncio.Task:
+        m, provider = queue.pop(0)
+        if running:
+            raced.update(running.values())
+            raced.add(m)
+        task = asyncio.create_task(try_model(m, provider))
+        running[task] = m
+        return task
+
+    try:
+        newest = launch()
+        while running:
+            can_hedge = queue and len(running) < HEDGE_MAX_INFLIGHT
+            done, _ = await asyncio.wait(
+                running,
+                timeout=hedge_delay(running[newest]) if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                newest = launch()
+                print(f"⏱️ Hedging to {running[newest]}")
+                continue
+
+            for task in done:
+                m = running.pop(task)
+                err = task.exception()
+                if err is None:
+                    for racer in raced:
+                        model_stats.record_hedge(racer, won=racer == m)
+                    return task.result()
+                if isinstance(err, RuntimeError):
+                    # Same rule as the sequential path: fatal errors surface
+                    raise err
+                print(f"⚠️ Candidate model {m} failed: {err}")
+
+            # The newest call failed (or nothing is left running): move on now
+            if queue and (not running or newest.done()):
+                newest = launch()
+    finally:
+        for task in running:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()  # mark as retrieved so asyncio doesn't warn
+
+    raise RuntimeError(
+        f"All models in category '{category}' failed (after filtering by provider keys)."
+    )
+
+
+async def stream_model_response(
+    messages: List[Dict[str, str]],
+    model: str,
+    category: str,
+    db: AsyncSession,
+    client: AsyncClient,
+    groq_api_key: ApiKey = None,
+    mistral_api_key: ApiKey = None,
+    cache: bool = False,
+    catalog_entry: Optional[CatalogModel] = None,
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Streaming counterpart of get_model_response with the same routing rules.
+    Yields ("model", used_model_id) once the first token has arrived, then
+    ("token", delta) for every content delta. Falling back to the next
+    candidate is only possible before the first token; a failure mid-stream
+    is raised to the caller. Stats (incl. time-to-first-token) are updated
+    when the stream completes. A `cache` hit is replayed as a single token.
+    """
+    if category in ("vision", "audio"):
+        print("MODELS NOT AVAILABLE")
+        raise RuntimeError("vision and audio models are not available right now")
+
+    key = cache_key(messages, model, category) if cache else None
+    if key is not None:
+        cached = await response_cache.get(db, key)
+        if cached is not None:
+            text, used_model = cached
+            yield "model", used_model
+            yield "token", text
+            messages.append({"role": "assistant", "content": text})
+            return
+
+    def open_stream(
+        m: str, provider: str, call_messages: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        print("Streaming from:", m, "| Provider:", provider)
+        if provider == "groq":
+            if not groq_api_key:
+                raise RuntimeError("Skipped Groq: no API key provided")
+            return stream_groq_api(call_messages, m, client, resolve_key(groq_api_key))  # type: ignore
+        if provider == "mistral":
+            if not mistral_api_key:
+                raise RuntimeError("Skipped Mistral: no API key provided")
+            return stream_mistral_api(call_messages, m, client, resolve_key(mistral_api_key))  # type: ignore
+        raise ValueError(f"Unsupported provider: {provider}")
+
+    async def first_token(
+        m: str, provider: str
+    ) -> Tuple[AsyncIterator[str], str, float, List[Dict[str, str]]]:
+        """Open a stream and wait for its first delta (raises on failure)."""
+        # A fallback may have a smaller window than the prompt was fit to
+        call_messages = _candidate_messages(messages, m, catalog_entry)
+        stream = open_stream(m, provider, call_messages)
+        if not circuit_breakers.claim(m, provider):
+            raise CircuitOpenError(f"Circuit open for {m}")
+        start = time.perf_counter()
+        try:
+            delta = await stream.__anext__()
+        except StopAsyncIteration:
+            delta = ""
+        except asyncio.CancelledError:
+            circuit_breakers.release(m, provider)
+            raise
+        except Exception as e:
+            circuit_breakers.record(m, provider, e)
+            latency_telemetry.record(m, time.perf_counter() - start, ok=False)
+            raise
+        return stream, delta, start, call_messages
+
+    opened = None
+    requested = await _requested_candidate(
+        model, category, db, groq_api_key, mistral_api_key, catalog_entry
+    )
+    if requested:
+        try:
+            opened = (*requested, *await first_token(*requested))
+        except Exception as first_err:
+            print(f"⚠️ Model {model} failed: {first_err}")
+
+    if opened is None:
+        candidates = await _fallback_candidates(
+            messages, category, db, groq_api_key, mistral_api_key
+        )
+        for candidate_id, candidate_provider in candidates:
+            try:
+                opened = (
+                    candidate_id,
+                    candidate_provider,
+                    *await first_token(candidate_id, candidate_provider),
+                )
+                break
+            except RuntimeError:
+                raise
+            except Exception as err:
+                print(f"⚠️ Candidate model {candidate_id} failed: {err}")
+
+    if opened is None:
+        raise RuntimeError(
+            f"All models in category '{category}' failed (after filtering by provider keys)."
+        )
+
+    used_model, used_provider, stream, delta, start, call_messages = opened
+    first_token_time = time.perf_counter() - start
+    parts: List[str] = []
+
+    yield "model", used_model
+    if delta:
+        parts.append(delta)
+        yield "token", delta
+    try:
+        async for delta in stream:
+            parts.append(delta)
+            yield "token", delta
+    except (asyncio.CancelledError, GeneratorExit):
+        # The client went away mid-stream; says nothing about the model
+        circuit_breakers.release(used_model, used_provider)
+        raise
+    except Exception as e:
+        circuit_breakers.record(used_model, used_provider, e)
+        latency_telemetry.record(used_model, time.perf_counter() - start, ok=False)
+        raise
+    circuit_breakers.record(used_model, used_provider)
+
+    response_time = time.perf_counter() - start
+    update_model_stats(used_model, response_time, first_token_time)
+    # Streams carry no usage block, so token counts are estimated
+    latency_telemetry.record(
+        used_model,
+        response_time,
+        prompt_tokens=sum(message_tokens(m) for m in call_messages),
+        completion_tokens=count_tokens("".join(parts)),
+    )
+    reply_text = normalize_response(used_model, "".join(parts))
+    messages.append({"role": "assistant", "content": reply_text})
+    if key is not None:
+        response_cache.set(key, model, reply_text, used_model)
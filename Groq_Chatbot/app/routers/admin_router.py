@@ -0,0 +1,84 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.authentication import AuthenticatedUser, get_current_user, user_cache
+from app.core.config import ADMIN_EMAILS
+from app.core.rate_limit import rate_scheduler
+from app.db.dependencies import get_db
+from app.groq_client import circuit_breakers, latency_telemetry, response_cache
+from app.services.api_key_cache import api_key_cache
+from app.services.latency_telemetry import recent_percentiles
+from app.services.model_prober import model_prober
+from app.services.turn_persistence import message_queue
+
+router = APIRouter(prefix="/admin")
+
+
+def require_admin(
+    user: AuthenticatedUser = Depends(get_current_user),
+) -> AuthenticatedUser:
+    if user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
+
+# ------------------------
+# Router health
+# ------------------------
+@router.get("/circuits")
+async def get_circuits(_: AuthenticatedUser = Depends(require_admin)):
+    """Current breaker state for every provider and model seen so far."""
+    return circuit_breakers.snapshot()
+
+
+@router.get("/rate-limits")
+async def get_rate_limits(_: AuthenticatedUser = Depends(require_admin)):
+    """Learned request budgets per provider key (keys are shown hashed)."""
+    return rate_scheduler.snapshot()
+
+
+@router.get("/latency")
+async def get_latency(
+    minutes: int = Query(60, ge=1, le=7 * 24 * 60),
+    model_id: Optional[str] = None,
+    _: AuthenticatedUser = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Per-model latency percentiles over the last `minutes` from the flushed
+    buckets (all workers), plus this worker's live routing window.
+    """
+    live = latency_telemetry.snapshot()
+    if model_id is not None:
+        live = {k: v for k, v in live.items() if k == model_id}
+    return {
+        "minutes": minutes,
+        "models": await recent_percentiles(db, minutes, model_id),
+        "live": live,
+    }
+
+
+@router.get("/response-cache")
+async def get_response_cache(_: AuthenticatedUser = Depends(require_admin)):
+    """Hit rate of the LLM response cache (this worker)."""
+    return response_cache.stats()
+
+
+@router.get("/auth-cache")
+async def get_auth_cache(_: AuthenticatedUser = Depends(require_admin)):
+    """Hit rates of the authenticated-user and API-key caches (this worker)."""
+    return {"users": user_cache.stats(), "api_keys": api_key_cache.stats()}
+
+
+@router.get("/prober")
+async def get_prober(_: AuthenticatedUser = Depends(require_admin)):
+    """Background model prober status (as seen by this worker)."""
+    return model_prober.snapshot()
+
+
+@router.get("/message-queue")
+async def get_message_queue(_: AuthenticatedUser = Depends(require_admin)):
+    """Write-behind chat message queue (this worker)."""
+    return message_queue.stats()
@@ -2,7 +2,11 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.auth.authentication import get_current_user
+from app.auth.authentication import (
+    AuthenticatedUser,
+    get_current_user,
+    invalidate_cached_user,
+)
 from jose import jwt, JWTError
 import uuid
 from app.auth.schemas import UserCreate, UserLogin, UserOut
@@ -38,7 +42,7 @@ async def register(
     # Create unverified user
     user = User(
         email=user_in.email,
-        hashed_password=hash_password(user_in.password),
+        hashed_password=await hash_password(user_in.password),
         is_verified=False,
     )
     db.add(user)
@@ -86,6 +90,7 @@ async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
     user.is_verified = True
     db.add(user)
     await db.commit()
+    invalidate_cached_user(user.id)
 
     return {"msg": "Email verified successfully"}
 
@@ -98,7 +103,7 @@ async def login(user_in: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == user_in.email))
     user = result.scalars().first()
 
-    if not user or not verify_password(user_in.password, user.hashed_password):
+    if not user or not await verify_password(user_in.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
     if not user.is_verified:
@@ -109,6 +114,6 @@ async def login(user_in: UserLogin, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserOut)
-def get_profile(current_user: User = Depends(get_current_user)):
+def get_profile(current_user: AuthenticatedUser = Depends(get_current_user)):
     print(current_user.email)
     return current_user
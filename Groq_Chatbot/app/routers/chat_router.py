@@ -1,29 +1,71 @@
+import asyncio
+import json
+import time
 import traceback
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional
 from uuid import UUID
 from fastapi import status
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from app.auth.authentication import get_current_user
-from app.auth.models import AIModel, ChatSession, User, UserApiKey
+from app.auth.authentication import (
+    AuthenticatedUser,
+    get_current_user,
+    get_current_user_id,
+)
+from app.auth.models import AIModel, ChatSession, UserApiKey
 from app.auth.schemas import (
     ChatPayload,
     ChatSessionOut,
     ChatSessionCreate,
+    ChatSessionPage,
+    ChatSessionSummary,
     ChatSessionWithMessages,
     UserApiKeyIn,
     AIModelRead,
     UserApiKeyOut,
+    UserApiKeyUsage,
+)
+from app.services.api_key_cache import api_key_cache
+from app.services.model_catalog import CatalogModel
+from app.core.rate_limit import rate_scheduler
+from app.services.key_pool import ApiKey, ProviderKeyPool
+from app.services.session_summary import refresh_session_summary, summary_system_message
+from app.services.session_title import generate_session_title, heuristic_title
+from app.services.turn_persistence import ChatTurn, message_queue
+from app.services.web_search import (
+    build_search_augmented_prompt,
+    normalize_query,
+    web_search_serper,
+)
+from app.core.config import (
+    CHAT_HISTORY_FETCH_LIMIT,
+    MESSAGES_PAGE_DEFAULT_LIMIT,
+    PAGE_MAX_LIMIT,
+    SESSION_HISTORY_FULL_ENABLED,
+    SESSIONS_PAGE_DEFAULT_LIMIT,
+    SUMMARY_TRIGGER_MESSAGES,
+    WEB_SEARCH_SPECULATIVE,
+)
+from app.db.crud import (
+    get_session_tail,
+    list_session_messages,
+    list_user_sessions,
 )
-from app.services.web_search import web_search_serper, build_search_augmented_prompt
-from app.db.crud import save_message
+from app.core.http_client import get_http_client
 from app.db.dependencies import get_db
-from app.groq_client import get_model_response
+from app.db.session import AsyncSessionLocal
+from app.groq_client import (
+    get_model_response,
+    model_catalog,
+    normalize_response,
+    stream_model_response,
+)
+from app.services.conversation_window import fit_history, history_budget
 from sqlalchemy import delete, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.auth.schemas import ChatMessageOut, ChatSessionDetail, UserChatHistory
@@ -57,7 +99,7 @@ async def testocr():
 @router.post("/save_api_key")
 async def save_api_key(
     payload: UserApiKeyIn,
-    user: User = Depends(get_current_user),
+    user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     try:
@@ -68,6 +110,7 @@ async def save_api_key(
         )
         db.add(new_key)
         await db.commit()
+        api_key_cache.invalidate(user.id)
         return JSONResponse(content={"success": "API key added successfully"})
     except IntegrityError:
         await db.rollback()
@@ -83,35 +126,94 @@ async def save_api_key(
         return JSONResponse(content={"error": "Internal server error"}, status_code=500)
 
 
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_chat_reply(
+    messages_for_llm: List[Dict[str, str]],
+    model: str,
+    category: str,
+    turn: ChatTurn,
+    client: AsyncClient,
+    groq_api_key: ApiKey,
+    mistral_api_key: ApiKey,
+    cache: bool = False,
+    catalog_entry: Optional[CatalogModel] = None,
+) -> AsyncIterator[str]:
+    """
+    Relay provider tokens to the client as SSE and persist the whole turn
+    (session, user message, assembled assistant message) once the stream ends.
+    Events: `meta` (model, session_id), `token` (content), `done`, `error`.
+    """
+    session_id = turn.session_id
+    # The request-scoped session is released once the endpoint returns, so
+    # the stream gets its own for routing and persisting the turn.
+    async with AsyncSessionLocal() as db:
+        try:
+            used_model = None
+            parts: List[str] = []
+            async for kind, value in stream_model_response(
+                messages_for_llm,
+                model,
+                category,
+                db,
+                client,
+                groq_api_key,
+                mistral_api_key,
+                cache,
+                catalog_entry,
+            ):
+                if kind == "model":
+                    used_model = value
+                    yield sse_event(
+                        "meta", {"model": value, "session_id": str(session_id)}
+                    )
+                else:
+                    parts.append(value)
+                    yield sse_event("token", {"content": value})
+
+            reply_text = normalize_response(used_model, "".join(parts))  # type: ignore
+
+            # Step 7: Save the turn with the assistant's response (one commit)
+            turn.add_message("assistant", reply_text, used_model)
+            await turn.persist(db)
+            print("✅ Stream finished")
+            yield sse_event(
+                "done", {"model": used_model, "session_id": str(session_id)}
+            )
+        except RuntimeError as e:
+            await turn.persist_aborted(db)
+            yield sse_event("error", {"error": str(e)})
+        except Exception as e:
+            print("❌ Exception occurred during /chat stream:")
+            traceback.print_exc()
+            await turn.persist_aborted(db)
+            yield sse_event("error", {"error": str(e)})
+        finally:
+            # A disconnect still keeps the session and the user's message
+            turn.persist_in_background()
+
+
 @router.post("/chat")
 async def chat_without_tts(
     payload: ChatPayload,
-    user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    client: AsyncClient = Depends(get_http_client),
 ):
+    turn: Optional[ChatTurn] = None
     try:
-        result = await db.execute(
-            select(UserApiKey).where(UserApiKey.user_id == user.id)
-        )
-        rows = result.scalars().all()
-
-        # Option A: validate from ORM instances (recommended with from_attributes)
-        api_keys = [UserApiKeyIn.model_validate(row) for row in rows]
-        print("Keys:", api_keys)
+        # Cached per user; invalidated by /save_api_key and /delete_api_key
+        api_keys = await api_key_cache.get(db, user.id)
         if not api_keys:
             raise HTTPException(status_code=404, detail="No Api Key")
-        groq_key: str | None = None
-        mistral_key: str | None = None
-
-        for a in api_keys:
-            if a.api_provider == "Groq":
-                groq_key = a.api_key
-            elif a.api_provider == "Mistral":
-                mistral_key = a.api_key
 
-        # Assign after loop (ensures variables exist)
-        groq_api_key = groq_key
-        mistral_api_key = mistral_key
+        # Every call picks the healthiest of the user's keys for its provider
+        groq_api_key = ProviderKeyPool("Groq", api_keys.get("Groq", []))
+        mistral_api_key = ProviderKeyPool("Mistral", api_keys.get("Mistral", []))
 
         # Optional: fail fast if keys are missing
         if not groq_api_key and not mistral_api_key:
@@ -122,43 +224,24 @@ async def chat_without_tts(
         print("payload Category:", payload.category)
         session_id: UUID | None = payload.session_id
         user_message = payload.messages[-1].content
+        # Writes of this turn are held back and committed together at the end
+        turn = ChatTurn(user.id, session_id)
+        summary, summary_last_message_id = None, None
 
         # Step 1: Create session if needed
         if session_id is None:
             print("Session not received. Creating session...")
-            new_session = ChatSession(user_id=user.id)
-            db.add(new_session)
-            await db.commit()
-            await db.refresh(new_session)
-            session_id = new_session.id
+            session_id = turn.create_session(heuristic_title(user_message))
             print("💡 New session created:", session_id)
-            # 🔹 Generate a title using the LLM
-            async with AsyncClient(timeout=None) as client:
-                title_prompt = f"""
-                Create a short, descriptive chat title (max 6 words) for this user query:
-                "{payload.messages[-1].content}"
-
-                Rules:
-                - No quotes or punctuation at the end
-                - Capture the core topic clearly
-                - Capitalize each major word
-                - Do not include the words 'Title' or 'Chat'
-                - Output only the title
-                """
-                generated_title, _ = await get_model_response(
-                    [{"role": "user", "content": title_prompt}],
-                    "openai/gpt-oss-20b",
-                    "text",
-                    db,
-                    client,
-                    groq_api_key,
-                    mistral_api_key,
-                )
-
-            # Save title in DB
-            new_session.title = generated_title.strip()
-            await db.commit()
-            print(f"📝 Session title set: {new_session.title}")
+            # 🔹 Generate the real title with the LLM once the reply is out
+            background_tasks.add_task(
+                generate_session_title,
+                session_id,
+                user_message,
+                client,
+                groq_api_key,
+                mistral_api_key,
+            )
         else:
             # Fetch existing session
             result = await db.execute(
@@ -167,69 +250,53 @@ async def chat_without_tts(
             existing_session = result.scalar_one_or_none()
             if not existing_session:
                 raise HTTPException(status_code=404, detail="Session not found")
+            summary = existing_session.summary
+            summary_last_message_id = existing_session.summary_last_message_id
 
             # Increment some counter if you have one (example)
             # existing_session.message_count += 1
 
             # If title is still default, update it based on latest query
             if existing_session.title.strip().lower() == "new chat session":  # type: ignore
-                async with AsyncClient(timeout=None) as client:
-                    title_prompt = f"""
-                    Create a short, descriptive chat title (max 6 words) for this user query:
-                    "{payload.messages[-1].content}"
-
-                    Rules:
-                    - No quotes or punctuation at the end
-                    - Capture the core topic clearly
-                    - Capitalize each major word
-                    - Do not include the words 'Title' or 'Chat'
-                    - Output only the title
-                    - Maximum 3 words
-                    """
-                    generated_title, _ = await get_model_response(
-                        [{"role": "user", "content": title_prompt}],
-                        "openai/gpt-oss-20b",
-                        "text",
-                        db,
-                        client,
-                        groq_api_key,
-                        mistral_api_key,
-                    )
-
-                existing_session.title = generated_title.strip()
-                await db.commit()
-                print(f"📝 Session title updated: {existing_session.title}")
+                title = heuristic_title(user_message, max_words=3)
+                turn.set_title(title)
+                background_tasks.add_task(
+                    generate_session_title,
+                    session_id,
+                    user_message,
+                    client,
+                    groq_api_key,
+                    mistral_api_key,
+                    max_words=3,
+                )
+                print(f"📝 Session title updated: {title}")
         print("📨 Message received:", user_message)
         print("👤 User ID:", user.id, "| 💬 Session ID:", session_id)
         print("🌐 Web Search Enabled:", getattr(payload, "web_search", False))
 
-        # Step 2: Save user's message
-        await save_message(
-            db=db,
-            user_id=user.id,
-            session_id=session_id,
-            role="user",
-            content=user_message,
-            res_model="",
-        )
-
-        # Step 3: Fetch previous session messages
-        result = await db.execute(
-            select(ChatSession)
-            .options(selectinload(ChatSession.messages))
-            .where(ChatSession.id == session_id)
-        )
-        session = result.scalar_one_or_none()
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-
-        previous_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in sorted(session.messages, key=lambda m: m.created_at)
+        # Step 2: Queue the user's message (written with the rest of the turn)
+        turn.add_message("user", user_message, "")
+
+        # Step 3: Fetch the most recent session messages (newest first)
+        # (only turns not yet folded into the rolling summary); the user's
+        # message is not in the database yet, so it leads the list
+        recent_messages = []
+        if not turn.is_new_session:
+            if message_queue.pending_for(session_id):
+                # Earlier turns of this session still wait in the write-behind queue
+                await message_queue.flush()
+            recent_messages = await get_session_tail(
+                db,
+                session_id,  # type: ignore
+                CHAT_HISTORY_FETCH_LIMIT - 1,
+                after_message_id=summary_last_message_id,
+            )
+        history_newest_first = [{"role": "user", "content": user_message}] + [
+            {"role": msg.role, "content": msg.content} for msg in recent_messages
         ]
 
         # Step 4: Base system prompt
-        messages_for_llm = [
+        system_messages = [
             {
                 "role": "system",
                 "content": (
@@ -249,24 +316,60 @@ async def chat_without_tts(
                     "- Add a brief summary(if required) or key takeaway(if required) at the end."
                 ),
             }
-        ] + previous_messages
+        ]
+        if summary:
+            system_messages.append(summary_system_message(summary))
+
+        # Step 4b: Keep the newest turns that fit the requested model's budget
+        # (resolved once here and handed to the router below)
+        await model_catalog.ensure_fresh(db)
+        requested_entry = await model_catalog.lookup(db, payload.model)
+        if requested_entry is None:
+            raise ValueError(f"Requested model {payload.model} not found in DB")
+        previous_messages = fit_history(
+            system_messages,
+            history_newest_first,
+            history_budget(requested_entry.context_window),
+        )
+        messages_for_llm = system_messages + previous_messages
+
+        # Step 4c: Compact older turns into the session summary off the request path
+        if len(history_newest_first) >= SUMMARY_TRIGGER_MESSAGES:
+            background_tasks.add_task(
+                refresh_session_summary,
+                session_id,
+                client,
+                groq_api_key,
+                mistral_api_key,
+            )
 
         # Step 5: Web Search Augmentation with Query Normalization
         if getattr(payload, "web_search", False):
-            async with AsyncClient(timeout=None) as client:
-                normalization_prompt = f"""
-                    Given the conversation so far and the user's latest question, rewrite the question
-                    into a highly specific, search-engine-friendly query. Preserve the intent but make it explicit.
+            # Step 5a: Search the raw message while the query is being rewritten;
+            # only used when the rewrite comes out the same (or fails)
+            speculative = None
+            if WEB_SEARCH_SPECULATIVE:
+                speculative = asyncio.create_task(
+                    web_search_serper(user_message, client)
+                )
+                speculative.add_done_callback(
+                    lambda t: t.cancelled() or t.exception()
+                )
 
-                    Conversation Context:
-                    {[m['content'] for m in previous_messages]}
+            normalization_prompt = f"""
+                Given the conversation so far and the user's latest question, rewrite the question
+                into a highly specific, search-engine-friendly query. Preserve the intent but make it explicit.
 
-                    Latest Question:
-                    "{user_message}"
+                Conversation Context:
+                {[m['content'] for m in previous_messages]}
 
-                    Output only the rewritten query, no extra words.no model name.
-                    """
-                normalized_query = await get_model_response(
+                Latest Question:
+                "{user_message.strip()}"
+
+                Output only the rewritten query, no extra words.no model name.
+                """
+            try:
+                normalized_query, _ = await get_model_response(
                     [{"role": "user", "content": normalization_prompt}],
                     "openai/gpt-oss-20b",
                     "text",
@@ -274,12 +377,28 @@ async def chat_without_tts(
                     client,
                     groq_api_key,
                     mistral_api_key,
+                    cache=True,
                 )
-            normalized_query = normalized_query[0]
+            except Exception as e:
+                if speculative is None:
+                    raise
+                print(f"⚠️ Query rewrite failed, using the raw message: {e}")
+                normalized_query = user_message
             print(f"🔍 Normalized Search Query: {normalized_query}")
 
             # Step 5b: Call the search API with the normalized query
-            search_results = await web_search_serper(normalized_query)
+            if speculative is not None and normalize_query(
+                normalized_query
+            ) == normalize_query(user_message):
+                try:
+                    search_results = await speculative
+                except Exception as e:
+                    print(f"⚠️ Speculative search failed: {e}")
+                    search_results = []
+            else:
+                if speculative is not None:
+                    speculative.cancel()
+                search_results = await web_search_serper(normalized_query, client)
 
             # Step 5c: Inject search results into the LLM context
             augmented_prompt = build_search_augmented_prompt(
@@ -288,28 +407,39 @@ async def chat_without_tts(
             messages_for_llm.append({"role": "system", "content": augmented_prompt})
 
         # Step 6: Get final LLM response
-        # Step 6: Get LLM response
-        async with AsyncClient(timeout=None) as client:
-            reply_text, used_model = await get_model_response(
-                messages_for_llm,
-                payload.model,
-                payload.category,
-                db,
-                client,
-                groq_api_key,
-                mistral_api_key,
+        if payload.stream:
+            return StreamingResponse(
+                stream_chat_reply(
+                    messages_for_llm,
+                    payload.model,
+                    payload.category,
+                    turn,
+                    client,
+                    groq_api_key,
+                    mistral_api_key,
+                    payload.cache,
+                    requested_entry,
+                ),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
             )
 
-        # Step 7: Save assistant's response
-        await save_message(
-            db=db,
-            user_id=user.id,
-            session_id=session_id,
-            role="assistant",
-            content=reply_text,
-            res_model=used_model,
+        reply_text, used_model = await get_model_response(
+            messages_for_llm,
+            payload.model,
+            payload.category,
+            db,
+            client,
+            groq_api_key,
+            mistral_api_key,
+            cache=payload.cache,
+            catalog_entry=requested_entry,
         )
 
+        # Step 7: Save the turn with the assistant's response (one commit)
+        turn.add_message("assistant", reply_text, used_model)
+        await turn.persist(db)
+
         print("✅ Sending Response")
         return JSONResponse(
             content={
@@ -319,6 +449,9 @@ async def chat_without_tts(
             }
         )
     except RuntimeError as e:
+        # No reply, but keep the session and the user's message
+        if turn is not None:
+            await turn.persist_aborted(db)
         return JSONResponse(content={"error": str(e)}, status_code=400)
     except HTTPException as e:
         # ✅ Re-raise so FastAPI handles it properly
@@ -326,14 +459,45 @@ async def chat_without_tts(
     except Exception as e:
         print("❌ Exception occurred during /chat:")
         traceback.print_exc()
+        if turn is not None:
+            await turn.persist_aborted(db)
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
-@router.get("/get_sessions", response_model=UserChatHistory)
+@router.get("/get_sessions", response_model=ChatSessionPage)
+async def get_user_sessions(
+    cursor: Optional[str] = None,
+    limit: int = Query(SESSIONS_PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Keyset-paginated session list (newest first); messages load per session."""
+    try:
+        rows, next_cursor = await list_user_sessions(db, user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print("❌ Error fetching sessions:", e)
+        traceback.print_exc()
+        return JSONResponse(
+            content={"error": "Could not retrieve session history"}, status_code=500
+        )
+
+    return ChatSessionPage(
+        user_id=user_id,
+        sessions=[ChatSessionSummary.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/get_sessions/full", response_model=UserChatHistory)
 async def get_user_sessions_with_messages(
-    user: User = Depends(get_current_user),
+    user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """Legacy: every session with every message (SESSION_HISTORY_FULL_ENABLED)."""
+    if not SESSION_HISTORY_FULL_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
     try:
         # ⚙️ Load sessions + related messages in one efficient query
         result = await db.execute(
@@ -374,7 +538,7 @@ async def get_user_sessions_with_messages(
 )
 async def delete_chat_session(
     session_id: UUID,
-    user: User = Depends(get_current_user),
+    user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     print("DELETING CHAT SESSION")
@@ -409,43 +573,56 @@ async def create_chat_session(
 
 
 @router.get("/profile")
-async def get_user_profile(user: User = Depends(get_current_user)):
-    return {"id": user.id}
+async def get_user_profile(user_id: UUID = Depends(get_current_user_id)):
+    return {"id": user_id}
 
 
 @router.get(
     "/chat/session/{session_id}/messages",
     response_model=ChatSessionWithMessages,
 )
-async def get_session_messages(session_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_session_messages(
+    session_id: UUID,
+    cursor: Optional[str] = None,
+    limit: int = Query(MESSAGES_PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Newest `limit` messages of the session (oldest first within the page).
+    Pass the returned `next_cursor` to load the page before it.
+    """
     result = await db.execute(
-        select(ChatSession)
-        .options(selectinload(ChatSession.messages))
-        .where(ChatSession.id == session_id)
+        select(ChatSession.id, ChatSession.title).where(ChatSession.id == session_id)
     )
-    session = result.scalar_one_or_none()
+    session = result.first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # 🔹 Sort messages by created_at (ascending)
-    sorted_messages = sorted(session.messages, key=lambda m: m.created_at)
-
-    # 🔹 Replace with sorted list so response_model gets them in order
-    session.messages = sorted_messages
-    return session
+    if message_queue.pending_for(session_id):
+        await message_queue.flush()
+    try:
+        messages, next_cursor = await list_session_messages(
+            db, session_id, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ChatSessionWithMessages(
+        id=session.id,
+        title=session.title,
+        messages=[ChatMessageOut.model_validate(m) for m in messages],
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/get_models", response_model=List[AIModelRead])
 async def get_models(
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user_id: UUID = Depends(get_current_user_id),
 ):
     try:
         # 1. Get user API providers
-        result = await db.execute(
-            select(UserApiKey.api_provider).where(UserApiKey.user_id == user.id)
-        )
-        providers = [row[0] for row in result.all()]
+        providers = list(await api_key_cache.get(db, user_id))
 
         if not providers:
             raise HTTPException(
@@ -458,6 +635,7 @@ async def get_models(
             select(AIModel)
             .where(AIModel.provider.in_(providers))
             .where(AIModel.category.notin_(["vision", "audio"]))
+            .where(AIModel.is_active)
         )
         models = result.scalars().all()
 
@@ -485,25 +663,48 @@ async def get_models(
 
 @router.get("/get_api_keys", response_model=UserApiKeyOut)
 async def return_api_keys(
-    user: User = Depends(get_current_user),
+    user_id: UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(UserApiKey).where(UserApiKey.user_id == user.id))
-    rows = result.scalars().all()
+    provider_keys = await api_key_cache.get(db, user_id)
+    api_keys = [
+        UserApiKeyIn(api_provider=provider, api_key=key)
+        for provider, keys in provider_keys.items()
+        for key in keys
+    ]
 
-    # Option A: validate from ORM instances (recommended with from_attributes)
-    api_keys = [UserApiKeyIn.model_validate(row) for row in rows]
+    return UserApiKeyOut(api_keys=api_keys)
 
-    # Option B: explicit construction (works without from_attributes)
-    # api_keys = [UserApiKeyIn(api_provider=row.api_provider, api_key=row.api_key) for row in rows]
 
-    return UserApiKeyOut(api_keys=api_keys)
+@router.get("/get_api_keys/usage", response_model=List[UserApiKeyUsage])
+async def return_api_key_usage(
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """How the key pools have been spreading this user's requests."""
+    provider_keys = await api_key_cache.get(db, user_id)
+    now = time.monotonic()
+    usage = []
+    for provider, keys in provider_keys.items():
+        for key in keys:
+            stats = rate_scheduler.usage(provider, key)
+            usage.append(
+                UserApiKeyUsage(
+                    api_provider=provider,
+                    key_hint=f"…{key[-4:]}",
+                    requests=stats.requests,
+                    rate_limited=stats.rate_limited,
+                    unauthorized=stats.unauthorized,
+                    benched_for=round(max(0.0, stats.benched_until - now), 1),
+                )
+            )
+    return usage
 
 
 @router.delete("/delete_api_key")
 async def delete_api_key(
     api_key: dict,  # incoming JSON { "api_key": "<value>" }
-    user: User = Depends(get_current_user),
+    user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     key_val = api_key.get("api_key")
@@ -518,6 +719,7 @@ async def delete_api_key(
     )
     result = await db.execute(stmt)
     await db.commit()
+    api_key_cache.invalidate(user.id)
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="API key not found")
@@ -4,20 +4,56 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from app.auth.authentication import password_pool
+from app.core.config import PROBER_ENABLED
+from app.core.http_client import create_http_client
+from app.groq_client import (
+    latency_telemetry,
+    model_catalog,
+    model_stats,
+    response_cache,
+)
+from app.routers.admin_router import router as admin_router
 from app.routers.auth_routes import router as auth_router
 from app.routers.chat_router import router as chat_router
-
-# ⬇️ Import the orchestrator function
+from app.services.model_prober import model_prober
+from app.services.turn_persistence import message_queue
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 🚀 Startup logic
-    print("🔄 Running model discovery + probe task after startup...")
-    # asyncio.create_task(save_models_to_db_and_probe())
+    # One pooled client for every provider / Serper call in this process
+    app.state.http_client = create_http_client()
+    try:
+        await model_catalog.refresh()
+    except Exception as e:
+        # Not fatal: the catalog loads lazily on the first routed request
+        print(f"⚠️ Could not warm model catalog: {e}")
+    if response_cache.persist:
+        try:
+            purged = await response_cache.purge_expired()
+            print(f"🧹 Purged {purged} expired response cache rows")
+        except Exception as e:
+            print(f"⚠️ Could not purge response cache: {e}")
+    model_stats.start()
+    latency_telemetry.start()
+    if message_queue.enabled:
+        message_queue.start()
+    if PROBER_ENABLED:
+        # Runs in the background (first pass after PROBER_INITIAL_DELAY)
+        model_prober.start()
+        print("🔄 Model discovery + probe scheduled in the background")
     yield
     # 🔻 Shutdown logic (optional)
     print("🛑 Application shutting down...")
+    # Final flush so no buffered chat messages or latency stats are lost
+    await message_queue.stop()
+    await model_prober.stop()
+    await model_stats.stop()
+    await latency_telemetry.stop()
+    await app.state.http_client.aclose()
+    password_pool.shutdown(wait=False, cancel_futures=True)
 
 
 app = FastAPI(lifespan=lifespan)
@@ -42,3 +78,4 @@ app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 # Register routes
 app.include_router(auth_router)
 app.include_router(chat_router)
+app.include_router(admin_router)
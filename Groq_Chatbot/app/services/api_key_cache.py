@@ -0,0 +1,70 @@
+import asyncio
+import weakref
+from typing import Dict, List
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.models import UserApiKey
+from app.core.cache import TTLCache
+from app.core.config import API_KEY_CACHE_SIZE, API_KEY_CACHE_TTL
+
+# provider name as stored ("Groq", "Mistral") -> keys, oldest first
+ProviderKeys = Dict[str, List[str]]
+
+
+class ApiKeyCache:
+    """
+    Lazily populated map of user id -> provider keys.
+
+    Concurrent misses for the same user share one query (per-user lock), and
+    every `invalidate()` bumps a per-user version so a load that started
+    before a save/delete cannot put the old keys back. Other workers pick up
+    changes when their entry expires after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache[UUID, ProviderKeys] = TTLCache(maxsize, ttl)
+        self._locks: "weakref.WeakValueDictionary[UUID, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._versions: Dict[UUID, int] = {}
+
+    async def get(self, db: AsyncSession, user_id: UUID) -> ProviderKeys:
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        async with lock:
+            # Another request may have loaded it while we waited
+            cached = self._cache.get(user_id)
+            if cached is not None:
+                return cached
+
+            version = self._versions.get(user_id, 0)
+            result = await db.execute(
+                select(UserApiKey.api_provider, UserApiKey.api_key)
+                .where(UserApiKey.user_id == user_id)
+                .order_by(UserApiKey.created_at)
+            )
+            keys: ProviderKeys = {}
+            for provider, key in result.all():
+                keys.setdefault(provider, []).append(key)
+
+            if self._versions.get(user_id, 0) == version:
+                self._cache.set(user_id, keys)
+            return keys
+
+    def invalidate(self, user_id: UUID) -> None:
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._cache.invalidate(user_id)
+
+    def stats(self) -> Dict[str, float]:
+        return self._cache.stats()
+
+
+api_key_cache = ApiKeyCache(API_KEY_CACHE_SIZE, API_KEY_CACHE_TTL)
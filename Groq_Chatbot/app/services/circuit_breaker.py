@@ -0,0 +1,190 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import httpx
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose circuit is open."""
+
+
+def is_breaker_failure(exc: BaseException) -> bool:
+    """
+    Errors that say the upstream is unhealthy: 5xx, 429 and transport
+    failures (timeouts, refused/reset connections). Other 4xx responses are
+    about the request itself and leave the breaker alone.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` failures inside `window` seconds.
+    Open -> half-open once `cooldown` seconds have passed; half-open lets a
+    single probe call through (re-armed after another `cooldown` if the probe
+    never reports back). A successful probe closes the circuit, a failed one
+    re-opens it for a fresh cooldown. Successes while closed do not reset the
+    failure count; failures only leave it by ageing out of `window`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, window: float, cooldown: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._failures: Deque[float] = deque()
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return OPEN
+        return HALF_OPEN
+
+    def available(self) -> bool:
+        """Would a call be let through right now? (does not claim the probe)"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        return (
+            self._probe_started is None
+            or time.monotonic() - self._probe_started >= self.cooldown
+        )
+
+    def claim(self) -> bool:
+        """Like available(), but a half-open circuit hands out its probe slot."""
+        if not self.available():
+            return False
+        if self.state == HALF_OPEN:
+            self._probe_started = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        """
+        Only a successful half-open probe closes the circuit. A success while
+        closed leaves the window alone (failures age out of it): on a
+        provider breaker, one healthy model must not hide an outage spread
+        over the others. A straggler success while open changes nothing.
+        """
+        if self.state != HALF_OPEN:
+            return
+        print(f"✅ Circuit {self.name} closed")
+        self._failures.clear()
+        self._opened_at = None
+        self._probe_started = None
+
+    def release(self) -> None:
+        """
+        The call ended without saying anything about the upstream's health
+        (a request error, or it was cancelled): free a claimed probe slot,
+        keep the window and the state.
+        """
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        if self._opened_at is not None:
+            # Failed probe (or a straggler from before the trip): back to open
+            self._opened_at = now
+            self._probe_started = None
+            return
+        self._failures.append(now)
+        while self._failures and now - self._failures[0] > self.window:
+            self._failures.popleft()
+        if len(self._failures) >= self.failure_threshold:
+            self._opened_at = now
+            self._failures.clear()
+            self.times_opened += 1
+            print(f"🔌 Circuit {self.name} opened for {self.cooldown:.0f}s")
+
+    def snapshot(self) -> Dict:
+        state = self.state
+        now = time.monotonic()
+        return {
+            "state": state,
+            "recent_failures": sum(1 for t in self._failures if now - t <= self.window),
+            "open_remaining": (
+                round(self.cooldown - (now - self._opened_at), 1)
+                if state == OPEN
+                else 0.0
+            ),
+            "times_opened": self.times_opened,
+        }
+
+
+class CircuitBreakers:
+    """
+    One breaker per model and one per provider. A call needs both to be
+    available; its outcome is recorded on both, so a provider-wide outage
+    trips the provider breaker even when it is spread across many models.
+    """
+
+    def __init__(
+        self,
+        model_threshold: int,
+        provider_threshold: int,
+        window: float,
+        cooldown: float,
+    ):
+        self.model_threshold = model_threshold
+        self.provider_threshold = provider_threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._models: Dict[str, CircuitBreaker] = {}
+        self._providers: Dict[str, CircuitBreaker] = {}
+
+    def _breakers(self, model_id: str, provider: str) -> List[CircuitBreaker]:
+        provider = provider.lower()
+        if provider not in self._providers:
+            self._providers[provider] = CircuitBreaker(
+                f"provider:{provider}", self.provider_threshold, self.window, self.cooldown
+            )
+        if model_id not in self._models:
+            self._models[model_id] = CircuitBreaker(
+                f"model:{model_id}", self.model_threshold, self.window, self.cooldown
+            )
+        return [self._providers[provider], self._models[model_id]]
+
+    def available(self, model_id: str, provider: str) -> bool:
+        return all(b.available() for b in self._breakers(model_id, provider))
+
+    def claim(self, model_id: str, provider: str) -> bool:
+        breakers = self._breakers(model_id, provider)
+        # Check first so a refusal never burns the other breaker's probe slot
+        return all(b.available() for b in breakers) and all(
+            b.claim() for b in breakers
+        )
+
+    def record(self, model_id: str, provider: str, exc: Optional[BaseException] = None) -> None:
+        for breaker in self._breakers(model_id, provider):
+            if exc is None:
+                breaker.record_success()
+            elif is_breaker_failure(exc):
+                breaker.record_failure()
+            else:
+                breaker.release()
+
+    def release(self, model_id: str, provider: str) -> None:
+        """A claimed call ended without an outcome (e.g. it was cancelled)."""
+        for breaker in self._breakers(model_id, provider):
+            breaker.release()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        return {
+            "providers": {k: b.snapshot() for k, b in self._providers.items()},
+            "models": {k: b.snapshot() for k, b in self._models.items()},
+        }
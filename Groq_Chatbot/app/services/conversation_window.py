@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Optional
+
+from app.core.config import (
+    CHAT_CONTEXT_DEFAULT_WINDOW,
+    CHAT_CONTEXT_MAX_TOKENS,
+    CHAT_CONTEXT_RESERVE_TOKENS,
+)
+
+# Role markers / separators every chat message costs on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding: Any = None
+_encoding_loaded = False
+
+
+def _get_encoding() -> Any:
+    """
+    tiktoken's cl100k_base, loaded on first use rather than at import: the
+    encoding file may have to be downloaded, which must not hold up app
+    startup. None (tried only once) if tiktoken or the file is unavailable.
+    """
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:  # ImportError, or the encoding cannot be fetched
+            print(f"⚠️ tiktoken unavailable, estimating ~4 characters per token: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count of `text`. cl100k_base is not the tokenizer of every Groq or
+    Mistral model, but it is close enough for budgeting; without tiktoken we
+    fall back to the usual ~4 characters per token estimate.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return count_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def history_budget(context_window: Optional[int]) -> int:
+    """Tokens available for system prompt + history on a model."""
+    window = context_window or CHAT_CONTEXT_DEFAULT_WINDOW
+    if CHAT_CONTEXT_MAX_TOKENS > 0:
+        window = min(window, CHAT_CONTEXT_MAX_TOKENS)
+    # Leave room for the reply (and e.g. injected web search results)
+    return max(window - CHAT_CONTEXT_RESERVE_TOKENS, 0)
+
+
+def fit_history(
+    system_messages: List[Dict[str, str]],
+    history_newest_first: List[Dict[str, str]],
+    budget: int,
+) -> List[Dict[str, str]]:
+    """
+    Return the newest turns of `history_newest_first` that fit in `budget`
+    next to the system messages, in chronological order. The latest message
+    is always kept, even if it alone exceeds the budget.
+    """
+    remaining = budget - sum(message_tokens(m) for m in system_messages)
+    kept: List[Dict[str, str]] = []
+    for message in history_newest_first:
+        cost = message_tokens(message)
+        if kept and cost > remaining:
+            break
+        kept.append(message)
+        remaining -= cost
+    kept.reverse()
+    return kept
+
+
+def fit_messages(
+    messages: List[Dict[str, str]], context_window: Optional[int]
+) -> List[Dict[str, str]]:
+    """
+    Re-fit an assembled prompt (leading system messages, chronological turns,
+    then e.g. injected search results as trailing system messages) to another
+    model's window, dropping its oldest turns. Used when the router falls
+    back from the requested model to one with a smaller window; the
+    trailing messages live in the reserve, as when the prompt was first fit.
+    """
+    turns = [i for i, m in enumerate(messages) if m.get("role") != "system"]
+    if not turns:
+        return messages
+    leading = messages[: turns[0]]
+    history = messages[turns[0] : turns[-1] + 1]
+    trailing = messages[turns[-1] + 1 :]
+    kept = fit_history(leading, history[::-1], history_budget(context_window))
+    if len(kept) == len(history):
+        return messages
+    return leading + kept + trailing
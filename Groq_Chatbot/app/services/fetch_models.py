@@ -3,20 +3,29 @@ import json
 import time
 import math
 import asyncio
-from time import sleep
-from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import requests
 import pandas as pd
 import httpx
 
 from dotenv import load_dotenv
-from sqlalchemy import select
+from sqlalchemy import Float, Integer, String, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # ===== Your app imports (unchanged) =====
 from app.db.dependencies import get_db
-from app.auth.models import AIModel
+from app.auth.models import AIModel, ModelDescription
+from app.core.config import (
+    DISCOVERY_BATCH_SIZE,
+    DISCOVERY_CONCURRENCY,
+    MODEL_DESCRIPTION_TTL,
+    SERPER_SEARCH_URL,
+)
+from app.core.rate_limit import RateLimitedTransport, rate_scheduler
+from app.groq_client import model_catalog
 
 
 # =========================
@@ -44,41 +53,101 @@ GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
 MISTRAL_MODELS_URL = "https://api.mistral.ai/v1/models"
 MISTRAL_CHAT_URL = "https://api.mistral.ai/v1/chat/completions"
 
-SERPER_SEARCH_URL = "https://google.serper.dev/search"
+
+
+# =========================
+# Shared HTTP client & concurrency limiter
+# =========================
+def _provider_client(timeout: float) -> httpx.AsyncClient:
+    """Client whose provider calls share the app's per-key rate budgets."""
+    return httpx.AsyncClient(
+        timeout=timeout,
+        transport=RateLimitedTransport(httpx.AsyncHTTPTransport(), rate_scheduler),
+    )
+
+
+class RateLimiter:
+    """
+    Caps concurrent discovery work (searches, categorizations, pings); the
+    per-key request budgets themselves are enforced by the rate-limited
+    transport (app/core/rate_limit.py).
+    """
+
+    def __init__(self, concurrency: int = 4):
+        self.sem = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self):
+        await self.sem.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.sem.release()
+
+
+class Progress:
+    """Prints `[done/total]` lines as concurrent steps finish."""
+
+    def __init__(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.started = time.monotonic()
+
+    def step(self, detail: str) -> None:
+        self.done += 1
+        elapsed = time.monotonic() - self.started
+        print(f"   [{self.done}/{self.total}] {self.label} {detail} ({elapsed:.1f}s)")
 
 
 # =========================
 # Fetch models from providers
 # =========================
-def get_models_from_groq() -> List[Dict[str, Any]]:
+async def get_models_from_groq(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
     headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
-    r = requests.get(GROQ_MODELS_URL, headers=headers, timeout=20)
+    r = await client.get(GROQ_MODELS_URL, headers=headers, timeout=20)
     r.raise_for_status()
     return r.json().get("data", [])
 
 
-def get_models_from_mistral() -> List[Dict[str, Any]]:
+async def get_models_from_mistral(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
     headers = {"Authorization": f"Bearer {MISTRAL_API_KEY}"}
-    r = requests.get(MISTRAL_MODELS_URL, headers=headers, timeout=20)
+    r = await client.get(MISTRAL_MODELS_URL, headers=headers, timeout=20)
     r.raise_for_status()
     return r.json().get("data", [])
 
 
-def collect_all_models() -> List[Dict[str, str]]:
-    all_models: List[Dict[str, str]] = []
-    for model in get_models_from_groq():
+async def collect_all_models(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+    # Both providers are listed at the same time
+    groq_models, mistral_models = await asyncio.gather(
+        get_models_from_groq(client), get_models_from_mistral(client)
+    )
+
+    all_models: List[Dict[str, Any]] = []
+    for model in groq_models:
         mid = model.get("id") or model.get("name") or ""
         if mid:
-            all_models.append({"provider": "Groq", "model_id": mid})
+            all_models.append(
+                {
+                    "provider": "Groq",
+                    "model_id": mid,
+                    "context_window": model.get("context_window"),
+                }
+            )
 
-    for model in get_models_from_mistral():
+    for model in mistral_models:
         mid = model.get("id") or model.get("name") or ""
         if mid:
-            all_models.append({"provider": "Mistral", "model_id": mid})
+            all_models.append(
+                {
+                    "provider": "Mistral",
+                    "model_id": mid,
+                    "context_window": model.get("max_context_length"),
+                }
+            )
 
     # Deduplicate just in case (provider+model_id)
     seen = set()
-    unique: List[Dict[str, str]] = []
+    unique: List[Dict[str, Any]] = []
     for m in all_models:
         key = (m["provider"], m["model_id"])
         if key not in seen:
@@ -90,14 +159,17 @@ def collect_all_models() -> List[Dict[str, str]]:
 # =========================
 # Fetch real-time info from Serper
 # =========================
-def search_model_info(model_id: str) -> str:
+_NO_DESCRIPTION = "No description available."
+
+
+async def search_model_info(client: httpx.AsyncClient, model_id: str) -> str:
     if not SERPER_API_KEY:
-        return "No description available."
+        return _NO_DESCRIPTION
 
     headers = {"X-API-KEY": SERPER_API_KEY, "Content-Type": "application/json"}
     payload = {"q": model_id}
     try:
-        response = requests.post(
+        response = await client.post(
             SERPER_SEARCH_URL, json=payload, headers=headers, timeout=20
         )
         response.raise_for_status()
@@ -107,11 +179,11 @@ def search_model_info(model_id: str) -> str:
             return snippet
         org = data.get("organic") or []
         if org:
-            return org[0].get("snippet", "No description available.")
-        return "No description available."
+            return org[0].get("snippet", _NO_DESCRIPTION)
+        return _NO_DESCRIPTION
     except Exception as e:
         print(f"Error fetching info for {model_id}: {e}")
-        return "No description available."
+        return _NO_DESCRIPTION
 
 
 # =========================
@@ -119,114 +191,221 @@ def search_model_info(model_id: str) -> str:
 # =========================
 CATEGORIZER_MODEL = "openai/gpt-oss-120b"  # keep as-is unless you want to tune
 
+_RATING_SCALE = """
+Rate the model performance considering its category on a scale of 1–10, where:
+10 = state-of-the-art,
+7–9 = strong performer,
+4–6 = average,
+1–3 = weak/obsolete.
+""".strip()
+
+
+def _normalize_rating(rating: Any) -> Any:
+    # normalize rating to int if possible
+    return (
+        int(rating)
+        if isinstance(rating, (int, float, str)) and str(rating).isdigit()
+        else rating
+    )
 
-async def categorize_models(models: List[Dict[str, str]]) -> List[Dict[str, Any]]:
-    """
-    Returns: list of {provider, model_id, category, rating}
-    """
-    out: List[Dict[str, Any]] = []
-    async with httpx.AsyncClient(timeout=40) as client:
-        for model in models:
-            model_id = model.get("model_id", "unknown").strip()
-            provider = model.get("provider", "unknown")
-            try:
-                print(f"🔎 Categorizing: {provider} | {model_id}")
-                description = search_model_info(model_id)
 
-                messages = [
-                    {
-                        "role": "user",
-                        "content": f"""
+def _parse_json_reply(content: str) -> Any:
+    """json.loads that tolerates a ```json fenced reply."""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.strip("`").strip()
+        if content.lower().startswith("json"):
+            content = content[4:]
+    return json.loads(content)
+
+
+async def _ask_categorizer(client: httpx.AsyncClient, prompt: str) -> str:
+    payload = {
+        "model": CATEGORIZER_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0,
+        "stream": False,
+    }
+    resp = await client.post(
+        GROQ_CHAT_URL,
+        headers={
+            "Authorization": f"Bearer {GROQ_API_KEY}",
+            "Content-Type": "application/json",
+        },
+        json=payload,
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    return data["choices"][0]["message"]["content"].strip()
+
+
+def _categorized(model: Dict[str, Any], category: Any, rating: Any) -> Dict[str, Any]:
+    return {
+        "provider": model.get("provider", "unknown"),
+        "model_id": model.get("model_id", "unknown").strip(),
+        "category": category,
+        "rating": rating,
+        "context_window": model.get("context_window"),
+    }
+
+
+async def _categorize_model(
+    client: httpx.AsyncClient, model: Dict[str, Any], description: str
+) -> Dict[str, Any]:
+    model_id = model.get("model_id", "unknown").strip()
+    provider = model.get("provider", "unknown")
+    try:
+        prompt = f"""
 You are an AI model evaluator.
 Based on this description, classify the model into a SINGLE-WORD category
 (one of: coding, text, vision, audio, multimodal).
-Also, rate the model performance considering its category on a scale of 1–10, where:
-10 = state-of-the-art,
-7–9 = strong performer,
-4–6 = average,
-1–3 = weak/obsolete.
+{_RATING_SCALE}
 
 Respond in strict JSON with keys: category, rating.
 
 Model ID: {model_id}
 Description: {description}
-""".strip(),
-                    }
-                ]
-
-                payload = {
-                    "model": CATEGORIZER_MODEL,
-                    "messages": messages,
-                    "temperature": 0,
-                    "stream": False,
-                }
-                resp = await client.post(
-                    GROQ_CHAT_URL,
-                    headers={
-                        "Authorization": f"Bearer {GROQ_API_KEY}",
-                        "Content-Type": "application/json",
-                    },
-                    json=payload,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                content = data["choices"][0]["message"]["content"].strip()
-
-                try:
-                    parsed = json.loads(content)
-                    category = str(parsed.get("category", "unknown")).lower().strip()
-                    rating = parsed.get("rating", "unknown")
-                    # normalize rating to int if possible
-                    rating = (
-                        int(rating)
-                        if isinstance(rating, (int, float, str))
-                        and str(rating).isdigit()
-                        else rating
-                    )
-                except Exception:
-                    category, rating = "unknown", "unknown"
-
-                print(f"   → category={category} rating={rating}")
-                out.append(
-                    {
-                        "provider": provider,
-                        "model_id": model_id,
-                        "category": category,
-                        "rating": rating,
-                    }
-                )
-                sleep(0.9)  # polite pacing
-            except Exception as e:
-                print(f"Error categorizing model {provider}:{model_id}: {e}")
-                out.append(
-                    {
-                        "provider": provider,
-                        "model_id": model_id,
-                        "category": "unknown",
-                        "rating": "unknown",
-                    }
-                )
-    return out
+""".strip()
+        content = await _ask_categorizer(client, prompt)
 
+        try:
+            parsed = _parse_json_reply(content)
+            category = str(parsed.get("category", "unknown")).lower().strip()
+            rating = _normalize_rating(parsed.get("rating", "unknown"))
+        except Exception:
+            category, rating = "unknown", "unknown"
+    except Exception as e:
+        print(f"Error categorizing model {provider}:{model_id}: {e}")
+        category, rating = "unknown", "unknown"
 
-# =========================
-# Ping (chat "hi") eligible models
-# =========================
-ELIGIBLE_CATEGORIES = {"text", "coding", "multimodal"}
+    return _categorized(model, category, rating)
 
 
-class RateLimiter:
-    """Simple async token bucket using a semaphore."""
+async def _categorize_batch(
+    client: httpx.AsyncClient, batch: List[Tuple[Dict[str, Any], str]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Categorizes several models with one prompt. Returns the results keyed by
+    model_id; models the reply leaves out (or garbles) are simply missing.
+    """
+    wanted = {m.get("model_id", "unknown").strip(): m for m, _ in batch}
+    listing = "\n\n".join(
+        f"Model ID: {m.get('model_id', 'unknown').strip()}\nDescription: {description}"
+        for m, description in batch
+    )
+    prompt = f"""
+You are an AI model evaluator.
+For EACH model below, classify it into a SINGLE-WORD category
+(one of: coding, text, vision, audio, multimodal) based on its description.
+{_RATING_SCALE}
 
-    def __init__(self, concurrency: int = 4):
-        self.sem = asyncio.Semaphore(concurrency)
+Respond in strict JSON: an array with one object per model, with keys
+model_id (exactly as given), category, rating.
 
-    async def __aenter__(self):
-        await self.sem.acquire()
-        return self
+{listing}
+""".strip()
+    try:
+        parsed = _parse_json_reply(await _ask_categorizer(client, prompt))
+    except Exception as e:
+        print(f"Error categorizing batch of {len(batch)} models: {e}")
+        return {}
+    if isinstance(parsed, dict):
+        # {"models": [...]} or similar wrapper
+        parsed = next((v for v in parsed.values() if isinstance(v, list)), [])
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for item in parsed if isinstance(parsed, list) else []:
+        if not isinstance(item, dict):
+            continue
+        model_id = str(item.get("model_id", "")).strip()
+        if model_id not in wanted or model_id in out:
+            continue
+        category = str(item.get("category", "unknown")).lower().strip()
+        out[model_id] = _categorized(
+            wanted[model_id], category, _normalize_rating(item.get("rating", "unknown"))
+        )
+    return out
 
-    async def __aexit__(self, exc_type, exc, tb):
-        self.sem.release()
+
+async def categorize_models(
+    models: List[Dict[str, Any]],
+    client: httpx.AsyncClient,
+    concurrency: int = DISCOVERY_CONCURRENCY,
+    batch_size: int = DISCOVERY_BATCH_SIZE,
+    known_descriptions: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Searches up to `concurrency` models at a time (skipping those with a
+    description in `known_descriptions`), then categorizes them `batch_size`
+    per prompt (1 = one prompt per model). Models a batch reply leaves out
+    are retried on their own.
+    Returns: list of {provider, model_id, category, rating, context_window,
+    description} in the same order as `models`.
+    """
+    limiter = RateLimiter(concurrency=concurrency)
+    progress = Progress("categorized", len(models))
+    known_descriptions = known_descriptions or {}
+
+    async def _describe(model: Dict[str, Any]) -> str:
+        model_id = model.get("model_id", "unknown").strip()
+        if model_id in known_descriptions:
+            return known_descriptions[model_id]
+        async with limiter:
+            return await search_model_info(client, model_id)
+
+    descriptions = await asyncio.gather(*(_describe(m) for m in models))
+    pairs = list(zip(models, descriptions))
+
+    def _report(result: Dict[str, Any]) -> Dict[str, Any]:
+        progress.step(
+            f"{result['provider']} | {result['model_id']} → "
+            f"category={result['category']} rating={result['rating']}"
+        )
+        return result
+
+    async def _single(model: Dict[str, Any], description: str) -> Dict[str, Any]:
+        async with limiter:
+            return _report(await _categorize_model(client, model, description))
+
+    async def _batch(batch: List[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        if len(batch) == 1:
+            return [await _single(*batch[0])]
+        async with limiter:
+            found = await _categorize_batch(client, batch)
+        results, retries = [], []
+        for model, description in batch:
+            result = found.get(model.get("model_id", "unknown").strip())
+            if result is None:
+                retries.append(_single(model, description))
+            else:
+                results.append(_report(result))
+        if retries:
+            print(f"   ↻ {len(retries)}/{len(batch)} models missing from batch reply; retrying one by one")
+            results.extend(await asyncio.gather(*retries))
+        return results
+
+    if batch_size <= 1:
+        results = await asyncio.gather(*(_single(m, d) for m, d in pairs))
+    else:
+        batches = await asyncio.gather(
+            *(_batch(pairs[i : i + batch_size]) for i in range(0, len(pairs), batch_size))
+        )
+        results = [r for batch in batches for r in batch]
+
+    by_key = {(r["provider"], r["model_id"]): r for r in results}
+    return [
+        {
+            **by_key[(m.get("provider", "unknown"), m.get("model_id", "unknown").strip())],
+            "description": description,
+        }
+        for m, description in pairs
+    ]
+
+
+# =========================
+# Ping (chat "hi") eligible models
+# =========================
+ELIGIBLE_CATEGORIES = {"text", "coding", "multimodal"}
 
 
 async def _retry_async(fn, retries: int = 2, backoff: float = 1.5):
@@ -293,26 +472,36 @@ async def _ping_mistral_model(
     return await _retry_async(_do)
 
 
-async def ping_models(models: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def ping_models(
+    models: List[Dict[str, Any]],
+    order_key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
     """
-    Input models must already include category & rating.
+    Input models must already include category & rating. Eligible models
+    are pinged in `order_key` order (if given), at most `limit` of them.
     Returns ping results list with fields:
       provider, model_id, category, rating, ping_ok, latency_sec, error
     """
     limiter = RateLimiter(concurrency=4)
     results: List[Dict[str, Any]] = []
 
-    async with httpx.AsyncClient(timeout=60) as client:
+    eligible = [
+        m for m in models if (m.get("category") or "").lower() in ELIGIBLE_CATEGORIES
+    ]
+    if order_key is not None:
+        eligible.sort(key=order_key)
+    if limit:
+        eligible = eligible[:limit]
+
+    async with _provider_client(timeout=60) as client:
         tasks = []
-        for m in models:
+        for m in eligible:
             provider = m["provider"]
             model_id = m["model_id"]
             category = (m.get("category") or "").lower()
             rating = m.get("rating")
 
-            if category not in ELIGIBLE_CATEGORIES:
-                continue
-
             async def _task(p=provider, mid=model_id, cat=category, rat=rating):
                 async with limiter:
                     try:
@@ -362,104 +551,285 @@ async def ping_models(models: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 
 
 # =========================
-# Save to DB & Excel (models + pings)
+# Incremental discovery
 # =========================
-async def persist_models_to_db(categorized: List[Dict[str, Any]]) -> bool:
-    wrote_to_db = False
+@dataclass
+class DiscoveryPlan:
+    """What a discovery run has to do with the current provider listing."""
+
+    stale: List[Dict[str, Any]]  # new, uncategorized or expired: search + categorize
+    unchanged: List[Dict[str, Any]]  # categorized in ai_models, description still fresh
+    descriptions: Dict[str, str]  # fresh cached descriptions by model_id
+    removed: List[str]  # active in ai_models but no longer listed by their provider
+
+
+async def plan_discovery(listed: List[Dict[str, Any]]) -> DiscoveryPlan:
+    """
+    Diffs the provider listing against ai_models and the model_descriptions
+    cache. Removals are only inferred for providers that listed at least one
+    model, so an empty reply never wipes a whole provider.
+    """
     try:
-        async for db in get_db():  # works when app is running
+        async for db in get_db():
             assert isinstance(db, AsyncSession)
-            for m in categorized:
-                try:
-                    result = await db.execute(
-                        select(AIModel).where(AIModel.model_id == m["model_id"])
+            rows = (await db.execute(select(AIModel))).scalars().all()
+            cached = (
+                await db.execute(
+                    select(ModelDescription).where(
+                        ModelDescription.expires_at > datetime.utcnow()
                     )
-                    row = result.scalar_one_or_none()
-                    if row is None:
-                        db.add(
-                            AIModel(
-                                provider=m["provider"],
-                                model_id=m["model_id"],
-                                category=m.get("category"),
-                                rating=m.get("rating"),
-                                total_requests=0,
-                                total_response_time=0.0,
-                                average_response_time=0.0,
-                            )
-                        )
-                    else:
-                        # keep provider/model_id stable; update category/rating if changed
-                        row.category = m.get("category") or row.category
-                        row.rating = m.get("rating") or row.rating
-                except Exception as e:
-                    await db.rollback()
-                    print(f"⚠️ Failed to upsert {m['model_id']}: {e}")
+                )
+            ).scalars().all()
+    except Exception as e:
+        print("⚠️ Could not read known models; categorizing everything.", e)
+        return DiscoveryPlan(stale=list(listed), unchanged=[], descriptions={}, removed=[])
+
+    known = {row.model_id: row for row in rows}
+    fresh = {d.model_id: d.description for d in cached}
+
+    stale: List[Dict[str, Any]] = []
+    unchanged: List[Dict[str, Any]] = []
+    for m in listed:
+        row = known.get(m["model_id"])
+        if (
+            row is None
+            or m["model_id"] not in fresh
+            or (row.category or "unknown") == "unknown"
+        ):
+            stale.append(m)
+            continue
+        unchanged.append(
+            {
+                "provider": m["provider"],
+                "model_id": m["model_id"],
+                "category": row.category,
+                "rating": row.rating,
+                "context_window": m.get("context_window") or row.context_window,
+            }
+        )
+
+    listed_ids = {m["model_id"] for m in listed}
+    listed_providers = {m["provider"] for m in listed}
+    removed = [
+        row.model_id
+        for row in rows
+        if row.is_active
+        and row.provider in listed_providers
+        and row.model_id not in listed_ids
+    ]
+    return DiscoveryPlan(stale=stale, unchanged=unchanged, descriptions=fresh, removed=removed)
+
+
+async def persist_descriptions(
+    categorized: List[Dict[str, Any]], ttl: float = MODEL_DESCRIPTION_TTL
+) -> int:
+    """
+    Caches freshly searched descriptions. The placeholder for "nothing found"
+    (or no SERPER_API_KEY) is cached too, with the same TTL, so such models
+    are not searched and categorized again on every run.
+    """
+    now = datetime.utcnow()
+    entries = [
+        ModelDescription(
+            model_id=m["model_id"],
+            provider=m["provider"],
+            description=m["description"],
+            fetched_at=now,
+            expires_at=now + timedelta(seconds=ttl),
+        )
+        for m in categorized
+        if m.get("description")
+    ]
+    if not entries:
+        return 0
+    try:
+        async for db in get_db():
+            assert isinstance(db, AsyncSession)
+            for entry in entries:
+                await db.merge(entry)
             await db.commit()
-            wrote_to_db = True
     except Exception as e:
-        print("⚠️ Could not write models to DB via get_db(). Is FastAPI running?", e)
-    return wrote_to_db
+        print("⚠️ Could not cache model descriptions.", e)
+        return 0
+    return len(entries)
 
 
-async def persist_pings_to_db(pings: List[Dict[str, Any]]) -> bool:
-    wrote = False
+async def deactivate_models(model_ids: List[str]) -> int:
+    """Soft-deletes models the providers no longer list; routing skips them."""
+    if not model_ids:
+        return 0
     try:
         async for db in get_db():
             assert isinstance(db, AsyncSession)
-            for p in pings:
-                try:
-                    # Update requests/response_time/average_response_time
-                    result = await db.execute(
-                        select(AIModel).where(AIModel.model_id == p["model_id"])
-                    )
-                    row = result.scalar_one_or_none()
-                    if row:
-                        row.total_requests = (row.total_requests or 0) + 1
-                        if (
-                            p["ping_ok"]
-                            and isinstance(p["latency_sec"], (int, float))
-                            and not math.isnan(p["latency_sec"])
-                        ):
-                            row.total_response_time = float(p["latency_sec"])
-                            # Recompute a simple rolling average
-                            # avg_{n} = avg_{n-1} + (x_n - avg_{n-1})/n
-                            n = max(row.total_requests, 1)
-                            prev_avg = float(row.average_response_time or 0.0)
-                            new_val = float(p["latency_sec"])
-                            row.average_response_time = (
-                                prev_avg + (new_val - prev_avg) / n
-                            )
-                    else:
-                        # If the row doesn't exist (unlikely), insert a minimal record
-                        db.add(
-                            AIModel(
-                                provider=p["provider"],
-                                model_id=p["model_id"],
-                                category=p.get("category"),
-                                rating=p.get("rating"),
-                                total_requests=1,
-                                totoal_response_time=(
-                                    float(p["latency_sec"])
-                                    if p["ping_ok"]
-                                    and isinstance(p["latency_sec"], (int, float))
-                                    else 0.0
-                                ),
-                                average_response_time=(
-                                    float(p["latency_sec"])
-                                    if p["ping_ok"]
-                                    and isinstance(p["latency_sec"], (int, float))
-                                    else 0.0
-                                ),
-                            )
-                        )
-                except Exception as e:
-                    await db.rollback()
-                    print(f"⚠️ Failed to update ping stats for {p['model_id']}: {e}")
+            result = await db.execute(
+                update(AIModel)
+                .where(AIModel.model_id.in_(model_ids), AIModel.is_active)
+                .values(is_active=False, deactivated_at=datetime.utcnow())
+            )
             await db.commit()
-            wrote = True
+            model_catalog.invalidate()
+            return result.rowcount or 0
+    except Exception as e:
+        print("⚠️ Could not deactivate removed models.", e)
+    return 0
+
+
+# =========================
+# Save to DB & Excel (models + pings)
+# =========================
+# Rows per multi-row INSERT / UPDATE ... FROM (VALUES ...); keeps each
+# statement well under the 32767 bind parameters asyncpg allows, while the
+# whole run stays one transaction
+_BULK_CHUNK = 1000
+
+
+def _as_rating(value: Any) -> Optional[int]:
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def _chunks(rows: List[Any], size: int = _BULK_CHUNK):
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+
+def catalog_row(m: Dict[str, Any]) -> Dict[str, Any]:
+    """Row of upsert_models_statement() for one categorized model."""
+    return {
+        "provider": m["provider"],
+        "model_id": m["model_id"],
+        "category": m["category"],
+        "rating": m["rating"],
+        "context_window": m.get("context_window"),
+        "total_requests": 0,
+        "total_response_time": 0.0,
+        "average_response_time": 0.0,
+        "is_active": True,
+    }
+
+
+def upsert_models_statement(rows: List[Dict[str, Any]]):
+    """
+    One INSERT ... VALUES (...), (...) ON CONFLICT (model_id) DO UPDATE for a
+    chunk of catalog_row() dicts (model ids must be unique within it).
+    New rows start with zeroed stats; existing rows keep provider and stats,
+    take the new category/rating and are re-activated.
+    """
+    stmt = pg_insert(AIModel).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[AIModel.model_id],
+        set_={
+            "category": stmt.excluded.category,
+            "rating": stmt.excluded.rating,
+            "context_window": func.coalesce(
+                stmt.excluded.context_window, AIModel.context_window
+            ),
+            "is_active": True,
+            "deactivated_at": None,
+        },
+    )
+
+
+def ping_stats_statement(rows: List[Tuple[str, int, float]]):
+    """
+    UPDATE ai_models ... FROM (VALUES (model_id, pings, latency_sum), ...):
+    adds successful pings to the running totals and recomputes the average.
+    """
+    pings = values(
+        column("model_id", String),
+        column("pings", Integer),
+        column("latency_sum", Float),
+        name="pings",
+    ).data(rows)
+    total_requests = func.coalesce(AIModel.total_requests, 0) + pings.c.pings
+    total_response_time = (
+        func.coalesce(AIModel.total_response_time, 0.0) + pings.c.latency_sum
+    )
+    return (
+        update(AIModel)
+        .where(AIModel.model_id == pings.c.model_id)
+        .values(
+            total_requests=total_requests,
+            total_response_time=total_response_time,
+            average_response_time=total_response_time / total_requests,
+        )
+    )
+
+
+def catalog_rows(categorized: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """catalog_row() per categorized model, minus uncategorized and repeated ids."""
+    by_id: Dict[str, Dict[str, Any]] = {}
+    skipped = duplicates = 0
+    for m in categorized:
+        rating = _as_rating(m.get("rating"))
+        category = (m.get("category") or "").strip()
+        if rating is None or not category or category == "unknown":
+            # Left out so the next incremental run categorizes it again
+            skipped += 1
+            continue
+        if m["model_id"] in by_id:
+            # ON CONFLICT DO UPDATE cannot touch the same row twice in one
+            # statement; the first provider listing a model keeps it
+            duplicates += 1
+            continue
+        by_id[m["model_id"]] = catalog_row({**m, "category": category, "rating": rating})
+    if skipped:
+        print(f"⚠️ {skipped} models without a category/rating were not saved")
+    if duplicates:
+        print(f"⚠️ {duplicates} model ids listed by more than one provider were saved once")
+    return list(by_id.values())
+
+
+def ping_rows(pings: List[Dict[str, Any]]) -> List[Tuple[str, int, float]]:
+    """
+    (model_id, successful pings, latency sum) per model. Failed pings carry
+    no latency and leave the stats alone.
+    """
+    per_model: Dict[str, List[float]] = {}
+    for p in pings:
+        latency = p.get("latency_sec")
+        if (
+            p.get("ping_ok")
+            and isinstance(latency, (int, float))
+            and not math.isnan(latency)
+        ):
+            per_model.setdefault(p["model_id"], []).append(float(latency))
+    return [(mid, len(ls), sum(ls)) for mid, ls in per_model.items()]
+
+
+async def persist_catalog_to_db(
+    categorized: List[Dict[str, Any]], pings: List[Dict[str, Any]]
+) -> bool:
+    """
+    Upserts the catalog (multi-row INSERT ... ON CONFLICT per chunk) and folds
+    the successful pings into total_requests / total_response_time /
+    average_response_time, all in one transaction: a failed run leaves
+    neither half behind. Pings of models without an ai_models row are skipped.
+    """
+    rows = catalog_rows(categorized)
+    stats = ping_rows(pings)
+
+    wrote_to_db = False
+    try:
+        async for db in get_db():  # works when app is running
+            assert isinstance(db, AsyncSession)
+            try:
+                for chunk in _chunks(rows):
+                    await db.execute(upsert_models_statement(chunk))
+                for chunk in _chunks(stats):
+                    await db.execute(ping_stats_statement(chunk))
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            wrote_to_db = True
+            # Routing reads from the in-memory catalog; pick up the new rows
+            model_catalog.invalidate()
     except Exception as e:
-        print("⚠️ Could not write ping stats to DB via get_db(). Is FastAPI running?", e)
-    return wrote
+        print("⚠️ Could not write models to DB via get_db(). Is FastAPI running?", e)
+    return wrote_to_db
 
 
 def persist_to_excel_models(
@@ -492,35 +862,68 @@ def persist_to_excel_pings(
 # =========================
 # Orchestrator
 # =========================
-async def save_models_to_db_and_probe():
-    print("📡 Collecting model list from Groq & Mistral")
-    raw_models = collect_all_models()
-
-    print("🤖 Categorizing models using Groq REST API")
-    categorized = await categorize_models(raw_models)
-
-    # Persist catalog
-    wrote_models = await persist_models_to_db(categorized)
-    persist_to_excel_models(categorized)
-    if wrote_models:
-        print("✅ Saved models to DB and Excel")
-    else:
-        print("✅ Saved models to Excel only (DB for models skipped)")
+async def save_models_to_db_and_probe(
+    full: bool = False,
+    excel: bool = True,
+    ping_order: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    max_pings: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Incremental by default: only models that are new, uncategorized or whose
+    cached description expired are searched and categorized; `full=True`
+    re-categorizes the whole listing. `excel=False` skips the spreadsheets
+    (pandas writes block the event loop). Returns the ping results.
+    """
+    async with _provider_client(timeout=40) as client:
+        print("📡 Collecting model list from Groq & Mistral")
+        raw_models = await collect_all_models(client)
+
+        plan = await plan_discovery(raw_models)
+        if full:
+            plan.stale, plan.unchanged = raw_models, []
+        print(
+            f"🧮 {len(raw_models)} listed: {len(plan.stale)} to categorize, "
+            f"{len(plan.unchanged)} unchanged, {len(plan.removed)} removed"
+        )
 
-    print("🛰️ Probing eligible models (text, coding, multimodal) with a 'hi' chat")
-    pings = await ping_models(categorized)
+        fresh: List[Dict[str, Any]] = []
+        if plan.stale:
+            print(
+                f"🤖 Categorizing {len(plan.stale)} models using Groq REST API "
+                f"({DISCOVERY_CONCURRENCY} at a time)"
+            )
+            fresh = await categorize_models(
+                plan.stale,
+                client,
+                known_descriptions={} if full else plan.descriptions,
+            )
+
+    await persist_descriptions(
+        [m for m in fresh if full or m["model_id"] not in plan.descriptions]
+    )
+    if plan.removed:
+        deactivated = await deactivate_models(plan.removed)
+        print(f"🗑️ Deactivated {deactivated} models no longer listed: {plan.removed}")
 
-    wrote_pings = await persist_pings_to_db(pings)
-    persist_to_excel_pings(pings)
+    categorized = plan.unchanged + fresh
+
+    print("🛰️ Probing eligible models (text, coding, multimodal) with a 'hi' chat")
+    pings = await ping_models(categorized, order_key=ping_order, limit=max_pings)
 
     ok_count = sum(1 for p in pings if p["ping_ok"])
     total = len(pings)
     print(f"📊 Ping summary: {ok_count}/{total} succeeded")
 
-    if wrote_pings:
-        print("✅ Persisted ping stats to DB and Excel")
+    # Persist catalog and ping stats together
+    wrote = await persist_catalog_to_db(categorized, pings)
+    if excel:
+        persist_to_excel_models(categorized)
+        persist_to_excel_pings(pings)
+    if wrote:
+        print("✅ Saved models and ping stats to DB" + (" and Excel" if excel else ""))
     else:
-        print("✅ Persisted ping stats to Excel (DB for pings skipped)")
+        print("⚠️ Models and ping stats not saved to DB" + (" (Excel written)" if excel else ""))
+    return pings
 
 
 # =========================
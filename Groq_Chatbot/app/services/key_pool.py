@@ -0,0 +1,58 @@
+import time
+from typing import List, Optional, Sequence, Union
+
+from app.core.rate_limit import RateLimitScheduler, rate_scheduler
+
+
+class ProviderKeyPool:
+    """
+    All of a user's API keys for one provider. Every `pick()` returns the key
+    that was rate limited least recently, ties broken by the fewest requests
+    sent, which spreads steady traffic round-robin across the keys. Keys the
+    scheduler benched after a 429 / 401 are skipped until their bench ends,
+    unless every key is benched, in which case the one freed soonest is used.
+    Usage and bench state live in the shared scheduler, so they persist
+    across requests and pools.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        keys: Sequence[str],
+        scheduler: RateLimitScheduler = rate_scheduler,
+    ):
+        self.provider = provider.lower()
+        self.keys: List[str] = list(dict.fromkeys(keys))
+        self._scheduler = scheduler
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        # Never print raw keys
+        return f"ProviderKeyPool({self.provider!r}, {len(self.keys)} keys)"
+
+    def pick(self) -> str:
+        if not self.keys:
+            raise RuntimeError(f"No {self.provider} API key provided")
+        now = time.monotonic()
+        usage = {k: self._scheduler.usage(self.provider, k) for k in self.keys}
+        active = [k for k in self.keys if usage[k].benched_until <= now]
+        if not active:
+            return min(self.keys, key=lambda k: usage[k].benched_until)
+        return min(
+            active, key=lambda k: (usage[k].last_limited_at, usage[k].requests)
+        )
+
+
+ApiKey = Union[str, ProviderKeyPool, None]
+
+
+def resolve_key(api_key: ApiKey) -> Optional[str]:
+    """The concrete key for one call: pools pick per call, plain keys pass through."""
+    if isinstance(api_key, ProviderKeyPool):
+        return api_key.pick() if api_key else None
+    return api_key
@@ -0,0 +1,283 @@
+import asyncio
+import bisect
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.models import ModelLatencyBucket
+from app.db.session import AsyncSessionLocal
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is
+# open-ended. Stored per row, so changing them only affects new rows.
+HISTOGRAM_BOUNDS: Tuple[float, ...] = (
+    0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 21.0, 34.0, 60.0,
+)
+
+
+def histogram_percentile(
+    counts: Sequence[int], pct: float, bounds: Sequence[float] = HISTOGRAM_BOUNDS
+) -> Optional[float]:
+    """Percentile estimate from bucket counts, interpolated inside the bucket."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = pct / 100 * total
+    seen = 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower = bounds[i - 1] if i > 0 else 0.0
+            upper = bounds[i] if i < len(bounds) else bounds[-1] * 2
+            return round(lower + (upper - lower) * (rank - seen) / count, 3)
+        seen += count
+    return bounds[-1]
+
+
+def exact_percentile(samples: Sequence[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return round(ordered[index], 3)
+
+
+@dataclass
+class _Bucket:
+    """Counters for one model in one time bucket, waiting to be flushed."""
+
+    requests: int = 0
+    errors: int = 0
+    latency_sum: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    histogram: List[int] = field(
+        default_factory=lambda: [0] * (len(HISTOGRAM_BOUNDS) + 1)
+    )
+
+    def merge(self, other: "_Bucket") -> None:
+        self.requests += other.requests
+        self.errors += other.errors
+        self.latency_sum += other.latency_sum
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+
+@dataclass
+class _Recent:
+    """Live view of a model used for routing: EWMA plus the last N latencies."""
+
+    ewma: Optional[float] = None
+    samples: Deque[float] = field(default_factory=deque)
+    outcomes: Deque[bool] = field(default_factory=deque)
+
+
+class LatencyTelemetry:
+    """
+    Rolling latency/success/token telemetry per model.
+
+    `record()` updates two in-memory views: a recent-window view (EWMA and the
+    last `window_size` samples) that the router scores on, and per-minute
+    histogram buckets that a background loop appends to model_latency_buckets
+    every `flush_interval` seconds. Rows are insert-only (one per model, time
+    bucket and flush), so several workers can flush the same bucket; readers
+    sum them. `on_flush` runs after every flush, e.g. to re-rank the catalog.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int,
+        flush_interval: float,
+        window_size: int,
+        ewma_alpha: float,
+        min_samples: int,
+        on_flush: Optional[Callable[[], None]] = None,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.flush_interval = flush_interval
+        self.window_size = window_size
+        self.ewma_alpha = ewma_alpha
+        self.min_samples = min_samples
+        self.on_flush = on_flush
+        self._recent: Dict[str, _Recent] = {}
+        self._pending: Dict[Tuple[str, datetime], _Bucket] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def _bucket_start(self) -> datetime:
+        epoch = int(time.time())
+        return datetime.utcfromtimestamp(epoch - epoch % self.bucket_seconds)
+
+    def record(
+        self,
+        model_id: str,
+        latency: float,
+        ok: bool = True,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ) -> None:
+        key = (model_id, self._bucket_start())
+        bucket = self._pending.get(key)
+        if bucket is None:
+            bucket = self._pending[key] = _Bucket()
+        bucket.requests += 1
+        bucket.prompt_tokens += prompt_tokens
+        bucket.completion_tokens += completion_tokens
+
+        recent = self._recent.get(model_id)
+        if recent is None:
+            recent = self._recent[model_id] = _Recent(
+                samples=deque(maxlen=self.window_size),
+                outcomes=deque(maxlen=self.window_size),
+            )
+        recent.outcomes.append(ok)
+        if not ok:
+            # Failures are fast or timeouts; either way not a latency sample
+            bucket.errors += 1
+            return
+
+        bucket.latency_sum += latency
+        bucket.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, latency)] += 1
+        recent.samples.append(latency)
+        recent.ewma = (
+            latency
+            if recent.ewma is None
+            else self.ewma_alpha * latency + (1 - self.ewma_alpha) * recent.ewma
+        )
+
+    # ------------------------------------------------------------------
+    # Routing view
+    # ------------------------------------------------------------------
+    def routing_latency(self, model_id: str) -> Optional[float]:
+        """
+        Latency the router should assume for `model_id`: the mean of the
+        recent EWMA and p95 (so a heavy tail costs score even when the typical
+        call is fast), or None until `min_samples` recent calls are known.
+        """
+        recent = self._recent.get(model_id)
+        if recent is None or len(recent.samples) < self.min_samples:
+            return None
+        return (recent.ewma + exact_percentile(recent.samples, 95)) / 2
+
+    def recent_p95(self, model_id: str) -> Optional[float]:
+        recent = self._recent.get(model_id)
+        if recent is None or len(recent.samples) < self.min_samples:
+            return None
+        return exact_percentile(recent.samples, 95)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """In-memory recent-window stats per model (this worker only)."""
+        out = {}
+        for model_id, recent in self._recent.items():
+            samples = list(recent.samples)
+            out[model_id] = {
+                "samples": len(samples),
+                "ewma": round(recent.ewma, 3) if recent.ewma is not None else None,
+                "p50": exact_percentile(samples, 50),
+                "p95": exact_percentile(samples, 95),
+                "p99": exact_percentile(samples, 99),
+                "success_rate": (
+                    round(sum(recent.outcomes) / len(recent.outcomes), 3)
+                    if recent.outcomes
+                    else None
+                ),
+            }
+        return out
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    async def flush(self) -> int:
+        """Append pending buckets in one transaction; returns rows written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            try:
+                async with AsyncSessionLocal() as db:
+                    db.add_all(
+                        ModelLatencyBucket(
+                            model_id=model_id,
+                            bucket_start=bucket_start,
+                            requests=b.requests,
+                            errors=b.errors,
+                            latency_sum=b.latency_sum,
+                            prompt_tokens=b.prompt_tokens,
+                            completion_tokens=b.completion_tokens,
+                            histogram=b.histogram,
+                        )
+                        for (model_id, bucket_start), b in batch.items()
+                    )
+                    await db.commit()
+            except Exception as e:
+                for key, b in batch.items():
+                    self._pending.setdefault(key, _Bucket()).merge(b)
+                print(f"⚠️ Could not flush latency telemetry: {e}")
+                return 0
+            if self.on_flush is not None:
+                self.on_flush()
+            return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+async def recent_percentiles(
+    db: AsyncSession, minutes: int, model_id: Optional[str] = None
+) -> Dict[str, Dict]:
+    """Per-model p50/p95/p99, error rate and token totals over the last `minutes`."""
+    since = datetime.utcnow() - timedelta(minutes=minutes)
+    stmt = select(ModelLatencyBucket).where(ModelLatencyBucket.bucket_start >= since)
+    if model_id is not None:
+        stmt = stmt.where(ModelLatencyBucket.model_id == model_id)
+    rows = (await db.execute(stmt)).scalars().all()
+
+    merged: Dict[str, _Bucket] = {}
+    for row in rows:
+        bucket = _Bucket(
+            requests=row.requests,
+            errors=row.errors,
+            latency_sum=row.latency_sum,
+            prompt_tokens=row.prompt_tokens,
+            completion_tokens=row.completion_tokens,
+            histogram=list(row.histogram),
+        )
+        merged.setdefault(row.model_id, _Bucket()).merge(bucket)
+
+    out = {}
+    for mid, b in merged.items():
+        successes = b.requests - b.errors
+        out[mid] = {
+            "requests": b.requests,
+            "error_rate": round(b.errors / b.requests, 3) if b.requests else None,
+            "mean": round(b.latency_sum / successes, 3) if successes else None,
+            "p50": histogram_percentile(b.histogram, 50),
+            "p95": histogram_percentile(b.histogram, 95),
+            "p99": histogram_percentile(b.histogram, 99),
+            "prompt_tokens": b.prompt_tokens,
+            "completion_tokens": b.completion_tokens,
+        }
+    return out
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.models import AIModel
+from app.core.cache import TTLCache
+from app.db.session import AsyncSessionLocal
+
+# Model ids recently looked up in ai_models and not found there
+_MISSING_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class CatalogModel:
+    """Detached snapshot of an AIModel row (safe to share across sessions)."""
+
+    model_id: str
+    provider: str
+    category: Optional[str]
+    rating: Optional[int]
+    average_response_time: Optional[float]
+    context_window: Optional[int]
+
+    @classmethod
+    def from_row(cls, row: AIModel) -> "CatalogModel":
+        return cls(
+            model_id=row.model_id,
+            provider=row.provider,
+            category=row.category,
+            rating=row.rating,
+            average_response_time=row.average_response_time,
+            context_window=row.context_window,
+        )
+
+
+class ModelCatalog:
+    """
+    In-process cache of the active rows of the ai_models table.
+
+    Rows are indexed by model_id and by category, and every category keeps a
+    pre-sorted candidate list per complexity bucket, so routing a request does
+    not touch the database. The snapshot is reloaded after `ttl` seconds (in
+    the background, stale data is served meanwhile) or right away after
+    `invalidate()`.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[CatalogModel, float], float],
+        complexity_buckets: Sequence[float],
+        ttl: float,
+    ):
+        self._score_fn = score_fn
+        self._buckets = tuple(complexity_buckets)
+        self.ttl = ttl
+        self._by_id: Dict[str, CatalogModel] = {}
+        self._rankings: Dict[Tuple[str, float], List[CatalogModel]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._missing: TTLCache[str, bool] = TTLCache(_MISSING_CACHE_SIZE, ttl)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _rank(
+        self, by_id: Dict[str, CatalogModel]
+    ) -> Dict[Tuple[str, float], List[CatalogModel]]:
+        by_category: Dict[str, List[CatalogModel]] = {}
+        for m in by_id.values():
+            by_category.setdefault(m.category or "", []).append(m)
+
+        rankings: Dict[Tuple[str, float], List[CatalogModel]] = {}
+        for category, models in by_category.items():
+            for bucket in self._buckets:
+                rankings[(category, bucket)] = sorted(
+                    models, key=lambda m: self._score_fn(m, bucket), reverse=True
+                )
+        return rankings
+
+    def _build(self, rows: Sequence[AIModel]) -> None:
+        by_id = {row.model_id: CatalogModel.from_row(row) for row in rows}
+        rankings = self._rank(by_id)
+        # Swap in one go so readers never see a half-built catalog
+        self._by_id, self._rankings = by_id, rankings
+        self._loaded_at = time.monotonic()
+
+    def rerank(self) -> None:
+        """Re-score the current snapshot, e.g. when live latency data moved."""
+        if self._by_id:
+            self._rankings = self._rank(self._by_id)
+
+    async def _load(self, db: AsyncSession) -> None:
+        result = await db.execute(select(AIModel).where(AIModel.is_active))
+        self._build(result.scalars().all())
+        print(f"📚 Model catalog loaded: {len(self._by_id)} models")
+
+    async def refresh(self, db: Optional[AsyncSession] = None) -> None:
+        async with self._lock:
+            if db is not None:
+                await self._load(db)
+                return
+            async with AsyncSessionLocal() as own_db:
+                await self._load(own_db)
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"⚠️ Model catalog refresh failed: {e}")
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Load on first use; afterwards refresh stale data off the request path."""
+        if self._loaded_at is None:
+            async with self._lock:
+                if self._loaded_at is None:
+                    await self._load(db)
+            return
+
+        if time.monotonic() - self._loaded_at < self.ttl:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale, e.g. after the models table was rewritten."""
+        if self._loaded_at is not None:
+            self._loaded_at = float("-inf")
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def get(self, model_id: str) -> Optional[CatalogModel]:
+        return self._by_id.get(model_id)
+
+    async def lookup(self, db: AsyncSession, model_id: str) -> Optional[CatalogModel]:
+        """
+        Like get(), but a miss is checked against the table: the model may
+        have been added by another worker's discovery run (which only
+        invalidates that worker's catalog). A hit there also schedules a
+        reload, so the snapshot catches up; a miss is remembered for `ttl`
+        seconds, so unknown ids do not cost a query per request.
+        """
+        cached = self._by_id.get(model_id)
+        if cached is not None:
+            return cached
+        if self._missing.get(model_id):
+            return None
+        row = (
+            await db.execute(
+                select(AIModel).where(AIModel.model_id == model_id, AIModel.is_active)
+            )
+        ).scalar_one_or_none()
+        if row is None:
+            self._missing.set(model_id, True)
+            return None
+        self.invalidate()
+        return CatalogModel.from_row(row)
+
+    def ranked(self, category: str, complexity: float) -> List[CatalogModel]:
+        """Models of `category`, best first, for the nearest complexity bucket."""
+        bucket = min(self._buckets, key=lambda b: abs(b - complexity))
+        return self._rankings.get((category, bucket), [])
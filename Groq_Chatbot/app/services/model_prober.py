@@ -0,0 +1,210 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import (
+    PROBER_INITIAL_DELAY,
+    PROBER_INTERVAL,
+    PROBER_JITTER,
+    PROBER_LOCK_KEY,
+    PROBER_MAX_PINGS,
+)
+from app.db.session import engine
+from app.groq_client import circuit_breakers, latency_telemetry
+
+
+def probe_priority(model: Dict[str, Any]) -> int:
+    """
+    Ping order: models whose circuit is open first (a good ping closes it),
+    then models without recent traffic (routing falls back to stored
+    averages for them), then everything else.
+    """
+    if not circuit_breakers.available(model["model_id"], model["provider"]):
+        return 0
+    if latency_telemetry.routing_latency(model["model_id"]) is None:
+        return 1
+    return 2
+
+
+class ModelProber:
+    """
+    Re-runs model discovery and the "hi" pings from inside the app
+    (app/services/fetch_models.py), first `initial_delay` seconds after
+    startup and then every `interval` seconds ± `jitter` (a fraction), so
+    workers started together drift apart.
+
+    Only one worker probes: the first to take the Postgres advisory lock
+    `lock_key` keeps it on a dedicated connection until shutdown (or until
+    that connection dies, when another worker takes over on its next tick).
+    Other databases have no advisory locks and are assumed single-worker.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        jitter: float,
+        initial_delay: float,
+        max_pings: int,
+        lock_key: int,
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.initial_delay = initial_delay
+        self.max_pings = max_pings
+        self.lock_key = lock_key
+        self._task: Optional[asyncio.Task] = None
+        self._lock_conn: Optional[AsyncConnection] = None
+        self._leader = False
+        self.runs = 0
+        self.skipped = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.last_result: Optional[Dict[str, int]] = None
+        self.last_error: Optional[str] = None
+        self.next_run_at: Optional[datetime] = None
+
+    def next_delay(self) -> float:
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    # ------------------------------------------------------------------
+    # Single-worker lock
+    # ------------------------------------------------------------------
+    async def _acquire_lock(self) -> bool:
+        if self._lock_conn is not None:
+            try:
+                await self._lock_conn.execute(text("SELECT 1"))
+                await self._lock_conn.commit()
+                return True
+            except Exception as e:
+                # The lock went with the connection; try to take it again
+                print(f"⚠️ Model prober lost its lock connection: {e}")
+                await self._release_lock()
+        elif self._leader:
+            return True
+
+        conn = await engine.connect()
+        try:
+            if conn.dialect.name != "postgresql":
+                await conn.close()
+                self._leader = True
+                return True
+            acquired = await conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+            )
+            # Session-level lock: survives the commit, held while conn is open
+            await conn.commit()
+        except Exception:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        self._lock_conn = conn
+        self._leader = True
+        print("🔒 This worker runs the model prober")
+        return True
+
+    async def _release_lock(self) -> None:
+        conn, self._lock_conn = self._lock_conn, None
+        self._leader = False
+        if conn is None:
+            return
+        try:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key}
+            )
+            await conn.commit()
+        except Exception:
+            pass  # closing the connection releases it anyway
+        finally:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+    async def run_once(self) -> Optional[Dict[str, int]]:
+        """One discovery + ping run; None if another worker holds the lock."""
+        if not await self._acquire_lock():
+            self.skipped += 1
+            return None
+
+        # Imported lazily: fetch_models needs the provider keys and pandas,
+        # neither of which should hold up (or break) app startup
+        from app.services.fetch_models import save_models_to_db_and_probe
+
+        started = time.monotonic()
+        pings = await save_models_to_db_and_probe(
+            excel=False,
+            ping_order=probe_priority,
+            max_pings=self.max_pings or None,
+        )
+        for p in pings:
+            if p["ping_ok"]:
+                # A real round trip succeeded; let the circuit close early
+                circuit_breakers.record(p["model_id"], p["provider"])
+
+        self.runs += 1
+        self.last_run_at = datetime.utcnow()
+        self.last_duration = round(time.monotonic() - started, 2)
+        self.last_result = {
+            "pinged": len(pings),
+            "ok": sum(1 for p in pings if p["ping_ok"]),
+        }
+        self.last_error = None
+        return self.last_result
+
+    async def _run(self) -> None:
+        delay = self.initial_delay
+        while True:
+            self.next_run_at = datetime.utcnow() + timedelta(seconds=delay)
+            await asyncio.sleep(delay)
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.last_error = str(e)[:200]
+                print(f"⚠️ Model prober run failed: {e}")
+            delay = self.next_delay()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release_lock()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "leader": self._leader,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "last_run_at": self.last_run_at,
+            "last_duration": self.last_duration,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "next_run_at": self.next_run_at,
+        }
+
+
+model_prober = ModelProber(
+    PROBER_INTERVAL,
+    PROBER_JITTER,
+    PROBER_INITIAL_DELAY,
+    PROBER_MAX_PINGS,
+    PROBER_LOCK_KEY,
+)
@@ -0,0 +1,138 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from sqlalchemy import func, update
+
+from app.auth.models import AIModel
+from app.db.session import AsyncSessionLocal
+
+
+@dataclass
+class _PendingStats:
+    requests: int = 0
+    response_time: float = 0.0
+    streamed: int = 0
+    first_token_time: float = 0.0
+    hedged: int = 0
+    hedge_wins: int = 0
+
+    def merge(self, other: "_PendingStats") -> None:
+        self.requests += other.requests
+        self.response_time += other.response_time
+        self.streamed += other.streamed
+        self.first_token_time += other.first_token_time
+        self.hedged += other.hedged
+        self.hedge_wins += other.hedge_wins
+
+
+class ModelStatsAggregator:
+    """
+    Write-behind accumulator for per-model latency counters.
+
+    `record()` only touches memory, so the request path never waits on the
+    database. A background loop flushes the deltas every `flush_interval`
+    seconds with one atomic `UPDATE ... SET total_requests = total_requests + n`
+    per model, which also keeps concurrent updates from overwriting each
+    other. `stop()` performs a final flush on shutdown.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, _PendingStats] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    def _stats(self, model_id: str) -> _PendingStats:
+        stats = self._pending.get(model_id)
+        if stats is None:
+            stats = self._pending[model_id] = _PendingStats()
+        return stats
+
+    def record(
+        self,
+        model_id: str,
+        response_time: float,
+        first_token_time: Optional[float] = None,
+    ) -> None:
+        stats = self._stats(model_id)
+        stats.requests += 1
+        stats.response_time += response_time
+        if first_token_time is not None:
+            stats.streamed += 1
+            stats.first_token_time += first_token_time
+
+    def record_hedge(self, model_id: str, won: bool) -> None:
+        """Count a model's participation in a hedged race and whether it won."""
+        stats = self._stats(model_id)
+        stats.hedged += 1
+        if won:
+            stats.hedge_wins += 1
+
+    async def flush(self) -> int:
+        """Write all pending deltas in one transaction; returns models flushed."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            # Swap first: records arriving during the flush go to the next batch
+            batch, self._pending = self._pending, {}
+            try:
+                async with AsyncSessionLocal() as db:
+                    for model_id, stats in batch.items():
+                        await db.execute(_update_statement(model_id, stats))
+                    await db.commit()
+            except Exception as e:
+                # Put the deltas back so the next flush retries them
+                for model_id, stats in batch.items():
+                    self._pending.setdefault(model_id, _PendingStats()).merge(stats)
+                print(f"⚠️ Could not flush model stats: {e}")
+                return 0
+            return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+def _update_statement(model_id: str, stats: _PendingStats):
+    values = {}
+    if stats.requests:
+        total_requests = func.coalesce(AIModel.total_requests, 0) + stats.requests
+        total_response_time = (
+            func.coalesce(AIModel.total_response_time, 0.0) + stats.response_time
+        )
+        values[AIModel.total_requests] = total_requests
+        values[AIModel.total_response_time] = total_response_time
+        values[AIModel.average_response_time] = total_response_time / total_requests
+    if stats.streamed:
+        streamed = func.coalesce(AIModel.streamed_requests, 0) + stats.streamed
+        values[AIModel.streamed_requests] = streamed
+        values[AIModel.average_first_token_time] = (
+            func.coalesce(AIModel.average_first_token_time, 0.0)
+            * func.coalesce(AIModel.streamed_requests, 0)
+            + stats.first_token_time
+        ) / streamed
+    if stats.hedged:
+        values[AIModel.hedged_requests] = (
+            func.coalesce(AIModel.hedged_requests, 0) + stats.hedged
+        )
+        values[AIModel.hedge_wins] = (
+            func.coalesce(AIModel.hedge_wins, 0) + stats.hedge_wins
+        )
+    # Every right-hand side reads the pre-update row, so this is one atomic step
+    return update(AIModel).where(AIModel.model_id == model_id).values(values)
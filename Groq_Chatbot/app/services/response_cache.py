@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.models import LLMResponseCacheEntry
+from app.core.cache import TTLCache
+from app.db.session import AsyncSessionLocal
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cache_key(messages: List[Dict[str, str]], model: str, category: str) -> str:
+    """
+    sha256 of the requested model/category and the prompt, with whitespace
+    collapsed and case folded so "Hi", "hi " and "hi" share an entry.
+    """
+    normalized = [
+        [m.get("role", ""), _WHITESPACE.sub(" ", str(m.get("content", ""))).strip().casefold()]
+        for m in messages
+    ]
+    raw = json.dumps([model, category, normalized], ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Exact-match cache of LLM replies for deterministic-enough prompts
+    (session titles, search query rewrites, and main replies that opt in).
+
+    Lookups hit the in-process LRU first; with `persist` enabled a miss falls
+    through to the llm_response_cache table (so entries survive restarts and
+    are shared between workers) and new entries are written there in the
+    background. Hit/miss counters cover both tiers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, persist: bool):
+        self.ttl = ttl
+        self.persist = persist
+        self._memory: TTLCache[str, Tuple[str, str]] = TTLCache(maxsize, ttl)
+        self._writes: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    async def get(self, db: AsyncSession, key: str) -> Optional[Tuple[str, str]]:
+        """Cached (response_text, used_model) for `key`, or None."""
+        cached = self._memory.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        if self.persist:
+            try:
+                row = (
+                    await db.execute(
+                        select(LLMResponseCacheEntry).where(
+                            LLMResponseCacheEntry.key == key,
+                            LLMResponseCacheEntry.expires_at > datetime.utcnow(),
+                        )
+                    )
+                ).scalar_one_or_none()
+            except Exception as e:
+                print(f"⚠️ Response cache lookup failed: {e}")
+                row = None
+            if row is not None:
+                cached = (row.response, row.used_model)
+                self._memory.set(key, cached)
+                self.hits += 1
+                self.db_hits += 1
+                return cached
+        self.misses += 1
+        return None
+
+    def set(self, key: str, model: str, response: str, used_model: str) -> None:
+        if not response:
+            return
+        self._memory.set(key, (response, used_model))
+        if self.persist:
+            task = asyncio.create_task(self._write(key, model, response, used_model))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def _write(self, key: str, model: str, response: str, used_model: str) -> None:
+        now = datetime.utcnow()
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.merge(
+                    LLMResponseCacheEntry(
+                        key=key,
+                        model=model,
+                        used_model=used_model,
+                        response=response,
+                        created_at=now,
+                        expires_at=now + timedelta(seconds=self.ttl),
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"⚠️ Could not persist response cache entry: {e}")
+
+    async def purge_expired(self) -> int:
+        """Delete expired rows; returns how many went."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(LLMResponseCacheEntry).where(
+                    LLMResponseCacheEntry.expires_at <= datetime.utcnow()
+                )
+            )
+            await db.commit()
+            return result.rowcount or 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._memory),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "persist": self.persist,
+        }
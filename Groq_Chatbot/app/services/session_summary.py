@@ -0,0 +1,108 @@
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.auth.models import ChatSession
+from app.core.config import SUMMARY_KEEP_RECENT_MESSAGES, SUMMARY_MAX_BATCH_MESSAGES
+from app.db.crud import get_session_messages_after
+from app.db.session import AsyncSessionLocal
+from app.groq_client import get_model_response
+from app.services.key_pool import ApiKey
+from app.services.turn_persistence import message_queue
+
+SUMMARY_MODEL = "openai/gpt-oss-20b"
+
+# Sessions with a refresh in flight in this process (avoid duplicate work)
+_refreshing: Set[UUID] = set()
+
+
+def summary_system_message(summary: str) -> Dict[str, str]:
+    return {
+        "role": "system",
+        "content": f"Summary of the earlier conversation (older turns are omitted):\n{summary}",
+    }
+
+
+def build_summary_prompt(
+    previous_summary: Optional[str], messages: List[Dict[str, str]]
+) -> str:
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    return f"""
+    You maintain a running summary of a conversation between a user and an assistant.
+
+    Current summary:
+    {previous_summary or "(none yet)"}
+
+    New turns to fold into the summary:
+    {transcript}
+
+    Rules:
+    - Keep facts, decisions, names, numbers, code identifiers and open questions
+    - Drop greetings, filler and formatting
+    - Write in third person, plain prose or short bullets
+    - Stay under 250 words
+    - Output only the updated summary
+    """
+
+
+async def refresh_session_summary(
+    session_id: UUID,
+    client: AsyncClient,
+    groq_api_key: ApiKey,
+    mistral_api_key: ApiKey,
+) -> None:
+    """
+    Background task: fold the older unsummarized turns of a session into
+    ChatSession.summary, keeping the newest SUMMARY_KEEP_RECENT_MESSAGES
+    verbatim. Failures leave the previous summary untouched.
+    """
+    if session_id in _refreshing:
+        return
+    _refreshing.add(session_id)
+    try:
+        if message_queue.pending_for(session_id):
+            await message_queue.flush()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(ChatSession).where(ChatSession.id == session_id)
+            )
+            session = result.scalar_one_or_none()
+            if not session:
+                return
+
+            pending = await get_session_messages_after(
+                db,
+                session_id,
+                session.summary_last_message_id,
+                limit=SUMMARY_MAX_BATCH_MESSAGES + SUMMARY_KEEP_RECENT_MESSAGES,
+            )
+            to_compact = pending[: max(len(pending) - SUMMARY_KEEP_RECENT_MESSAGES, 0)]
+            if not to_compact:
+                return
+
+            prompt = build_summary_prompt(
+                session.summary,
+                [{"role": m.role, "content": m.content} for m in to_compact],
+            )
+            new_summary, _ = await get_model_response(
+                [{"role": "user", "content": prompt}],
+                SUMMARY_MODEL,
+                "text",
+                db,
+                client,
+                groq_api_key,
+                mistral_api_key,
+            )
+            if not new_summary.strip():
+                return
+
+            session.summary = new_summary.strip()
+            session.summary_last_message_id = to_compact[-1].id
+            await db.commit()
+            print(f"🧾 Session {session_id} summary now covers {len(to_compact)} more messages")
+    except Exception as e:
+        print(f"⚠️ Could not refresh summary for session {session_id}: {e}")
+    finally:
+        _refreshing.discard(session_id)
@@ -0,0 +1,86 @@
+import re
+from typing import Optional
+from uuid import UUID
+
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.auth.models import ChatSession
+from app.db.session import AsyncSessionLocal
+from app.groq_client import get_model_response
+from app.services.key_pool import ApiKey
+
+TITLE_MODEL = "openai/gpt-oss-20b"
+
+
+def heuristic_title(user_message: str, max_words: int = 6) -> str:
+    """Cheap local title used until the LLM-generated one is ready."""
+    words = re.findall(r"[\w'+#.-]+", user_message)
+    words = [w.strip(".-") for w in words if w.strip(".-")][:max_words]
+    if not words:
+        return "New Chat"
+    return " ".join(w if w.isupper() else w.capitalize() for w in words)
+
+
+def build_title_prompt(user_message: str, max_words: Optional[int] = None) -> str:
+    prompt = f"""
+    Create a short, descriptive chat title (max 6 words) for this user query:
+    "{user_message.strip()}"
+
+    Rules:
+    - No quotes or punctuation at the end
+    - Capture the core topic clearly
+    - Capitalize each major word
+    - Do not include the words 'Title' or 'Chat'
+    - Output only the title
+    """
+    if max_words:
+        prompt += f"- Maximum {max_words} words\n"
+    return prompt
+
+
+async def generate_session_title(
+    session_id: UUID,
+    user_message: str,
+    client: AsyncClient,
+    groq_api_key: ApiKey,
+    mistral_api_key: ApiKey,
+    max_words: Optional[int] = None,
+) -> None:
+    """
+    Background task: ask the LLM for a title and store it on the session.
+    Runs after the response, so it uses its own DB session; failures only
+    leave the heuristic title in place.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            generated_title, _ = await get_model_response(
+                [
+                    {
+                        "role": "user",
+                        "content": build_title_prompt(user_message, max_words),
+                    }
+                ],
+                TITLE_MODEL,
+                "text",
+                db,
+                client,
+                groq_api_key,
+                mistral_api_key,
+                cache=True,
+            )
+            generated_title = generated_title.strip()
+            if not generated_title:
+                return
+
+            result = await db.execute(
+                select(ChatSession).where(ChatSession.id == session_id)
+            )
+            session = result.scalar_one_or_none()
+            if not session:
+                return
+            session.title = generated_title
+            await db.commit()
+            print(f"📝 Session title set: {session.title}")
+    except Exception as e:
+        print(f"⚠️ Could not generate title for session {session_id}: {e}")
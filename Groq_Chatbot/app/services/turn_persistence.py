@@ -0,0 +1,278 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.models import ChatMessage, ChatSession
+from app.core.config import (
+    MESSAGE_FLUSH_BATCH,
+    MESSAGE_FLUSH_INTERVAL,
+    MESSAGE_WRITE_BEHIND,
+)
+from app.db.session import AsyncSessionLocal
+
+# Final flush attempts on shutdown before queued messages are given up on
+_STOP_FLUSH_ATTEMPTS = 3
+
+# Detached persists of aborted turns (kept referenced until they finish)
+_background: Set[asyncio.Task] = set()
+
+
+class MessageWriteQueue:
+    """
+    Write-behind for chat messages (MESSAGE_WRITE_BEHIND).
+
+    `enqueue()` only appends to memory, so a turn returns before the
+    database has acknowledged its messages; a background loop inserts
+    everything queued in one multi-row INSERT every `flush_interval` seconds,
+    or as soon as `batch_size` messages wait. A failed flush keeps the rows
+    for the next one. If a row is rejected (e.g. its session was deleted
+    meanwhile) the batch is retried row by row and only that row is dropped.
+    `stop()` drains the queue, so a clean shutdown loses no turn.
+
+    Readers that need a session's newest messages call `pending_for()` and
+    `flush()` first (read-your-writes).
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        flush_interval: float,
+        batch_size: int,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._session_factory = session_factory or AsyncSessionLocal
+        self._pending: List[Dict[str, Any]] = []
+        self._inflight: List[Dict[str, Any]] = []
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    def enqueue(self, rows: List[Dict[str, Any]]) -> None:
+        self._pending.extend(rows)
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def pending_for(self, session_id: UUID) -> bool:
+        """Are messages of `session_id` queued or being written right now?"""
+        return any(
+            row["session_id"] == session_id
+            for row in (*self._inflight, *self._pending)
+        )
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._inflight)
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        async with self._session_factory() as db:
+            await db.execute(insert(ChatMessage), rows)
+            await db.commit()
+
+    async def flush(self) -> int:
+        """Insert everything queued; returns how many messages were written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            self._inflight = batch
+            remaining, written = batch, 0
+            try:
+                try:
+                    await self._insert(batch)
+                    remaining, written = [], len(batch)
+                except IntegrityError:
+                    # A rejected row must not sink the whole batch
+                    while remaining:
+                        row = remaining[0]
+                        try:
+                            await self._insert([row])
+                            written += 1
+                        except IntegrityError as e:
+                            self.dropped += 1
+                            print(f"⚠️ Dropped chat message {row['id']}: {e.orig}")
+                        remaining = remaining[1:]
+            except Exception as e:
+                # Keep what was not written (in order) for the next flush
+                self._pending[:0] = remaining
+                self.failed_flushes += 1
+                print(f"⚠️ Could not flush {len(remaining)} chat messages: {e}")
+            finally:
+                self._inflight = []
+            self.written += written
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if _background:
+            # Aborted turns still being saved may enqueue their messages
+            await asyncio.gather(*_background, return_exceptions=True)
+        for attempt in range(_STOP_FLUSH_ATTEMPTS):
+            await self.flush()
+            if not self._pending:
+                return
+            await asyncio.sleep(0.5 * 2**attempt)
+        print(f"❌ {len(self._pending)} chat messages could not be saved on shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queued": len(self),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+message_queue = MessageWriteQueue(
+    MESSAGE_WRITE_BEHIND, MESSAGE_FLUSH_INTERVAL, MESSAGE_FLUSH_BATCH
+)
+
+
+class ChatTurn:
+    """
+    The writes of one /chat turn: a new session or a heuristic title, the
+    user's message and the assistant's reply. Nothing touches the database
+    until `persist()`, which writes all of it in one transaction. With a
+    write-behind queue the messages are queued instead; a new session or
+    title is still committed right away, since messages reference it.
+
+    Messages get their id and created_at when they are added, so queued or
+    late writes keep the turn's order.
+    """
+
+    def __init__(
+        self,
+        user_id: UUID,
+        session_id: Optional[UUID] = None,
+        queue: Optional[MessageWriteQueue] = None,
+    ):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.queue = queue if queue is not None else message_queue
+        self._new_session: Optional[Dict[str, Any]] = None
+        self._title: Optional[str] = None
+        self._messages: List[Dict[str, Any]] = []
+
+    @property
+    def is_new_session(self) -> bool:
+        return self._new_session is not None
+
+    def create_session(self, title: str) -> UUID:
+        self.session_id = uuid.uuid4()
+        self._new_session = {
+            "id": self.session_id,
+            "user_id": self.user_id,
+            "title": title,
+            "created_at": datetime.utcnow(),
+        }
+        return self.session_id
+
+    def set_title(self, title: str) -> None:
+        self._title = title
+
+    def add_message(self, role: str, content: str, model: Optional[str]) -> None:
+        self._messages.append(
+            {
+                "id": uuid.uuid4(),
+                "user_id": self.user_id,
+                "session_id": self.session_id,
+                "role": role,
+                "content": content,
+                "model": model,
+                "created_at": datetime.utcnow(),
+            }
+        )
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._new_session or self._title is not None or self._messages)
+
+    async def persist(self, db: AsyncSession) -> None:
+        """Write everything added since the last persist."""
+        if not self.pending:
+            return
+        if self._new_session is not None:
+            await db.execute(insert(ChatSession).values(**self._new_session))
+        if self._title is not None:
+            await db.execute(
+                update(ChatSession)
+                .where(ChatSession.id == self.session_id)
+                .values(title=self._title)
+            )
+        if self.queue.enabled:
+            if self._new_session is not None or self._title is not None:
+                await db.commit()
+            self.queue.enqueue(self._messages)
+        else:
+            if self._messages:
+                await db.execute(insert(ChatMessage), self._messages)
+            await db.commit()
+        self._new_session, self._title, self._messages = None, None, []
+
+    async def persist_aborted(self, db: AsyncSession) -> None:
+        """
+        Persist whatever is still pending after a turn ended in an error: the
+        session and the user's message are kept even though no reply was
+        saved. Awaited rather than detached, so the response's background
+        tasks (the LLM title) find the session row. `db` may hold a failed
+        transaction, hence the rollback first.
+        """
+        if not self.pending:
+            return
+        try:
+            await db.rollback()
+            await self.persist(db)
+        except Exception as e:
+            print(f"⚠️ Could not save aborted chat turn: {e}")
+
+    def persist_in_background(self) -> None:
+        """
+        Persist whatever is still pending from a task of its own, for turns
+        cut short by a client disconnect, where the caller cannot wait.
+        """
+        if not self.pending:
+            return
+
+        async def _persist() -> None:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.persist(db)
+            except Exception as e:
+                print(f"⚠️ Could not save aborted chat turn: {e}")
+
+        task = asyncio.create_task(_persist())
+        _background.add(task)
+        task.add_done_callback(_background.discard)
@@ -1,7 +1,18 @@
+import asyncio
 import os
+import re
+from typing import Dict, List, Tuple
+
 import httpx
 from dotenv import load_dotenv
 
+from app.core.cache import TTLCache
+from app.core.config import (
+    SERPER_SEARCH_URL,
+    WEB_SEARCH_CACHE_SIZE,
+    WEB_SEARCH_CACHE_TTL,
+)
+
 # Load SERPER_API_KEY from .env
 load_dotenv()
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
@@ -9,21 +20,36 @@ SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 if not SERPER_API_KEY:
     raise ValueError("❌ Missing SERPER_API_KEY in .env file")
 
+SearchResults = List[Dict[str, str]]
+
+# (normalized query, count) -> results; shared by every user of this worker
+search_cache: TTLCache[Tuple[str, int], SearchResults] = TTLCache(
+    WEB_SEARCH_CACHE_SIZE, WEB_SEARCH_CACHE_TTL
+)
+# Lookups currently talking to Serper; identical callers await the same task
+_inflight: Dict[Tuple[str, int], "asyncio.Task[SearchResults]"] = {}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    return _WHITESPACE.sub(" ", query).strip().strip("\"'").strip().casefold()
 
-async def web_search_serper(query: str, count: int = 5):
+
+async def _fetch_serper(
+    query: str, client: httpx.AsyncClient, count: int
+) -> SearchResults:
     print("🔍 Searching web with Serper.dev...")
 
-    url = "https://google.serper.dev/search"
     headers = {
         "X-API-KEY": SERPER_API_KEY,
         "Content-Type": "application/json",
     }
     payload = {"q": query}
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        r = await client.post(url, headers=headers, json=payload)
-        r.raise_for_status()
-        data = r.json()
+    r = await client.post(SERPER_SEARCH_URL, headers=headers, json=payload, timeout=10)
+    r.raise_for_status()
+    data = r.json()
 
     results = []
     for item in data.get("organic", []):
@@ -51,6 +77,35 @@ async def web_search_serper(query: str, count: int = 5):
     return results
 
 
+async def web_search_serper(
+    query: str, client: httpx.AsyncClient, count: int = 5
+) -> SearchResults:
+    """
+    Serper search with a TTL cache keyed by the normalized query. Concurrent
+    identical lookups share one upstream request (single flight); failures
+    are not cached, so the next caller retries.
+    """
+    key = (normalize_query(query), count)
+    cached = search_cache.get(key)
+    if cached is not None:
+        print(f"♻️ Web search cache hit: {key[0]}")
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_serper(query, client, count))
+        _inflight[key] = task
+
+        def _done(t: "asyncio.Task[SearchResults]") -> None:
+            _inflight.pop(key, None)
+            if not t.cancelled() and t.exception() is None:
+                search_cache.set(key, t.result())
+
+        task.add_done_callback(_done)
+    # Shield: one caller giving up must not cancel the lookup for the others
+    return await asyncio.shield(task)
+
+
 def build_search_augmented_prompt(user_query, search_results):
     context = "\n".join(
         [
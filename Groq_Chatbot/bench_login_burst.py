@@ -0,0 +1,242 @@
+"""
+Measure /chat latency while a burst of logins hashes passwords.
+
+    python bench_login_burst.py                  # 40 logins, 8 concurrent
+    python bench_login_burst.py --logins 100 --concurrency 20 --chats 16
+
+Runs the FastAPI app in-process (httpx ASGITransport) with a stubbed
+provider that answers every chat completion after --provider-latency
+seconds, and keeps --chats clients sending non-streamed /chat requests:
+first on their own, then during a burst of POST /login calls with bcrypt
+verified inline on the event loop (the behaviour before the thread pool),
+then during the same burst through app.auth.authentication.verify_password
+(the pool). Prints /chat p50/p99 for each phase.
+
+A synthetic user (login-burst-<hex>@example.com) with a chat session per
+client, a Groq key and an ai_models row "bench-chat-model" is created in
+the database from DATABASE_URL (default: app.db.session) and removed again;
+point it at a scratch database anyway. No provider is called.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+# Before any app module binds its session factory / reads its settings
+os.environ.setdefault("SERPER_API_KEY", "bench")
+# One long-lived session per client; keep summary compaction out of the numbers
+os.environ.setdefault("SUMMARY_TRIGGER_MESSAGES", "1000000")
+
+import app.db.session as db_session
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+if os.getenv("DATABASE_URL"):
+    db_session.engine = create_async_engine(os.environ["DATABASE_URL"])
+    db_session.AsyncSessionLocal = async_sessionmaker(
+        db_session.engine, expire_on_commit=False
+    )
+
+import httpx
+from sqlalchemy import delete, insert
+
+import app.routers.auth_routes as auth_routes
+from app.auth.authentication import password_pool, pwd_context, verify_password
+from app.auth.models import AIModel, ChatMessage, ChatSession, User, UserApiKey
+from app.groq_client import model_catalog
+from app.routers.main import app
+
+MODEL_ID = "bench-chat-model"
+PASSWORD = "correct horse"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def stub_provider(latency: float) -> httpx.AsyncClient:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(
+            200, json={"choices": [{"message": {"content": "Bench reply"}}]}
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def seed(chats: int):
+    user_id = uuid.uuid4()
+    # /login validates the address, so no reserved .invalid domain here
+    email = f"login-burst-{user_id.hex}@example.com"
+    now = datetime.utcnow()
+    session_ids = [uuid.uuid4() for _ in range(chats)]
+    async with db_session.AsyncSessionLocal() as db:
+        await db.execute(
+            insert(User).values(
+                id=user_id,
+                email=email,
+                hashed_password=pwd_context.hash(PASSWORD),
+                created_at=now,
+                is_verified=True,
+            )
+        )
+        await db.execute(
+            insert(UserApiKey).values(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                api_provider="Groq",
+                api_key=f"bench-{user_id}",
+                created_at=now,
+            )
+        )
+        await db.execute(
+            insert(ChatSession),
+            [
+                {"id": sid, "user_id": user_id, "title": "Bench", "created_at": now}
+                for sid in session_ids
+            ],
+        )
+        await db.execute(
+            insert(AIModel).values(
+                provider="Groq",
+                model_id=MODEL_ID,
+                category="text",
+                rating=5,
+                total_requests=0,
+                total_response_time=0.0,
+                average_response_time=0.0,
+            )
+        )
+        await db.commit()
+    model_catalog.invalidate()
+    return user_id, email, session_ids
+
+
+async def cleanup(user_id):
+    async with db_session.AsyncSessionLocal() as db:
+        await db.execute(delete(ChatMessage).where(ChatMessage.user_id == user_id))
+        await db.execute(delete(ChatSession).where(ChatSession.user_id == user_id))
+        await db.execute(delete(UserApiKey).where(UserApiKey.user_id == user_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.execute(delete(AIModel).where(AIModel.model_id == MODEL_ID))
+        await db.commit()
+
+
+async def inline_verify(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed)
+
+
+async def chat_load(client, token, session_ids, stop: asyncio.Event):
+    """Each client keeps one /chat request in flight until `stop`."""
+    latencies: list = []
+
+    async def worker(session_id):
+        while not stop.is_set():
+            started = time.perf_counter()
+            r = await client.post(
+                "/chat",
+                headers={"Authorization": f"Bearer {token}"},
+                json={
+                    "session_id": str(session_id),
+                    "messages": [{"role": "user", "content": "hi"}],
+                    "model": MODEL_ID,
+                    "category": "text",
+                },
+            )
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker(sid) for sid in session_ids))
+    return latencies
+
+
+async def login_burst(client, email, logins: int, concurrency: int) -> float:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with gate:
+            r = await client.post("/login", json={"email": email, "password": PASSWORD})
+            r.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return time.perf_counter() - started
+
+
+async def phase(client, token, session_ids, burst=None, seconds: float = 2.0):
+    stop = asyncio.Event()
+    load = asyncio.create_task(chat_load(client, token, session_ids, stop))
+    elapsed = None
+    if burst is None:
+        await asyncio.sleep(seconds)
+    else:
+        elapsed = await burst()
+    stop.set()
+    return await load, elapsed
+
+
+def report(label: str, latencies: list, elapsed: float = None):
+    ms = [x * 1000 for x in latencies] or [0.0]
+    line = (
+        f"{label:<14} /chat p50 {statistics.median(ms):7.1f} ms  "
+        f"p99 {percentile(ms, 99):7.1f} ms  ({len(ms)} requests)"
+    )
+    if elapsed is not None:
+        line += f"  burst took {elapsed:.2f}s"
+    print(line)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8, help="logins at once")
+    parser.add_argument("--chats", type=int, default=8, help="concurrent /chat clients")
+    parser.add_argument("--provider-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    user_id, email, session_ids = await seed(args.chats)
+    app.state.http_client = stub_provider(args.provider_latency)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            r = await client.post("/login", json={"email": email, "password": PASSWORD})
+            r.raise_for_status()
+            token = r.json()["access_token"]
+            # Warm up the user / key caches and the model catalog
+            await phase(client, token, session_ids, seconds=0.5)
+
+            report("no logins", *await phase(client, token, session_ids))
+
+            auth_routes.verify_password = inline_verify
+            report(
+                "inline bcrypt",
+                *await phase(
+                    client,
+                    token,
+                    session_ids,
+                    lambda: login_burst(client, email, args.logins, args.concurrency),
+                ),
+            )
+            auth_routes.verify_password = verify_password
+            report(
+                "pooled bcrypt",
+                *await phase(
+                    client,
+                    token,
+                    session_ids,
+                    lambda: login_burst(client, email, args.logins, args.concurrency),
+                ),
+            )
+    finally:
+        await app.state.http_client.aclose()
+        await cleanup(user_id)
+        await db_session.engine.dispose()
+        password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
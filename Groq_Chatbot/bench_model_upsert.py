@@ -0,0 +1,170 @@
+"""
+Compare row-by-row and set-based writes of the model catalog and ping stats.
+
+    python bench_model_upsert.py                 # 3000 synthetic models
+    python bench_model_upsert.py --models 5000
+
+Both runs write the same synthetic catalog (provider "Bench", model ids
+bench-model-<n>) twice, so the second pass exercises the update path, then
+fold one ping per model into the stats. The row-by-row run mirrors the old
+persist_models_to_db / persist_pings_to_db (one SELECT per model, ORM
+mutation); the set-based run uses the statements from
+app.services.fetch_models, one multi-row statement per chunk. Synthetic
+rows are deleted before and after each run, but point DATABASE_URL at a
+scratch Postgres database anyway.
+Importing fetch_models needs GROQ_API_KEY / MISTRAL_API_KEY (e.g. from
+.env); no provider is called.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.auth.models import AIModel
+from app.db.session import DATABASE_URL
+from app.services.fetch_models import (
+    _chunks,
+    catalog_row,
+    ping_stats_statement,
+    upsert_models_statement,
+)
+
+PROVIDER = "Bench"
+
+
+def synthetic_catalog(count: int):
+    rng = random.Random(42)
+    categories = ["text", "coding", "multimodal", "vision", "audio"]
+    return [
+        {
+            "provider": PROVIDER,
+            "model_id": f"bench-model-{i}",
+            "category": rng.choice(categories),
+            "rating": rng.randint(1, 10),
+            "context_window": rng.choice([8192, 32768, 131072]),
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_pings(catalog):
+    rng = random.Random(7)
+    return [(m["model_id"], 1, round(rng.uniform(0.2, 3.0), 3)) for m in catalog]
+
+
+async def row_by_row(Session, catalog):
+    async with Session() as db:
+        for m in catalog:
+            row = (
+                await db.execute(select(AIModel).where(AIModel.model_id == m["model_id"]))
+            ).scalar_one_or_none()
+            if row is None:
+                db.add(
+                    AIModel(
+                        **m,
+                        total_requests=0,
+                        total_response_time=0.0,
+                        average_response_time=0.0,
+                    )
+                )
+            else:
+                row.category = m["category"]
+                row.rating = m["rating"]
+                row.context_window = m["context_window"]
+        await db.commit()
+
+
+async def row_by_row_pings(Session, pings):
+    async with Session() as db:
+        for model_id, _, latency in pings:
+            row = (
+                await db.execute(select(AIModel).where(AIModel.model_id == model_id))
+            ).scalar_one_or_none()
+            row.total_requests = (row.total_requests or 0) + 1
+            row.total_response_time = (row.total_response_time or 0.0) + latency
+            row.average_response_time = row.total_response_time / row.total_requests
+        await db.commit()
+
+
+async def set_based(Session, catalog):
+    async with Session() as db:
+        for chunk in _chunks([catalog_row(m) for m in catalog]):
+            await db.execute(upsert_models_statement(chunk))
+        await db.commit()
+
+
+async def set_based_pings(Session, pings):
+    async with Session() as db:
+        for chunk in _chunks(pings):
+            await db.execute(ping_stats_statement(chunk))
+        await db.commit()
+
+
+async def cleanup(Session):
+    async with Session() as db:
+        await db.execute(delete(AIModel).where(AIModel.provider == PROVIDER))
+        await db.commit()
+
+
+async def check(Session, count: int, latency_total: float):
+    async with Session() as db:
+        rows, requests, response_time = (
+            await db.execute(
+                select(
+                    func.count(),
+                    func.sum(AIModel.total_requests),
+                    func.sum(AIModel.total_response_time),
+                ).where(AIModel.provider == PROVIDER)
+            )
+        ).one()
+    assert rows == count, f"expected {count} rows, found {rows}"
+    assert requests == count, f"expected {count} requests, found {requests}"
+    assert abs(response_time - latency_total) < 1e-6 * count, response_time
+
+
+async def timed(label: str, fn, *args):
+    started = time.perf_counter()
+    await fn(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--models", type=int, default=3000)
+    args = parser.parse_args()
+
+    engine = create_async_engine(os.getenv("DATABASE_URL", DATABASE_URL))
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    catalog = synthetic_catalog(args.models)
+    pings = synthetic_pings(catalog)
+    latency_total = sum(latency for _, _, latency in pings)
+
+    print(f"{args.models} synthetic models")
+    totals = {}
+    for label, write, write_pings in (
+        ("row-by-row", row_by_row, row_by_row_pings),
+        ("set-based", set_based, set_based_pings),
+    ):
+        await cleanup(Session)
+        totals[label] = await timed(f"{label}: insert catalog", write, Session, catalog)
+        totals[label] += await timed(f"{label}: update catalog", write, Session, catalog)
+        totals[label] += await timed(f"{label}: ping stats", write_pings, Session, pings)
+        await check(Session, args.models, latency_total)
+    await cleanup(Session)
+    await engine.dispose()
+
+    print(
+        f"total: row-by-row {totals['row-by-row']:.2f}s, "
+        f"set-based {totals['set-based']:.2f}s "
+        f"({totals['row-by-row'] / totals['set-based']:.1f}x faster)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
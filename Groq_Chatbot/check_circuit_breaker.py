@@ -0,0 +1,141 @@
+"""
+Check that only upstream failures move the circuit breakers.
+
+    python check_circuit_breaker.py
+
+Feeds sequences of call outcomes (HTTP statuses, transport and other
+errors) into app.services.circuit_breaker.CircuitBreakers with a threshold
+of 2 failures and checks the resulting state: 5xx / 429 / transport errors
+count, successes in between do not reset the count (only a successful
+half-open probe closes the circuit), and anything else (4xx, rate-limit
+refusals, parse errors) leaves the window and the state alone while freeing
+a half-open probe slot. Also checks that failures on one model open the
+provider circuit even while another model of that provider keeps succeeding.
+No provider or database is needed.
+"""
+import sys
+import time
+
+import httpx
+
+from app.core.rate_limit import RateLimitExceeded
+from app.services.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreakers,
+)
+
+MODEL, PROVIDER = "check-model", "Groq"
+COOLDOWN = 0.2
+
+
+def http_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://example.invalid/chat")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+OUTCOMES = {
+    "ok": None,
+    "500": http_error(500),
+    "429": http_error(429),
+    "400": http_error(400),
+    "timeout": httpx.ReadTimeout("timed out"),
+    "rate-limited": RateLimitExceeded("local limiter"),
+    "parse": ValueError("bad JSON"),
+}
+
+
+def breakers() -> CircuitBreakers:
+    return CircuitBreakers(
+        model_threshold=2, provider_threshold=100, window=60, cooldown=COOLDOWN
+    )
+
+
+def model_state(cb: CircuitBreakers) -> str:
+    return cb.snapshot()["models"][MODEL]["state"]
+
+
+def run(cb: CircuitBreakers, sequence):
+    for outcome in sequence:
+        cb.record(MODEL, PROVIDER, OUTCOMES[outcome])
+    return model_state(cb)
+
+
+def report(ok: bool, label: str) -> bool:
+    print(f"{'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def check_sequences() -> bool:
+    cases = [
+        (["500", "500"], OPEN),
+        (["500", "500", "400"], OPEN),
+        (["500", "400", "500"], OPEN),
+        (["500", "rate-limited", "parse", "timeout"], OPEN),
+        (["429", "ok", "429"], OPEN),
+        (["500", "ok", "ok", "ok"], CLOSED),
+        (["400", "400", "400"], CLOSED),
+    ]
+    results = []
+    for sequence, expected in cases:
+        state = run(breakers(), sequence)
+        results.append(
+            report(state == expected, f"{', '.join(sequence)} -> {state} (want {expected})")
+        )
+    return all(results)
+
+
+def check_half_open() -> bool:
+    cb = breakers()
+    run(cb, ["500", "500"])
+    time.sleep(COOLDOWN * 1.2)
+    results = []
+
+    claimed = cb.claim(MODEL, PROVIDER)
+    blocked = not cb.available(MODEL, PROVIDER)
+    cb.record(MODEL, PROVIDER, OUTCOMES["400"])
+    results.append(
+        report(
+            claimed
+            and blocked
+            and model_state(cb) == HALF_OPEN
+            and cb.available(MODEL, PROVIDER),
+            "half-open probe ending in a 400 stays half-open and frees the slot",
+        )
+    )
+
+    cb.claim(MODEL, PROVIDER)
+    cb.record(MODEL, PROVIDER, OUTCOMES["500"])
+    results.append(report(model_state(cb) == OPEN, "failed probe re-opens"))
+
+    time.sleep(COOLDOWN * 1.2)
+    cb.claim(MODEL, PROVIDER)
+    cb.record(MODEL, PROVIDER)
+    results.append(report(model_state(cb) == CLOSED, "successful probe closes"))
+    return all(results)
+
+
+def check_provider_window() -> bool:
+    cb = CircuitBreakers(
+        model_threshold=100, provider_threshold=3, window=60, cooldown=COOLDOWN
+    )
+    for _ in range(3):
+        cb.record("failing-model", PROVIDER, OUTCOMES["500"])
+        cb.record("healthy-model", PROVIDER)
+    state = cb.snapshot()["providers"][PROVIDER.lower()]["state"]
+    return report(
+        state == OPEN and not cb.available("healthy-model", PROVIDER),
+        f"3 failures on one model between successes on another -> provider {state} "
+        f"(want {OPEN})",
+    )
+
+
+def main():
+    results = [check_sequences(), check_half_open(), check_provider_window()]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+EXPLAIN the hot chat queries and check they use the composite indexes
+from migrations/versions/0003_chat_access_path_indexes.py.
+
+    python check_query_plans.py --seed 200   # seed 200 users worth of chats first
+    python check_query_plans.py              # only run the plan checks
+
+Seeding writes synthetic rows (emails end in @plan-check.invalid) into the
+database from app.db.session, so point DATABASE_URL at a scratch database.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.auth.models import ChatMessage, ChatSession, User
+from app.db.session import DATABASE_URL
+
+# name -> (SQL mirroring the ORM query, index that must appear in the plan)
+HOT_QUERIES = {
+    "session tail (chat turn)": (
+        "SELECT * FROM chat_messages WHERE session_id = :session_id "
+        "ORDER BY created_at DESC LIMIT 50",
+        "ix_chat_messages_session_id_created_at",
+    ),
+    "session messages (history page)": (
+        "SELECT * FROM chat_messages WHERE session_id = :session_id "
+        "ORDER BY created_at ASC",
+        "ix_chat_messages_session_id_created_at",
+    ),
+    "recent messages (get_recent_messages)": (
+        "SELECT * FROM chat_messages WHERE user_id = :user_id "
+        "ORDER BY created_at DESC LIMIT 10",
+        "ix_chat_messages_user_id_created_at",
+    ),
+    "session list (get_sessions)": (
+        "SELECT * FROM chat_sessions WHERE user_id = :user_id "
+        "ORDER BY created_at DESC LIMIT 20",
+        "ix_chat_sessions_user_id_created_at",
+    ),
+}
+
+
+async def seed(conn, users: int, sessions_per_user: int, messages_per_session: int):
+    now = datetime.utcnow()
+    for _ in range(users):
+        user_id = uuid.uuid4()
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "id": user_id,
+                    "email": f"{user_id}@plan-check.invalid",
+                    "hashed_password": "x",
+                    "created_at": now,
+                    "is_verified": True,
+                }
+            ],
+        )
+        session_rows, message_rows = [], []
+        for s in range(sessions_per_user):
+            session_id = uuid.uuid4()
+            started = now - timedelta(days=random.randint(0, 365), minutes=s)
+            session_rows.append(
+                {
+                    "id": session_id,
+                    "user_id": user_id,
+                    "title": f"Session {s}",
+                    "created_at": started,
+                }
+            )
+            for m in range(messages_per_session):
+                message_rows.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": user_id,
+                        "session_id": session_id,
+                        "role": "user" if m % 2 == 0 else "assistant",
+                        "content": "lorem ipsum " * 20,
+                        "created_at": started + timedelta(seconds=m),
+                        "model": "",
+                    }
+                )
+        await conn.execute(insert(ChatSession), session_rows)
+        await conn.execute(insert(ChatMessage), message_rows)
+    await conn.execute(text("ANALYZE chat_sessions"))
+    await conn.execute(text("ANALYZE chat_messages"))
+
+
+async def check_plans(conn) -> bool:
+    row = (
+        await conn.execute(
+            text("SELECT user_id, id FROM chat_sessions ORDER BY random() LIMIT 1")
+        )
+    ).first()
+    if row is None:
+        print("❌ No chat data to plan against; run with --seed first")
+        return False
+    params = {"user_id": row.user_id, "session_id": row.id}
+
+    all_ok = True
+    for name, (sql, index_name) in HOT_QUERIES.items():
+        plan = (await conn.execute(text(f"EXPLAIN {sql}"), params)).scalars().all()
+        plan_text = "\n".join(plan)
+        ok = index_name in plan_text and "Seq Scan" not in plan_text
+        all_ok &= ok
+        print(f"{'✅' if ok else '❌'} {name}")
+        for line in plan:
+            print(f"     {line}")
+    return all_ok
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=0, help="users to seed")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=40)
+    args = parser.parse_args()
+
+    engine = create_async_engine(os.getenv("DATABASE_URL", DATABASE_URL))
+    try:
+        if args.seed:
+            async with engine.begin() as conn:
+                print(f"🌱 Seeding {args.seed} users ...")
+                await seed(conn, args.seed, args.sessions, args.messages)
+        async with engine.connect() as conn:
+            ok = await check_plans(conn)
+    finally:
+        await engine.dispose()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+"""
+Check that chat turns are saved in full, in both persistence modes.
+
+    python check_turn_persistence.py              # 50 concurrent turns
+    python check_turn_persistence.py --turns 200
+
+Runs turns through app.services.turn_persistence against the database from
+app.db.session and checks that:
+
+- the default mode commits each turn (session + both messages) once;
+- with write-behind, every queued message is in the table after stop();
+- a flush that fails (database unreachable) keeps its messages for the next;
+- a session deleted before its messages are flushed only loses those rows.
+
+A synthetic user (email ending in @turn-check.invalid) is created and
+removed again, but point DATABASE_URL at a scratch database anyway.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.auth.models import ChatMessage, ChatSession, User
+from app.db.session import DATABASE_URL
+from app.services.turn_persistence import ChatTurn, MessageWriteQueue
+
+
+async def run_turn(Session, user_id, queue, n: int) -> uuid.UUID:
+    turn = ChatTurn(user_id, queue=queue)
+    session_id = turn.create_session(f"Turn {n}")
+    turn.add_message("user", f"question {n}", "")
+    turn.add_message("assistant", f"answer {n}", "check-model")
+    async with Session() as db:
+        await turn.persist(db)
+    return session_id
+
+
+async def count_messages(Session, user_id) -> int:
+    async with Session() as db:
+        return await db.scalar(
+            select(func.count()).where(ChatMessage.user_id == user_id)
+        )
+
+
+def report(ok: bool, label: str) -> bool:
+    print(f"{'✅' if ok else '❌'} {label}")
+    return ok
+
+
+async def check_default(engine, Session, user_id, turns: int) -> bool:
+    commits = 0
+
+    def on_commit(_conn):
+        nonlocal commits
+        commits += 1
+
+    event.listen(engine.sync_engine, "commit", on_commit)
+    try:
+        queue = MessageWriteQueue(False, 0.25, 200)
+        await asyncio.gather(
+            *(run_turn(Session, user_id, queue, n) for n in range(turns))
+        )
+    finally:
+        event.remove(engine.sync_engine, "commit", on_commit)
+    saved = await count_messages(Session, user_id)
+    return report(
+        commits == turns and saved == 2 * turns,
+        f"default mode: {turns} turns, {commits} commits, {saved} messages",
+    )
+
+
+async def check_write_behind(Session, user_id, turns: int) -> bool:
+    before = await count_messages(Session, user_id)
+    queue = MessageWriteQueue(True, 0.05, 200, session_factory=Session)
+    queue.start()
+    await asyncio.gather(*(run_turn(Session, user_id, queue, n) for n in range(turns)))
+    await queue.stop()
+    saved = await count_messages(Session, user_id) - before
+    return report(
+        saved == 2 * turns and len(queue) == 0,
+        f"write-behind: {saved}/{2 * turns} messages saved after stop()",
+    )
+
+
+async def check_failed_flush(Session, user_id) -> bool:
+    broken = True
+
+    def factory():
+        if broken:
+            raise ConnectionError("database unreachable")
+        return Session()
+
+    before = await count_messages(Session, user_id)
+    queue = MessageWriteQueue(True, 0.05, 200, session_factory=factory)
+    await run_turn(Session, user_id, queue, 0)
+    await queue.flush()
+    kept = len(queue)
+    broken = False
+    await queue.flush()
+    saved = await count_messages(Session, user_id) - before
+    return report(
+        kept == 2 and saved == 2 and queue.failed_flushes == 1,
+        f"failed flush: {kept} messages kept, {saved} saved on the next flush",
+    )
+
+
+async def check_deleted_session(Session, user_id) -> bool:
+    before = await count_messages(Session, user_id)
+    queue = MessageWriteQueue(True, 0.05, 200, session_factory=Session)
+    doomed = await run_turn(Session, user_id, queue, 0)
+    await run_turn(Session, user_id, queue, 1)
+    async with Session() as db:
+        await db.execute(delete(ChatSession).where(ChatSession.id == doomed))
+        await db.commit()
+    await queue.flush()
+    saved = await count_messages(Session, user_id) - before
+    return report(
+        saved == 2 and queue.dropped == 2,
+        f"deleted session: {queue.dropped} messages dropped, {saved} saved",
+    )
+
+
+async def cleanup(Session, user_id):
+    async with Session() as db:
+        await db.execute(delete(ChatMessage).where(ChatMessage.user_id == user_id))
+        await db.execute(delete(ChatSession).where(ChatSession.user_id == user_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_async_engine(os.getenv("DATABASE_URL", DATABASE_URL))
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    user_id = uuid.uuid4()
+    async with Session() as db:
+        await db.execute(
+            insert(User).values(
+                id=user_id,
+                email=f"{user_id}@turn-check.invalid",
+                hashed_password="x",
+                created_at=datetime.utcnow(),
+                is_verified=True,
+            )
+        )
+        await db.commit()
+
+    try:
+        results = [
+            await check_default(engine, Session, user_id, args.turns),
+            await check_write_behind(Session, user_id, args.turns),
+            await check_failed_flush(Session, user_id),
+            await check_deleted_session(Session, user_id),
+        ]
+    finally:
+        await cleanup(Session, user_id)
+        await engine.dispose()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Check the web search cache and single-flight coalescing against serper_stub.py.
+
+    python check_web_search_cache.py                 # 20 concurrent lookups
+    python check_web_search_cache.py --lookups 100 --delay 0.5
+
+Starts the Serper stand-in on a free local port, points SERPER_SEARCH_URL at
+it and runs app.services.web_search.web_search_serper:
+
+- N concurrent lookups of one query (spelled with different case and
+  whitespace) reach the stub once and all get the same results;
+- the next lookup of that query is a cache hit with no upstream request;
+- a different query does go upstream.
+
+No Serper account is needed (SERPER_API_KEY defaults to a dummy value).
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub(port: int, delay: float) -> subprocess.Popen:
+    stub = subprocess.Popen(
+        [sys.executable, "serper_stub.py", "--port", str(port), "--delay", str(delay)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if stub.poll() is not None:
+            raise RuntimeError("serper_stub.py exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats", timeout=1)
+            return stub
+        except httpx.TransportError:
+            time.sleep(0.1)
+    stub.terminate()
+    raise RuntimeError("serper_stub.py did not come up within 15s")
+
+
+def report(ok: bool, label: str) -> bool:
+    print(f"{'✅' if ok else '❌'} {label}")
+    return ok
+
+
+async def run_checks(base_url: str, lookups: int) -> bool:
+    # Imported here: the module reads SERPER_SEARCH_URL / SERPER_API_KEY on import
+    from app.services.web_search import search_cache, web_search_serper
+
+    spellings = ["Rust async runtime", "rust  ASYNC runtime ", "'rust async runtime'"]
+    async with httpx.AsyncClient() as client:
+
+        async def upstream() -> int:
+            return (await client.get(f"{base_url}/stats")).json()["total"]
+
+        await client.delete(f"{base_url}/stats")
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                web_search_serper(spellings[i % len(spellings)], client)
+                for i in range(lookups)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        served = await upstream()
+        checks = [
+            report(
+                served == 1 and all(r == results[0] for r in results) and results[0],
+                f"{lookups} concurrent lookups: {served} upstream request(s), "
+                f"{elapsed:.2f}s",
+            )
+        ]
+
+        hits = search_cache.hits
+        again = await web_search_serper("RUST async runtime", client)
+        served = await upstream()
+        checks.append(
+            report(
+                served == 1 and search_cache.hits == hits + 1 and again == results[0],
+                f"next lookup: cache hit, {served} upstream request(s) in total",
+            )
+        )
+
+        await web_search_serper("python asyncio tutorial", client)
+        served = await upstream()
+        checks.append(
+            report(served == 2, f"different query: {served} upstream requests in total")
+        )
+    print(f"   cache: {search_cache.stats()}")
+    return all(checks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.3, help="stub seconds per search")
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    os.environ["SERPER_SEARCH_URL"] = f"{base_url}/search"
+    os.environ.setdefault("SERPER_API_KEY", "stub")
+
+    stub = start_stub(port, args.delay)
+    try:
+        ok = asyncio.run(run_checks(base_url, args.lookups))
+    finally:
+        stub.terminate()
+        stub.wait()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""baseline schema (tables as created by Base.metadata.create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=True),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "ai_models",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("provider", sa.String(50), nullable=False),
+        sa.Column("model_id", sa.String(255), nullable=False, unique=True),
+        sa.Column("category", sa.String(255), nullable=False),
+        sa.Column("rating", sa.Integer(), nullable=False),
+        sa.Column("total_requests", sa.Integer(), nullable=True),
+        sa.Column("total_response_time", sa.Float(), nullable=True),
+        sa.Column("average_response_time", sa.Float(), nullable=True),
+    )
+    op.create_index("ix_ai_models_id", "ai_models", ["id"])
+
+    op.create_table(
+        "user_api_keys",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("api_provider", sa.String(), nullable=False),
+        sa.Column("api_key", sa.String(), nullable=False, unique=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_user_api_keys_user_id", "user_api_keys", ["user_id"])
+    op.create_index("ix_user_api_keys_api_provider", "user_api_keys", ["api_provider"])
+
+    op.create_table(
+        "chat_sessions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=False,
+        ),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    op.create_table(
+        "chat_messages",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "session_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("chat_sessions.id"),
+            nullable=False,
+        ),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("model", sa.String(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chat_messages")
+    op.drop_table("chat_sessions")
+    op.drop_index("ix_user_api_keys_api_provider", table_name="user_api_keys")
+    op.drop_index("ix_user_api_keys_user_id", table_name="user_api_keys")
+    op.drop_table("user_api_keys")
+    op.drop_index("ix_ai_models_id", table_name="ai_models")
+    op.drop_table("ai_models")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
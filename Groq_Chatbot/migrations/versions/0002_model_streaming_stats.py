@@ -0,0 +1,27 @@
+"""streaming stats on ai_models (SSE replies)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("ai_models", sa.Column("streamed_requests", sa.Integer(), nullable=True))
+    op.add_column(
+        "ai_models", sa.Column("average_first_token_time", sa.Float(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ai_models", "average_first_token_time")
+    op.drop_column("ai_models", "streamed_requests")
@@ -0,0 +1,23 @@
+"""context window on ai_models (token-budgeted chat history)
+
+Revision ID: 0002b
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002b"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("ai_models", sa.Column("context_window", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ai_models", "context_window")
@@ -0,0 +1,29 @@
+"""rolling conversation summary on chat_sessions
+
+Revision ID: 0002c
+Revises: 0002b
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0002c"
+down_revision: Union[str, None] = "0002b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_sessions", sa.Column("summary", sa.Text(), nullable=True))
+    op.add_column(
+        "chat_sessions",
+        sa.Column("summary_last_message_id", postgresql.UUID(as_uuid=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("chat_sessions", "summary_last_message_id")
+    op.drop_column("chat_sessions", "summary")
@@ -0,0 +1,66 @@
+"""composite indexes for chat_messages / chat_sessions access paths
+
+Revision ID: 0003
+Revises: 0002c
+Create Date: 2026-10-18
+
+Built CONCURRENTLY on Postgres so a live chat table is not write-locked
+while the index builds (hence the autocommit block: CREATE INDEX
+CONCURRENTLY cannot run inside a transaction).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_messages_session_id_created_at",
+            "chat_messages",
+            ["session_id", "created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_chat_messages_user_id_created_at",
+            "chat_messages",
+            ["user_id", "created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_chat_sessions_user_id_created_at",
+            "chat_sessions",
+            ["user_id", sa.text("created_at DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chat_sessions_user_id_created_at",
+            table_name="chat_sessions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_chat_messages_user_id_created_at",
+            table_name="chat_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_chat_messages_session_id_created_at",
+            table_name="chat_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
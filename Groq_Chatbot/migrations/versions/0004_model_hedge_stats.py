@@ -0,0 +1,25 @@
+"""hedged request counters on ai_models
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("ai_models", sa.Column("hedged_requests", sa.Integer(), nullable=True))
+    op.add_column("ai_models", sa.Column("hedge_wins", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ai_models", "hedge_wins")
+    op.drop_column("ai_models", "hedged_requests")
@@ -0,0 +1,40 @@
+"""soft delete for ai_models, model description cache
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "ai_models",
+        sa.Column(
+            "is_active", sa.Boolean(), nullable=False, server_default=sa.true()
+        ),
+    )
+    op.add_column("ai_models", sa.Column("deactivated_at", sa.DateTime(), nullable=True))
+    op.create_table(
+        "model_descriptions",
+        sa.Column("model_id", sa.String(length=255), nullable=False),
+        sa.Column("provider", sa.String(length=50), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("model_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("model_descriptions")
+    op.drop_column("ai_models", "deactivated_at")
+    op.drop_column("ai_models", "is_active")
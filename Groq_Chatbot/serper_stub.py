@@ -0,0 +1,63 @@
+"""
+Local stand-in for the Serper search API, for development and tests.
+
+    python serper_stub.py --port 8765 --delay 0.3
+    SERPER_SEARCH_URL=http://127.0.0.1:8765/search uvicorn app.routers.main:app
+
+POST /search answers with deterministic organic results derived from the
+query (after --delay seconds, to make caching / coalescing visible).
+GET /stats returns how many searches were served per query; DELETE /stats
+resets the counters.
+"""
+import argparse
+import asyncio
+from collections import Counter
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+app = FastAPI(title="Serper stand-in")
+served: Counter = Counter()
+DELAY = 0.0
+
+
+@app.post("/search")
+async def search(request: Request):
+    body = await request.json()
+    query = str(body.get("q", ""))
+    served[query] += 1
+    if DELAY:
+        await asyncio.sleep(DELAY)
+    return {
+        "searchParameters": {"q": query},
+        "organic": [
+            {
+                "title": f"Result {i} for {query}",
+                "snippet": f"Stand-in snippet {i} about {query}.",
+                "link": f"https://example.com/{i}?q={query.replace(' ', '+')}",
+                "position": i,
+            }
+            for i in range(1, 6)
+        ],
+    }
+
+
+@app.get("/stats")
+async def stats():
+    return {"total": sum(served.values()), "queries": dict(served)}
+
+
+@app.delete("/stats")
+async def reset_stats():
+    served.clear()
+    return {"total": 0}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per search")
+    args = parser.parse_args()
+    DELAY = args.delay
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,180 @@
+"""
+ChatTurn / MessageWriteQueue against a throwaway SQLite database (aiosqlite),
+so no Postgres server is needed:
+
+    python -m pytest
+"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.services.turn_persistence as turn_persistence
+from app.auth.models import Base, ChatMessage, ChatSession, User
+from app.services.turn_persistence import ChatTurn, MessageWriteQueue
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite+aiosqlite:///{tmp_path / 'chat.db'}"
+
+
+async def open_database(url: str):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    user_id = uuid.uuid4()
+    async with Session() as db:
+        await db.execute(
+            insert(User).values(
+                id=user_id,
+                email=f"{user_id}@turn-test.invalid",
+                hashed_password="x",
+                created_at=datetime.utcnow(),
+                is_verified=True,
+            )
+        )
+        await db.commit()
+    return engine, Session, user_id
+
+
+async def count(Session, model) -> int:
+    async with Session() as db:
+        return await db.scalar(select(func.count()).select_from(model))
+
+
+def message_row(user_id, session_id, content: str, message_id=None):
+    return {
+        "id": message_id or uuid.uuid4(),
+        "user_id": user_id,
+        "session_id": session_id,
+        "role": "user",
+        "content": content,
+        "model": "",
+        "created_at": datetime.utcnow(),
+    }
+
+
+def test_persist_rolls_back_the_whole_turn_on_a_failed_write(database_url):
+    async def scenario():
+        engine, Session, user_id = await open_database(database_url)
+        try:
+            queue = MessageWriteQueue(False, 0.05, 200, session_factory=Session)
+            turn = ChatTurn(user_id, queue=queue)
+            turn.create_session("Doomed")
+            turn.add_message("user", "question", "")
+            turn.add_message("assistant", "answer", "test-model")
+            # The reply reuses an existing message id: the session and the
+            # user's message were already sent when the insert fails
+            taken = uuid.uuid4()
+            async with Session() as db:
+                session_id = uuid.uuid4()
+                await db.execute(
+                    insert(ChatSession).values(
+                        id=session_id, user_id=user_id, title="Other",
+                        created_at=datetime.utcnow(),
+                    )
+                )
+                await db.execute(
+                    insert(ChatMessage).values(**message_row(user_id, session_id, "x", taken))
+                )
+                await db.commit()
+            turn._messages[-1]["id"] = taken
+
+            async with Session() as db:
+                with pytest.raises(IntegrityError):
+                    await turn.persist(db)
+                await db.rollback()
+
+            assert await count(Session, ChatSession) == 1
+            assert await count(Session, ChatMessage) == 1
+            assert turn.pending  # nothing was dropped from the turn
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_persist_aborted_saves_the_session_before_returning(database_url):
+    async def scenario():
+        engine, Session, user_id = await open_database(database_url)
+        try:
+            queue = MessageWriteQueue(False, 0.05, 200, session_factory=Session)
+            turn = ChatTurn(user_id, queue=queue)
+            session_id = turn.create_session("Kept")
+            turn.add_message("user", "question", "")
+            async with Session() as db:
+                await turn.persist_aborted(db)
+            # What a title task running right after the response would see
+            async with Session() as db:
+                session = await db.get(ChatSession, session_id)
+            assert session is not None and session.title == "Kept"
+            assert await count(Session, ChatMessage) == 1
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_flush_falls_back_to_single_rows_and_drops_only_the_rejected_one(database_url):
+    async def scenario():
+        engine, Session, user_id = await open_database(database_url)
+        try:
+            queue = MessageWriteQueue(True, 0.05, 200, session_factory=Session)
+            turn = ChatTurn(user_id, queue=queue)
+            session_id = turn.create_session("Batch")
+            async with Session() as db:
+                await turn.persist(db)
+            taken = uuid.uuid4()
+            queue.enqueue([message_row(user_id, session_id, "first", taken)])
+            assert await queue.flush() == 1
+
+            queue.enqueue(
+                [
+                    message_row(user_id, session_id, "second"),
+                    message_row(user_id, session_id, "duplicate", taken),
+                    message_row(user_id, session_id, "third"),
+                ]
+            )
+            assert await queue.flush() == 2
+            assert queue.dropped == 1 and len(queue) == 0
+            async with Session() as db:
+                contents = set(await db.scalars(select(ChatMessage.content)))
+            assert contents == {"first", "second", "third"}
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_stop_waits_for_background_persists_and_flushes_them(database_url, monkeypatch):
+    async def scenario():
+        engine, Session, user_id = await open_database(database_url)
+        monkeypatch.setattr(turn_persistence, "AsyncSessionLocal", Session)
+        try:
+            queue = MessageWriteQueue(True, 60, 200, session_factory=Session)
+            queue.start()
+            turns = []
+            for n in range(5):
+                turn = ChatTurn(user_id, queue=queue)
+                turn.create_session(f"Aborted {n}")
+                turn.add_message("user", f"question {n}", "")
+                turn.persist_in_background()
+                turns.append(turn)
+            assert turn_persistence._background
+
+            await queue.stop()
+
+            assert not turn_persistence._background
+            assert await count(Session, ChatSession) == 5
+            assert await count(Session, ChatMessage) == 5
+            assert len(queue) == 0
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())